@@ -0,0 +1,164 @@
+from typing import TYPE_CHECKING
+from CharClass import CharSet, Classifier, atomize
+from utils.bitset import toBitmask
+
+if TYPE_CHECKING:
+  from ThompsonConstruction import TCNFA
+  from CompactNFA import CompactNFA
+  from GlushkovConstruction import GlushkovNFA
+
+
+class BitParallelNFA:
+  """
+  Simulates an NFA with the set of active states packed into one integer.
+  For every symbol the successor masks (ε-closure already applied) are
+  grouped into tables indexed by a `chunkBits`-wide slice of the active set,
+  so one input character costs a handful of big-int operations per occupied
+  chunk instead of a dict lookup and a set union per active state.
+  Chunk tables are filled lazily, only for slices the input actually reaches;
+  with `maxEntries` set they are dropped whenever they would grow past it.
+  When transitions carry CharSet labels they are split into disjoint atoms,
+  and input characters are mapped to their atom by `classifier`.
+  """
+  chunkBits: int
+  symbols: list['str | CharSet']           # disjoint symbols the tables are keyed by
+  classifier: Classifier | None
+  startMask: int
+  acceptMask: int
+  sources: dict[str, int]                   # symbol -> states with an outgoing edge on it
+  successors: dict[str, dict[int, int]]     # symbol -> state -> closed successor mask
+  tables: dict[str, dict[int, int]]         # symbol -> (chunk << chunkBits | slice) -> mask
+  lookups: int                              # chunk table lookups made by step
+  misses: int                               # chunk masks computed by fillChunk
+  entries: int                              # chunk masks currently held in tables
+  maxEntries: int | None
+  def __init__(self, nfa: 'TCNFA | CompactNFA | GlushkovNFA', chunkBits: int = 16, maxEntries: int | None = None):
+    closures = nfa.closureTable()
+    self.chunkBits = chunkBits
+    self.maxEntries = maxEntries
+    self.startMask = closures[nfa.startState]
+    self.acceptMask = nfa.acceptMask()
+    self.sources = dict()
+    self.successors = dict()
+    self.tables = dict()
+    self.lookups = 0
+    self.misses = 0
+    self.entries = 0
+    
+    coverage: dict['str | CharSet', list['str | CharSet']] | None = None
+    if any(isinstance(label, CharSet) for label in nfa.alphabet):
+      self.symbols, coverage = atomize(nfa.alphabet)
+      self.classifier = Classifier(self.symbols)
+    else:
+      self.symbols = sorted(nfa.alphabet)
+      self.classifier = None
+    
+    for src, label, dests in nfa.symbolEdges():
+      mask = 0
+      for dest in dests:
+        mask |= closures[dest]
+      for symbol in (coverage[label] if coverage is not None else (label,)):
+        succ = self.successors.setdefault(symbol, dict())
+        succ[src] = succ.get(src, 0) | mask
+    
+    for symbol, succ in self.successors.items():
+      self.sources[symbol] = toBitmask(succ)
+      self.tables[symbol] = dict()
+    
+  def symbolFor(self, char: str) -> 'str | CharSet | None':
+    """
+    Returns the symbol the tables use for an input character.
+    """
+    if self.classifier is None:
+      return char
+    return self.classifier.classify(char)
+  
+  def step(self, currentStates: int, symbol: 'str | CharSet') -> int:
+    """
+    Returns the ε-closed set of states reached from `currentStates` on `symbol`.
+    """
+    active = currentStates & self.sources.get(symbol, 0)
+    if not active:
+      return 0
+    
+    bits = self.chunkBits
+    full = (1 << bits) - 1
+    table = self.tables[symbol]
+    nextStates = 0
+    lookups = 0
+    while active:
+      low = (active & -active).bit_length() - 1
+      chunk = low - low % bits
+      part = (active >> chunk) & full
+      key = chunk << bits | part
+      lookups += 1
+      mask = table.get(key)
+      if mask is None:
+        mask = self.fillChunk(symbol, chunk, part)
+        table[key] = mask
+      nextStates |= mask
+      active ^= part << chunk
+    self.lookups += lookups
+    return nextStates
+  
+  def clearTables(self):
+    """
+    Drops every cached chunk mask; they are refilled on demand.
+    """
+    for table in self.tables.values():
+      table.clear()
+    self.entries = 0
+  
+  def fillChunk(self, symbol: str, chunk: int, part: int) -> int:
+    """
+    Computes the successor mask of the states in one chunk of the active set,
+    which the caller then stores, clearing the tables first if they are full.
+    """
+    self.misses += 1
+    if self.maxEntries is not None and self.entries >= self.maxEntries:
+      self.clearTables()
+    self.entries += 1
+    succ = self.successors[symbol]
+    mask = 0
+    while part:
+      low = part & -part
+      mask |= succ[chunk + low.bit_length() - 1]
+      part ^= low
+    return mask
+  
+  def advance(self, currentStates: int, inputString: str) -> int:
+    """
+    Runs the input from the set `currentStates` and returns the set it ends in.
+    """
+    if "ε" in inputString:   # null sentinel not allowed in input
+      raise ValueError("Input string cannot contain null symbol 'ε'")
+    
+    bits = self.chunkBits
+    full = (1 << bits) - 1
+    sources, tables = self.sources, self.tables
+    symbols = inputString if self.classifier is None else map(self.classifier.classify, inputString)
+    for symbol in symbols:
+      # inlined self.step, this loop is the matching hot path
+      active = currentStates & sources.get(symbol, 0)
+      if not active:
+        return 0
+      table = tables[symbol]
+      currentStates = 0
+      while active:
+        low = (active & -active).bit_length() - 1
+        chunk = low - low % bits
+        part = (active >> chunk) & full
+        mask = table.get(chunk << bits | part)
+        if mask is None:
+          mask = self.fillChunk(symbol, chunk, part)
+          table[chunk << bits | part] = mask
+        currentStates |= mask
+        active ^= part << chunk
+    
+    return currentStates
+  
+  def read(self, inputString: str) -> bool:
+    """
+    Reads an input string and checks if it is accepted by the NFA.
+    """
+    return bool(self.advance(self.startMask, inputString) & self.acceptMask)
@@ -0,0 +1,243 @@
+from bisect import bisect_right
+from typing import Iterable
+
+MAXCODE = 0x10FFFF      # largest code point
+
+
+class CharSet:
+  """
+  An immutable set of characters, kept as sorted, disjoint, non-adjacent
+  inclusive ranges of code points. Labels one transition standing for a
+  whole bracket expression instead of one transition per character.
+  """
+  __slots__ = ("ranges", "starts")
+  ranges: tuple[tuple[int, int], ...]
+  starts: list[int]
+  def __init__(self, ranges: Iterable[tuple[int, int]]):
+    merged: list[tuple[int, int]] = []
+    for lo, hi in sorted(ranges):
+      if lo > hi:
+        raise ValueError(f"Invalid character range {chr(lo)}-{chr(hi)}")
+      if merged and lo <= merged[-1][1] + 1:
+        merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+      else:
+        merged.append((lo, hi))
+    self.ranges = tuple(merged)
+    self.starts = [lo for lo, _ in merged]
+  
+  @staticmethod
+  def fromChars(chars: Iterable[str]) -> 'CharSet':
+    return CharSet((ord(c), ord(c)) for c in chars)
+  
+  def negate(self) -> 'CharSet':
+    """
+    Returns every character not in this set.
+    """
+    ranges = []
+    lo = 0
+    for start, end in self.ranges:
+      if start > lo:
+        ranges.append((lo, start - 1))
+      lo = end + 1
+    if lo <= MAXCODE:
+      ranges.append((lo, MAXCODE))
+    return CharSet(ranges)
+  
+  def __contains__(self, char: str) -> bool:
+    code = ord(char)
+    i = bisect_right(self.starts, code) - 1
+    return i >= 0 and code <= self.ranges[i][1]
+  
+  def __or__(self, other: 'CharSet') -> 'CharSet':
+    return CharSet(self.ranges + other.ranges)
+  
+  def __and__(self, other: 'CharSet') -> 'CharSet':
+    return (self.negate() | other.negate()).negate()
+  
+  def __sub__(self, other: 'CharSet') -> 'CharSet':
+    return self & other.negate()
+  
+  def __len__(self) -> int:
+    return sum(hi - lo + 1 for lo, hi in self.ranges)
+  
+  def __bool__(self) -> bool:
+    return bool(self.ranges)
+  
+  def __eq__(self, other: object) -> bool:
+    if not isinstance(other, CharSet):
+      return NotImplemented
+    return self.ranges == other.ranges
+  
+  def __hash__(self) -> int:
+    return hash(self.ranges)
+  
+  # ordered by first code point, so alphabets mixing str and CharSet labels still sort
+  def __lt__(self, other: 'str | CharSet') -> bool:
+    return sortKey(self) < sortKey(other)
+  
+  def __gt__(self, other: 'str | CharSet') -> bool:
+    return sortKey(self) > sortKey(other)
+  
+  def __str__(self) -> str:
+    parts = []
+    for lo, hi in self.ranges:
+      parts.append(escape(chr(lo)) if lo == hi else f"{escape(chr(lo))}-{escape(chr(hi))}")
+    return "[" + "".join(parts) + "]"
+  
+  def __repr__(self) -> str:
+    return f"CharSet({self})"
+
+
+def escape(char: str) -> str:
+  if char in "]\\-^":
+    return "\\" + char
+  if not char.isprintable() or char == " ":
+    return f"\\u{ord(char):04x}" if ord(char) <= 0xFFFF else f"\\U{ord(char):08x}"
+  return char
+
+def sortKey(label: 'str | CharSet') -> tuple:
+  if isinstance(label, CharSet):
+    return (label.ranges, 1)
+  return (((ord(label), ord(label)),), 0)
+
+def labelRanges(label: 'str | CharSet') -> tuple[tuple[int, int], ...]:
+  """
+  Returns the code point ranges matched by a transition label.
+  """
+  if isinstance(label, CharSet):
+    return label.ranges
+  return ((ord(label), ord(label)),)
+
+def representative(label: 'str | CharSet') -> str:
+  """
+  Returns one character matched by a label.
+  """
+  if isinstance(label, CharSet):
+    return chr(label.ranges[0][0])
+  return label
+
+def simplify(chars: CharSet) -> 'str | CharSet':
+  """
+  Turns a set holding a single character back into that character.
+  """
+  if len(chars.ranges) == 1 and chars.ranges[0][0] == chars.ranges[0][1]:
+    return chr(chars.ranges[0][0])
+  return chars
+
+def parseBracket(expression: str) -> 'str | CharSet':
+  """
+  Parses a bracket expression such as "[a-z0-9_]" or "[^\\]]".
+  A "]" right after "[" or "[^" is literal, "\\" escapes the next character,
+  "\\uXXXX" and "\\UXXXXXXXX" give a code point and "-" is literal at
+  either end.
+  """
+  body = expression[1:-1]
+  negated = body.startswith("^")
+  if negated:
+    body = body[1:]
+  
+  chars: list[str] = []
+  literal: list[bool] = []      # escaped characters never act as "-"
+  i = 0
+  while i < len(body):
+    width = {"u": 4, "U": 8}.get(body[i + 1], 0) if body[i] == "\\" and i + 1 < len(body) else 0
+    if width and i + 2 + width <= len(body) and all(c in "0123456789abcdefABCDEF" for c in body[i + 2:i + 2 + width]):
+      chars.append(chr(int(body[i + 2:i + 2 + width], 16)))
+      literal.append(True)
+      i += 2 + width
+    elif body[i] == "\\" and i + 1 < len(body):
+      chars.append(body[i + 1])
+      literal.append(True)
+      i += 2
+    else:
+      chars.append(body[i])
+      literal.append(False)
+      i += 1
+  
+  ranges: list[tuple[int, int]] = []
+  i = 0
+  while i < len(chars):
+    if i + 2 < len(chars) and chars[i + 1] == "-" and not literal[i + 1]:
+      ranges.append((ord(chars[i]), ord(chars[i + 2])))
+      i += 3
+    else:
+      ranges.append((ord(chars[i]), ord(chars[i])))
+      i += 1
+  if not ranges and not negated:
+    raise ValueError(f"Empty bracket expression '{expression}'")
+  
+  members = CharSet(ranges)
+  return simplify(members.negate() if negated else members)
+
+def atomize(labels: Iterable['str | CharSet']) -> tuple[list['str | CharSet'], dict['str | CharSet', list['str | CharSet']]]:
+  """
+  Splits possibly overlapping labels into disjoint atoms: maximal sets of
+  characters that every label either fully contains or fully misses.
+  Returns the sorted atoms and, for each label, the atoms it is made of.
+  """
+  labels = set(labels)
+  events: dict[int, list[tuple[int, 'str | CharSet']]] = {}
+  for label in labels:
+    for lo, hi in labelRanges(label):
+      events.setdefault(lo, []).append((1, label))
+      events.setdefault(hi + 1, []).append((-1, label))
+  
+  # sweep the boundaries; characters between two boundaries share their labels
+  pieces: dict[frozenset, list[tuple[int, int]]] = {}
+  active: dict['str | CharSet', int] = {}
+  points = sorted(events)
+  for i, point in enumerate(points[:-1]):
+    for delta, label in events[point]:
+      active[label] = active.get(label, 0) + delta
+      if not active[label]:
+        del active[label]
+    if active:
+      pieces.setdefault(frozenset(active), []).append((point, points[i + 1] - 1))
+  
+  atoms: list['str | CharSet'] = []
+  coverage: dict['str | CharSet', list['str | CharSet']] = {label: [] for label in labels}
+  for members, ranges in pieces.items():
+    atom = simplify(CharSet(ranges))
+    atoms.append(atom)
+    for label in members:
+      coverage[label].append(atom)
+  atoms.sort(key=sortKey)
+  return atoms, coverage
+
+def jointAlphabet(*alphabets: Iterable['str | CharSet']) -> list['str | CharSet']:
+  """
+  Returns a sorted alphabet of disjoint symbols covering all the given ones.
+  """
+  labels = set().union(*alphabets)
+  if all(isinstance(label, str) for label in labels):
+    return sorted(labels)
+  return atomize(labels)[0]
+
+
+class Classifier:
+  """
+  Maps input characters to the disjoint atom containing them.
+  Lookups go through a binary search over the atom ranges once per distinct
+  character and are memoized after that.
+  """
+  starts: list[int]
+  ranges: list[tuple[int, int, 'str | CharSet']]
+  memo: dict[str, 'str | CharSet | None']
+  def __init__(self, atoms: Iterable['str | CharSet']):
+    self.ranges = sorted((lo, hi, atom) for atom in atoms for lo, hi in labelRanges(atom))
+    self.starts = [lo for lo, _, _ in self.ranges]
+    self.memo = dict()
+  
+  def classify(self, char: str) -> 'str | CharSet | None':
+    """
+    Returns the atom containing `char`, or None if no atom does.
+    """
+    if char in self.memo:
+      return self.memo[char]
+    atom = None
+    code = ord(char)
+    i = bisect_right(self.starts, code) - 1
+    if i >= 0 and code <= self.ranges[i][1]:
+      atom = self.ranges[i][2]
+    self.memo[char] = atom
+    return atom
@@ -0,0 +1,179 @@
+from array import array
+from typing import Iterator
+from ThompsonConstruction import TCNFA
+from BitParallelNFA import BitParallelNFA
+from EpsilonClosure import epsilonClosures
+from utils.bitset import fromBitmask
+
+
+class CompactNFA:
+  """
+  Frozen, array-backed (CSR) form of a TCNFA.
+  The symbol edges of state s are labels/targets in [symOffsets[s], symOffsets[s+1]),
+  its ε-edges are epsTargets in [epsOffsets[s], epsOffsets[s+1]).
+  Labels index into the sorted `alphabet` tuple. All arrays hold int32.
+  """
+  __slots__ = ("numStates", "alphabet", "symbolIds", "startState", "acceptState",
+               "symOffsets", "symLabels", "symTargets", "epsOffsets", "epsTargets", "closures", "simulator")
+  numStates: int
+  alphabet: tuple[str, ...]
+  symbolIds: dict[str, int]
+  startState: int
+  acceptState: int
+  symOffsets: array
+  symLabels: array
+  symTargets: array
+  epsOffsets: array
+  epsTargets: array
+  closures: list[int] | None
+  simulator: BitParallelNFA | None
+  
+  def __init__(self, numStates: int, alphabet: tuple[str, ...], symOffsets: array, symLabels: array, symTargets: array, epsOffsets: array, epsTargets: array, startState: int, acceptState: int):
+    if len(symOffsets) != numStates + 1 or len(epsOffsets) != numStates + 1:
+      raise ValueError("Offset arrays must hold numStates + 1 entries")
+    
+    fields = {
+      "numStates": numStates,
+      "alphabet": alphabet,
+      "symbolIds": {symbol: i for i, symbol in enumerate(alphabet)},
+      "startState": startState,
+      "acceptState": acceptState,
+      "symOffsets": symOffsets,
+      "symLabels": symLabels,
+      "symTargets": symTargets,
+      "epsOffsets": epsOffsets,
+      "epsTargets": epsTargets,
+      "closures": None,
+      "simulator": None,
+    }
+    for name, value in fields.items():
+      object.__setattr__(self, name, value)
+  
+  def __setattr__(self, name: str, value: object):
+    raise AttributeError("CompactNFA is immutable")
+  
+  @staticmethod
+  def fromTCNFA(nfa: 'TCNFA') -> 'CompactNFA':
+    """
+    Packs a TCNFA into flat offset/target arrays.
+    States must be numbered 0..n-1, as Thompson's construction produces.
+    """
+    n = len(nfa.states)
+    if nfa.states != set(range(n)):
+      raise ValueError("CompactNFA requires states numbered 0..n-1")
+    
+    alphabet = tuple(sorted(nfa.alphabet))
+    symbolIds = {symbol: i for i, symbol in enumerate(alphabet)}
+    
+    symEdges: list[list[tuple[int, int]]] = [[] for _ in range(n)]
+    epsEdges: list[list[int]] = [[] for _ in range(n)]
+    for (src, symbol), dest in nfa.transitions.items():
+      if symbol == 'ε':
+        epsEdges[src].extend(sorted(dest))
+      else:
+        symEdges[src].extend((symbolIds[symbol], d) for d in sorted(dest))
+    
+    symOffsets, symLabels, symTargets = array('i', [0]), array('i'), array('i')
+    epsOffsets, epsTargets = array('i', [0]), array('i')
+    for state in range(n):
+      for label, dest in sorted(symEdges[state]):
+        symLabels.append(label)
+        symTargets.append(dest)
+      symOffsets.append(len(symTargets))
+      epsTargets.extend(epsEdges[state])
+      epsOffsets.append(len(epsTargets))
+    
+    return CompactNFA(n, alphabet, symOffsets, symLabels, symTargets, epsOffsets, epsTargets, nfa.startState, nfa.acceptState)
+  
+  def toTCNFA(self) -> 'TCNFA':
+    """
+    Expands the compact form back into a mutable TCNFA.
+    """
+    transitions: dict[tuple[int, str], set[int]] = {}
+    for state in range(self.numStates):
+      for i in range(self.symOffsets[state], self.symOffsets[state + 1]):
+        transitions.setdefault((state, self.alphabet[self.symLabels[i]]), set()).add(self.symTargets[i])
+      eps = self.epsTargets[self.epsOffsets[state]:self.epsOffsets[state + 1]]
+      if eps:
+        transitions[(state, 'ε')] = set(eps)
+    
+    return TCNFA(
+      states=set(range(self.numStates)),
+      alphabet=set(self.alphabet),
+      transition=transitions,
+      startState=self.startState,
+      acceptState=self.acceptState
+    )
+  
+  @property
+  def states(self) -> range:
+    return range(self.numStates)
+  
+  def symbolEdges(self) -> Iterator[tuple[int, str, list[int]]]:
+    """
+    Yields (src, symbol, destinations) for every non-null edge.
+    """
+    for state in range(self.numStates):
+      for i in range(self.symOffsets[state], self.symOffsets[state + 1]):
+        yield state, self.alphabet[self.symLabels[i]], [self.symTargets[i]]
+  
+  def successors(self, state: int, symbol: str) -> list[int]:
+    """
+    Returns the states reachable from `state` on `symbol` (or 'ε').
+    """
+    if symbol == 'ε':
+      return self.epsTargets[self.epsOffsets[state]:self.epsOffsets[state + 1]].tolist()
+    label = self.symbolIds.get(symbol)
+    if label is None:
+      return []
+    return [self.symTargets[i] for i in range(self.symOffsets[state], self.symOffsets[state + 1]) if self.symLabels[i] == label]
+  
+  def nbytes(self) -> int:
+    """
+    Returns the number of bytes held by the edge arrays.
+    """
+    arrays = (self.symOffsets, self.symLabels, self.symTargets, self.epsOffsets, self.epsTargets)
+    return sum(len(a) * a.itemsize for a in arrays)
+  
+  def acceptMask(self) -> int:
+    return 1 << self.acceptState
+  
+  def closureTable(self) -> list[int]:
+    """
+    Returns the ε-closure bitset of every state, computed once on first use.
+    """
+    if self.closures is None:
+      offsets, targets = self.epsOffsets, self.epsTargets
+      object.__setattr__(self, "closures", epsilonClosures(self.numStates, lambda s: targets[offsets[s]:offsets[s + 1]]))
+    return self.closures
+  
+  def read(self, inputString: str) -> bool:
+    """
+    Reads an input string and checks if it is accepted by the NFA.
+    """
+    if self.simulator is None:
+      object.__setattr__(self, "simulator", BitParallelNFA(self))
+    return self.simulator.read(inputString)
+  
+  def nonDeterministicRead(self, state: int, cache: dict[int, set[int]] | None = None) -> set[int]:
+    """
+    Returns all null reachable states from the given state.
+    Caches in 'cache'
+    """
+    if cache is not None and state in cache:
+      return cache[state]
+    
+    reachableStates = fromBitmask(self.closureTable()[state])
+    if cache is not None:
+      cache[state] = reachableStates
+    return reachableStates
+  
+  def __str__(self) -> str:
+    return {
+      "states": self.numStates,
+      "alphabet": self.alphabet,
+      "symbolEdges": len(self.symTargets),
+      "nullEdges": len(self.epsTargets),
+      "start": self.startState,
+      "accept": self.acceptState
+    }.__str__()
@@ -0,0 +1,172 @@
+import numpy as np
+from typing import TYPE_CHECKING, Sequence
+from CharClass import CharSet, Classifier, labelRanges
+from Instrumentation import instrumented, instrumentedRead
+
+if TYPE_CHECKING:
+  from PowersetConstruction import DFA
+
+
+class CompiledDFA:
+  """
+  Dense, table-driven form of a PowersetConstruction.DFA.
+  `table` is an int32 (states + 1) x (symbols + 1) matrix: the extra row is a
+  rejecting sink and the extra column catches symbols outside the alphabet,
+  so unknown input rejects instead of raising. Every transition into a dead
+  state (one that cannot reach acceptance) is redirected to the sink, which
+  lets `read` stop as soon as the input is hopeless.
+  """
+  alphabet: list['str | CharSet']     # column -> symbol
+  columns: dict['str | CharSet', int] # symbol -> column
+  classifier: Classifier | None       # character -> CharSet symbol
+  byteColumns: np.ndarray       # byte / ASCII code -> column
+  table: np.ndarray             # row -> column -> row
+  accept: np.ndarray            # row -> is accepting
+  dead: np.ndarray              # row -> cannot reach an accepting state
+  states: list[int]             # row -> original DFA state
+  startState: int
+  sink: int
+  width: int
+  flat: list[int]               # table pre-multiplied by width, for `read`
+  byteTranslation: bytes | None
+  def __init__(self, dfa: 'DFA'):
+    self.states = sorted(dfa.states)
+    rows = {state: i for i, state in enumerate(self.states)}
+    self.alphabet = sorted(dfa.alphabet)
+    self.columns = {symbol: i for i, symbol in enumerate(self.alphabet)}
+    self.classifier = dfa.classifier
+    
+    n = len(self.states)
+    m = len(self.alphabet)
+    self.sink = n
+    self.width = m + 1
+    self.startState = rows[dfa.startState]
+    
+    table = np.full((n + 1, m + 1), self.sink, dtype=np.int32)
+    for (src, symbol), dest in dfa.transitions.items():
+      table[rows[src], self.columns[symbol]] = rows[dest]
+    
+    self.accept = np.zeros(n + 1, dtype=bool)
+    for state in dfa.acceptStates:
+      self.accept[rows[state]] = True
+    
+    self.dead = ~self.coReachable(table)
+    table[self.dead[table]] = self.sink
+    self.table = table
+    
+    self.byteColumns = np.full(256, m, dtype=np.int32)
+    for symbol, column in self.columns.items():
+      for lo, hi in labelRanges(symbol):
+        if lo < 256:
+          self.byteColumns[lo:min(hi, 255) + 1] = column
+    
+    self.flat = (table * self.width).ravel().tolist()
+    self.byteTranslation = bytes(self.byteColumns.tolist()) if self.width <= 256 else None
+    
+  def coReachable(self, table: np.ndarray) -> np.ndarray:
+    """
+    Marks the rows from which an accepting row can be reached.
+    """
+    reached = self.accept.copy()
+    while True:
+      step = reached | reached[table].any(axis=1)
+      if (step == reached).all():
+        return reached
+      reached = step
+      
+  def column(self, symbol: 'str | CharSet') -> int:
+    column = self.columns.get(symbol)
+    if column is None:
+      if self.classifier is not None and isinstance(symbol, str):
+        atom = self.classifier.classify(symbol)
+        if atom is not None:
+          return self.columns[atom]
+      return self.width - 1
+    return column
+  
+  def inputColumns(self, inputString: str | bytes) -> bytes | list[int]:
+    """
+    Maps every symbol (or byte) of the input to its column.
+    """
+    if isinstance(inputString, str):
+      try:
+        inputString = inputString.encode("latin-1")
+      except UnicodeEncodeError:
+        return [self.column(symbol) for symbol in inputString]
+    
+    if self.byteTranslation is None:
+      return self.byteColumns[np.frombuffer(inputString, dtype=np.uint8)].tolist()
+    return bytes(inputString).translate(self.byteTranslation)
+  
+  def advance(self, state: int, inputString: str | bytes) -> int:
+    """
+    Runs the input from row `state` and returns the row it ends in.
+    Stops early once the sink is reached.
+    """
+    flat = self.flat
+    width = self.width
+    sink = self.sink * width
+    state *= width
+    
+    for column in self.inputColumns(inputString):
+      state = flat[state + column]
+      if state == sink:
+        break
+    return state // width
+  
+  @instrumentedRead("read.compiled")
+  def read(self, inputString: str | bytes) -> bool:
+    """
+    Reads an input string (or bytes) and checks if it is accepted by the DFA.
+    """
+    return bool(self.accept[self.advance(self.startState, inputString)])
+  
+  def symbolColumns(self, codes: np.ndarray) -> np.ndarray:
+    """
+    Maps an array of byte values or code points to column ids.
+    """
+    if codes.dtype == np.uint8:
+      return self.byteColumns[codes]
+    columns = self.byteColumns[np.minimum(codes, 255)]
+    wide = codes > 255
+    if wide.any():
+      unique, inverse = np.unique(codes[wide], return_inverse=True)
+      columns[wide] = np.array([self.column(chr(c)) for c in unique.tolist()], dtype=np.int32)[inverse]
+    return columns
+  
+  @instrumented("read.batch", lambda accepted, *args: {"strings": len(accepted), "accepted": int(accepted.sum())})
+  def read_many(self, inputs: Sequence[str | bytes] | bytes, offsets: Sequence[int] | np.ndarray | None = None) -> np.ndarray:
+    """
+    Checks a whole batch of strings at once and returns a boolean array.
+    `inputs` is either a sequence of str (or of bytes), or one packed bytes buffer
+    with `offsets` (k + 1 entries) delimiting its k strings. All strings
+    advance together, one character position per step, with the shorter
+    ones dropping out once exhausted.
+    """
+    if offsets is None:
+      lengths = np.fromiter(map(len, inputs), dtype=np.int64, count=len(inputs))
+      if inputs and isinstance(inputs[0], str):
+        codes = np.frombuffer("".join(inputs).encode("utf-32-le"), dtype=np.uint32)
+      else:
+        codes = np.frombuffer(b"".join(inputs), dtype=np.uint8)
+      starts = np.zeros(len(lengths), dtype=np.int64)
+      np.cumsum(lengths[:-1], out=starts[1:])
+    else:
+      bounds = np.asarray(offsets, dtype=np.int64)
+      starts = bounds[:-1]
+      lengths = np.diff(bounds)
+      codes = np.frombuffer(inputs, dtype=np.uint8)
+    
+    columns = self.symbolColumns(codes)
+    order = np.argsort(-lengths, kind="stable")    # longest first, so live strings form a prefix
+    starts = starts[order]
+    lengths = lengths[order]
+    live = np.searchsorted(-lengths, -np.arange(int(lengths.max(initial=0))), side="left")
+    
+    states = np.full(len(lengths), self.startState, dtype=np.int32)
+    for step, count in enumerate(live.tolist()):
+      states[:count] = self.table[states[:count], columns[starts[:count] + step]]
+    
+    accepted = np.empty(len(lengths), dtype=bool)
+    accepted[order] = self.accept[states]
+    return accepted
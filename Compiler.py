@@ -0,0 +1,122 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Iterable
+from Hopcroft import Hopcroft
+from PowersetConstruction import DFA, PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+from GlushkovConstruction import GlushkovConstruction
+from Instrumentation import instrumented
+
+# NFA construction backends, by name
+backends = {
+  "thompson": lambda regex: ThompsonConstruction(regex, simplify=True).toNFA(),
+  "glushkov": lambda regex: GlushkovConstruction(regex, simplify=True).toNFA(),
+}
+
+@instrumented("compile")
+def compileUncached(regex: str, backend: str = "thompson") -> 'DFA':
+  """
+  Runs the full regex -> NFA -> DFA -> minimized DFA pipeline, with the
+  AST simplified and the alphabet compressed into symbol classes.
+  `backend` names the NFA construction, see `backends`.
+  """
+  if backend not in backends:
+    raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(backends)}")
+  nfa = backends[backend](regex)
+  dfa = PowersetConstruction(nfa, compressAlphabet=True).toDFA()
+  return Hopcroft(dfa).minimize()
+
+def approximateSize(dfa: 'DFA') -> int:
+  """
+  Estimates the bytes held by a DFA's states, accept set and transition map.
+  """
+  size = sys.getsizeof(dfa.states) + sys.getsizeof(dfa.acceptStates) + sys.getsizeof(dfa.transitions)
+  if dfa.transitions:
+    key = next(iter(dfa.transitions))
+    size += len(dfa.transitions) * sys.getsizeof(key)
+  return size
+
+
+class PatternCache:
+  """
+  Thread-safe LRU cache of compiled patterns, bounded by entry count and by
+  the approximate memory of the cached DFAs. Patterns are compiled outside
+  the lock, so a slow compile never blocks lookups of other patterns.
+  """
+  maxEntries: int
+  maxBytes: int
+  entries: OrderedDict[tuple[str, str], tuple['DFA', int]]    # (regex, backend) -> (DFA, approximate size), oldest first
+  bytes: int
+  hits: int
+  misses: int
+  evictions: int
+  def __init__(self, maxEntries: int = 1024, maxBytes: int = 64 << 20):
+    self.maxEntries = maxEntries
+    self.maxBytes = maxBytes
+    self.entries = OrderedDict()
+    self.bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.lock = threading.Lock()
+    
+  def get(self, regex: str, backend: str = "thompson") -> 'DFA':
+    """
+    Returns the minimized DFA for `regex`, compiling it with `backend` on a miss.
+    """
+    key = (regex, backend)
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is not None:
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+      self.misses += 1
+    
+    dfa = compileUncached(regex, backend)
+    size = approximateSize(dfa)
+    
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is not None:                       # compiled concurrently by another thread
+        self.entries.move_to_end(key)
+        return entry[0]
+      self.entries[key] = (dfa, size)
+      self.bytes += size
+      while len(self.entries) > self.maxEntries or (self.bytes > self.maxBytes and len(self.entries) > 1):
+        _, (_, evicted) = self.entries.popitem(last=False)
+        self.bytes -= evicted
+        self.evictions += 1
+    return dfa
+  
+  def warm(self, patterns: Iterable[str], backend: str = "thompson"):
+    """
+    Compiles every pattern ahead of time with `backend`.
+    """
+    for regex in patterns:
+      self.get(regex, backend)
+      
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
+      self.bytes = 0
+      
+  def stats(self) -> dict[str, int]:
+    with self.lock:
+      return {
+        "entries": len(self.entries),
+        "bytes": self.bytes,
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions
+      }
+
+
+defaultCache = PatternCache()
+
+def compile(regex: str, cache: PatternCache | None = None, backend: str = "thompson") -> 'DFA':
+  """
+  Compiles `regex` into a minimized DFA, reusing it from the cache when possible.
+  """
+  return (cache or defaultCache).get(regex, backend)
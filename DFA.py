@@ -1,5 +1,6 @@
 from typing import Callable, Literal
 import queue
+import numpy as np
 
 class DFA():
   stateMap: dict[str, int] = dict()   # map literal state to standard id
@@ -12,8 +13,12 @@ class DFA():
   trapState: int | None = None
   trapStateSym = "Z"
   acceptState: set[str] = set()
-  def __init__(self, states: list[str], alphabet: list[str], transitions: dict[str, list[str | None]], initialState: str, acceptStates: set[str]):
+  verbose: bool                       # print the state map and state tables as they change
+  def __init__(self, states: list[str], alphabet: list[str], transitions: dict[str, list[str | None]], initialState: str, acceptStates: set[str], verbose: bool = False):
     self.states = states
+    self.verbose = verbose
+    self.stateMap = dict()
+    self.stateMapRev = dict()
     self.alphabet = alphabet
     self.initialState = initialState
     self.acceptState = acceptStates
@@ -24,7 +29,8 @@ class DFA():
     self.alphabetMap = dict([(alphabet[i], i) for i in range(m)])
     self.transitions = self.standardizeFSA(transitions)
     
-    self.drawStateTable()
+    if self.verbose:
+      self.drawStateTable()
         
           
   def standardizeFSA(self, transitions: dict[str, list[str | None]]) -> list[list[int]]:
@@ -66,57 +72,61 @@ class DFA():
       transitionsMatrix.append(transition)
       
     self.trapState = trapState
-    print(self.stateMap)
-    print(f'trapState Z = {trapState}')
+    if self.verbose:
+      print(self.stateMap)
+      print(f'trapState Z = {trapState}')
     
     return transitionsMatrix
   
   def generateEquivalence(self, printout: bool = False) -> list[int]:
+    """
+    Moore partition refinement over the transition matrix.
+    Each round gathers the successor classes of every state as an n x m
+    integer matrix and re-numbers the classes by their unique
+    (class, successor classes) rows, in order of first appearance.
+    Rounds are only kept when a printout is requested.
+    """
     n = len(self.transitions)
     m = len(self.alphabet)
-    equivalence: list[list[int]] = [[1 if self.isAcceptState(x) else 0 for x in range(n)]]
-    keys: list[list[list[int]]] = [self.transitions]
+    table = np.array(self.transitions, dtype=np.int64).reshape(n, m)
+    equivalence = np.array([1 if self.isAcceptState(x) else 0 for x in range(n)], dtype=np.int64)
+    rounds: list[tuple[np.ndarray, np.ndarray]] = [(table, equivalence)] if printout else []
 
-    i = 0   # counter for current equivalence generated
-    while i < 1 or equivalence[i] != equivalence[i - 1]:
-      patternDict: dict[str, int] = dict()
-      patterns: list[str] = list()
-      newTransitions: list[list[int]] = []
-      currentId = 0   #id attach to a pattern
-      for j in range(n):
-        pattern = f"{equivalence[i][j]}"
-        newTransition = []
-        for k in range(m):
-          pattern += str(equivalence[i][self.transitionFunc(j, k)])
-          newTransition.append(equivalence[i][self.transitionFunc(j, k)])
-        newTransitions.append(newTransition)
-        patterns.append(pattern)
-        if pattern not in patternDict:
-          patternDict[pattern] = currentId
-          currentId += 1
-      keys.append(newTransitions)
-      equivalence.append([patternDict[p] for p in patterns])
-      i += 1
-    
-    
+    while True:
+      successors = equivalence[table]
+      rows = np.column_stack((equivalence, successors))
+      _, firstSeen, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+      order = np.empty(len(firstSeen), dtype=np.int64)    # ids by first appearance, as before
+      order[np.argsort(firstSeen)] = np.arange(len(firstSeen))
+      refined = order[inverse.reshape(-1)]
+      if printout:
+        rounds.append((successors, refined))
+      if np.array_equal(refined, equivalence):
+        break
+      equivalence = refined
+
+    if printout:
+      self.printEquivalence(rounds)
+
+    return equivalence.tolist()
+  
+  def printEquivalence(self, rounds: list[tuple[np.ndarray, np.ndarray]]):
+    n = len(self.transitions)
+    m = len(self.alphabet)
+    i = len(rounds) - 1
     separator = "+" + "+".join("-" * (3) for _ in range((i + 1) * (m + 1) + 1)) + "+"
     header = "    |" + "|".join([f"{itm}" for j in range(i + 1) for itm in [*[f" {k} " for k in range(m)], f" \u2261{chr(0x2080 + j)}"]]) + "|"
-    row: Callable[[int], str] = lambda x: f"  {x} " + "|" + "|".join([f" {itm} " for j in range(i + 1) for itm in [*[ keys[j][x][l] for l in range(m)], equivalence[j][x]]]) + "|"
+    row: Callable[[int], str] = lambda x: f"  {x} " + "|" + "|".join([f" {itm} " for keys, equivalence in rounds for itm in [*[keys[x][l] for l in range(m)], equivalence[x]]]) + "|"
 
-    if printout:
-      print({"equiv": equivalence})
-      print(header)
+    print({"equiv": [equivalence.tolist() for _, equivalence in rounds]})
+    print(header)
+    print(separator)
+    for _i in range(n):
+      print(row(_i))
       print(separator)
-      for _i in range(n):
-        
-        print(row(_i))
-        print(separator)
-        
-    return equivalence[i]
     
-  
   def removeEquivalentStates(self):
-    equivalence = self.generateEquivalence(printout=True)
+    equivalence = self.generateEquivalence(printout=self.verbose)
     group: dict[int, list[int]] = {}  # group state by equivalence class
     remap: dict[int, int] = {}
     for (idx, equ) in enumerate(equivalence):
@@ -128,7 +138,8 @@ class DFA():
     
     self.remapFSA(group, remap)
     
-    self.drawStateTable()
+    if self.verbose:
+      self.drawStateTable()
         
   def isAcceptState(self, S: int) -> bool:
     if S in self.stateMapRev and self.stateMapRev[S] in self.acceptState:
@@ -137,7 +148,6 @@ class DFA():
   
   def drawStateTable(self):
     m = len(self.alphabet)
-    print(m)
     separator = "+" + "+".join("-" * (3) for i in range(m + 1)) + "+"
     header = "    " + "|" + "|".join(f" {self.alphabet[i]} " for i in range(m)) + "|"
     row: Callable[[int, str], str] = lambda x, y: f" {x}  " + "|" + "|".join(f" {self.transitionFunc(x, i)} " for i in range(m)) + "|" + f" {y}"
@@ -157,9 +167,8 @@ class DFA():
     
   def remapFSA(self, group: dict[int, list[int]], remap: dict[int, int]):
     
-    self.transitions = [[remap[self.transitions[i][j]] for j in range(len(self.alphabet))]
-                      for i in range(len(self.transitions))
-                      if i in group]  # remove empty transitions
+    self.transitions = [[remap[self.transitions[v[0]][j]] for j in range(len(self.alphabet))]
+                      for _, v in sorted(group.items())]  # one row per class, taken from its first state
 
     
     newStateMap: dict[str, int] = {}
@@ -197,22 +206,24 @@ class DFA():
       return "accept" 
     return "reject"
   
-nfa1 = DFA(
-  states=["A", "B"],
-  alphabet=["0", "1"],
-  transitions={
-    "A": ["A", "B"]
-  },
-  initialState="A",
-  acceptStates={"A"}
-)
-string = "111111"
-
-print(f"{string} -> {nfa1.read(string)}")
-nfa1.removeEquivalentStates()
-print(f"{string} -> {nfa1.read(string)}")
-nfa1.removeEquivalentStates()
-print(f"{string} -> {nfa1.read(string)}")
+if __name__ == "__main__":
+  nfa1 = DFA(
+    states=["A", "B"],
+    alphabet=["0", "1"],
+    transitions={
+      "A": ["A", "B"]
+    },
+    initialState="A",
+    acceptStates={"A"},
+    verbose=True
+  )
+  string = "111111"
+  
+  print(f"{string} -> {nfa1.read(string)}")
+  nfa1.removeEquivalentStates()
+  print(f"{string} -> {nfa1.read(string)}")
+  nfa1.removeEquivalentStates()
+  print(f"{string} -> {nfa1.read(string)}")
 
 
 # nfa2 = DFA(
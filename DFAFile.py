@@ -0,0 +1,196 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from CharClass import CharSet, labelRanges
+from CompiledDFA import CompiledDFA
+from PowersetConstruction import DFA
+
+# +--------------------------------------------------------------------------+
+# |                    Compiled DFA file format, version 1                   |
+# +--------------------------------------------------------------------------+
+# | header    | magic "ADFA", u16 version, u16 flags, u32 rows, u32 columns, |
+# |           | u32 start row, u32 sink row, u32 alphabet section length     |
+# | alphabet  | per symbol column: u32 n, then n (u32 lo, u32 hi) code point |
+# |           | ranges; the last column (symbols outside the alphabet) has   |
+# |           | no entry                                                     |
+# | table     | rows x columns int32 next rows, 4-byte aligned               |
+# | accept    | one bit per row, least significant bit first                 |
+# +--------------------------------------------------------------------------+
+# All integers are little-endian.
+
+MAGIC = b"ADFA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIII")
+
+
+def save(dfa: 'DFA | CompiledDFA', path: str):
+  """
+  Writes the compiled form of a DFA to `path`.
+  """
+  if isinstance(dfa, DFA):
+    dfa = dfa.compile()
+  rows, columns = dfa.table.shape
+  
+  alphabet = bytearray()
+  for label in dfa.alphabet:
+    if not isinstance(label, CharSet) and len(label) != 1:
+      raise ValueError(f"Cannot serialize multi-character symbol '{label}'")
+    ranges = labelRanges(label)
+    alphabet += struct.pack("<I", len(ranges))
+    for lo, hi in ranges:
+      alphabet += struct.pack("<II", lo, hi)
+  
+  header = HEADER.pack(MAGIC, VERSION, 0, rows, columns, dfa.startState, dfa.sink, len(alphabet))
+  padding = -(len(header) + len(alphabet)) % 4
+  accept = bytearray((rows + 7) // 8)
+  for row in range(rows):
+    if dfa.accept[row]:
+      accept[row >> 3] |= 1 << (row & 7)
+  
+  with open(path, "wb") as f:
+    f.write(header)
+    f.write(alphabet)
+    f.write(b"\0" * padding)
+    f.write(dfa.table.astype("<i4").tobytes())
+    f.write(accept)
+
+
+class MappedDFA:
+  """
+  A compiled DFA read straight from a memory-mapped file.
+  The transition table and accept bitmap stay in the mapped buffer; only
+  the alphabet is decoded into a symbol -> column lookup.
+  """
+  rows: int
+  width: int
+  startState: int
+  sink: int
+  table: memoryview | array     # flat rows x width table of next rows
+  accept: memoryview
+  byteTranslation: bytes | None
+  byteColumns: list[int]
+  wideStarts: list[int]         # sorted starts of code point ranges above 255
+  wideRanges: list[tuple[int, int, int]]
+  def __init__(self, path: str):
+    self.file = open(path, "rb")
+    try:
+      self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:                # empty files cannot be mapped
+      self.file.close()
+      raise ValueError("File is too short to be a compiled DFA") from None
+    
+    if len(self.buffer) < HEADER.size:
+      self.close()
+      raise ValueError("File is too short to be a compiled DFA")
+    magic, version, _, self.rows, self.width, self.startState, self.sink, alphabetLength = HEADER.unpack_from(self.buffer, 0)
+    if magic != MAGIC:
+      self.close()
+      raise ValueError("File is not a compiled DFA")
+    if version != VERSION:
+      self.close()
+      raise ValueError(f"Unsupported compiled DFA version {version}")
+    
+    alphabetEnd = HEADER.size + alphabetLength
+    tableStart = alphabetEnd + -alphabetEnd % 4
+    tableEnd = tableStart + 4 * self.rows * self.width
+    if len(self.buffer) < tableEnd + (self.rows + 7) // 8 or self.width < 1 or self.startState >= self.rows or self.sink >= self.rows:
+      self.close()
+      raise ValueError("Compiled DFA file is truncated or corrupt")
+    
+    self.byteColumns = [self.width - 1] * 256
+    wide: list[tuple[int, int, int]] = []
+    offset = HEADER.size
+    for column in range(self.width - 1):
+      if offset + 4 > alphabetEnd:
+        self.close()
+        raise ValueError("Compiled DFA file has a corrupt alphabet section")
+      (count,) = struct.unpack_from("<I", self.buffer, offset)
+      offset += 4
+      if offset + 8 * count > alphabetEnd:
+        self.close()
+        raise ValueError("Compiled DFA file has a corrupt alphabet section")
+      for _ in range(count):
+        lo, hi = struct.unpack_from("<II", self.buffer, offset)
+        offset += 8
+        for code in range(lo, min(hi, 255) + 1):
+          self.byteColumns[code] = column
+        if hi > 255:
+          wide.append((max(lo, 256), hi, column))
+    wide.sort()
+    self.wideRanges = wide
+    self.wideStarts = [lo for lo, _, _ in wide]
+    self.byteTranslation = bytes(self.byteColumns) if self.width <= 256 else None
+    
+    self.view = memoryview(self.buffer)
+    if sys.byteorder == "little":
+      self.table = self.view[tableStart:tableEnd].cast("i")
+    else:
+      self.table = array("i", self.view[tableStart:tableEnd].tobytes())
+      self.table.byteswap()
+    self.accept = self.view[tableEnd:tableEnd + (self.rows + 7) // 8]
+    
+  def column(self, symbol: str) -> int:
+    code = ord(symbol)
+    if code < 256:
+      return self.byteColumns[code]
+    i = bisect_right(self.wideStarts, code) - 1
+    if i >= 0 and code <= self.wideRanges[i][1]:
+      return self.wideRanges[i][2]
+    return self.width - 1
+  
+  def isAccepting(self, row: int) -> bool:
+    return bool(self.accept[row >> 3] >> (row & 7) & 1)
+  
+  def read(self, inputString: str | bytes) -> bool:
+    """
+    Reads an input string (or bytes) and checks if it is accepted by the DFA.
+    """
+    table = self.table
+    width = self.width
+    sink = self.sink
+    state = self.startState
+    
+    if isinstance(inputString, str):
+      try:
+        inputString = inputString.encode("latin-1")
+      except UnicodeEncodeError:
+        for symbol in inputString:
+          state = table[state * width + self.column(symbol)]
+          if state == sink:
+            break
+        return self.isAccepting(state)
+    
+    codes = bytes(inputString).translate(self.byteTranslation) if self.byteTranslation else [self.byteColumns[b] for b in bytes(inputString)]
+    for column in codes:
+      state = table[state * width + column]
+      if state == sink:
+        break
+    return self.isAccepting(state)
+  
+  def close(self):
+    """
+    Releases the mapped buffer and the file.
+    """
+    if getattr(self, "view", None) is not None:
+      if isinstance(self.table, memoryview):
+        self.table.release()
+      self.accept.release()
+      self.view.release()
+      self.view = None
+    self.buffer.close()
+    self.file.close()
+    
+  def __enter__(self) -> 'MappedDFA':
+    return self
+  
+  def __exit__(self, *args):
+    self.close()
+
+
+def load(path: str) -> MappedDFA:
+  """
+  Memory-maps a compiled DFA written by `save`.
+  """
+  return MappedDFA(path)
@@ -0,0 +1,179 @@
+from CharClass import CharSet, Classifier, jointAlphabet, representative
+from RegexParser import Node, Empty, Symbol, Concat, Alternation, Star, Plus, Option, Repeat, parse
+from Simplify import Simplifier
+from PowersetConstruction import DFA, StateLimitError
+from Instrumentation import instrumented, dfaCounters
+
+SPAN = (0, 0)     # derived terms have no source span
+
+
+class DerivativeConstruction:
+  """
+  Builds a DFA straight from the regex with Brzozowski derivatives: the
+  state reached after reading w is the derivative of the regex by w, and
+  a state accepts when its term is nullable. Terms are hash-consed by a
+  Simplifier and alternations are flattened, deduplicated and put in a
+  fixed order (similarity up to associativity, commutativity and
+  idempotence), so each distinct term is one state and the DFA is usually
+  close to minimal. The empty language is the term None.
+  States and transitions are created lazily, by `read` or by `toDFA`.
+  """
+  simplifier: Simplifier
+  root: Node
+  alphabet: list['str | CharSet']         # disjoint symbols, derivatives are taken by one per symbol
+  classifier: Classifier                 # input character -> symbol
+  terms: list[Node | None]                # state -> term
+  stateIds: dict[int, int]                # id(term) -> state
+  transitions: dict[tuple[int, 'str | CharSet'], int]
+  derivatives: dict[tuple[int, 'str | CharSet'], Node | None]   # (id(term), symbol) -> derivative
+  order: dict[int, int]                   # id(term) -> rank used to sort alternatives
+  def __init__(self, regex: str):
+    self.simplifier = Simplifier()
+    self.root = self.simplifier.simplify(parse(regex))
+    self.alphabet = jointAlphabet(symbolLabels(self.root))
+    self.classifier = Classifier(self.alphabet)
+    self.terms = []
+    self.stateIds = dict()
+    self.transitions = dict()
+    self.derivatives = dict()
+    self.order = dict()
+    self.state(self.root)
+  
+  def state(self, term: Node | None) -> int:
+    """
+    Returns the state of a term, creating it on first sight.
+    """
+    state = self.stateIds.get(id(term))
+    if state is None:
+      state = self.stateIds[id(term)] = len(self.terms)
+      self.terms.append(term)
+    return state
+  
+  def isAccepting(self, state: int) -> bool:
+    term = self.terms[state]
+    return term is not None and self.simplifier.nullable[id(term)]
+  
+  def successor(self, state: int, symbol: 'str | CharSet') -> int:
+    """
+    Returns the state reached from `state` on `symbol`, deriving it if needed.
+    """
+    target = self.transitions.get((state, symbol))
+    if target is None:
+      target = self.transitions[(state, symbol)] = self.state(self.derive(self.terms[state], symbol))
+    return target
+  
+  def concat(self, first: Node | None, second: Node | None) -> Node | None:
+    if first is None or second is None:
+      return None
+    return self.simplifier.concat([first, second], SPAN)
+  
+  def union(self, terms: list[Node | None]) -> Node | None:
+    """
+    Builds the alternation of `terms` in canonical form. Unlike
+    Simplifier.alternation it never factors prefixes, which would give one
+    language several shapes and so several states.
+    """
+    parts: dict[int, Node] = {}
+    for term in terms:
+      if term is not None:
+        for part in (term.items if isinstance(term, Alternation) else (term,)):
+          parts[id(part)] = part
+    if not parts:
+      return None
+    ordered = sorted(parts.values(), key=lambda part: self.order.setdefault(id(part), len(self.order)))
+    if len(ordered) == 1:
+      return ordered[0]
+    return self.simplifier.intern(Alternation(tuple(ordered)))
+  
+  def derive(self, term: Node | None, symbol: 'str | CharSet') -> Node | None:
+    """
+    Returns the derivative of `term` by any character of `symbol`.
+    """
+    if term is None:
+      return None
+    key = (id(term), symbol)
+    if key in self.derivatives:
+      return self.derivatives[key]
+    
+    simplifier = self.simplifier
+    if isinstance(term, Empty):
+      result = None
+    elif isinstance(term, Symbol):
+      char = representative(symbol)
+      matched = char == term.label if isinstance(term.label, str) else char in term.label
+      result = simplifier.intern(Empty()) if matched else None
+    elif isinstance(term, Concat):
+      head, rest = term.items[0], simplifier.concat(list(term.items[1:]), SPAN)
+      result = self.concat(self.derive(head, symbol), rest)
+      if simplifier.nullable[id(head)]:
+        result = self.union([result, self.derive(rest, symbol)])
+    elif isinstance(term, Alternation):
+      result = self.union([self.derive(item, symbol) for item in term.items])
+    elif isinstance(term, (Star, Plus)):
+      result = self.concat(self.derive(term.item, symbol), simplifier.star(term.item, SPAN))
+    elif isinstance(term, Option):
+      result = self.derive(term.item, symbol)
+    else:
+      remaining = simplifier.repeat(term.item, max(term.low - 1, 0), None if term.high is None else term.high - 1, SPAN)
+      result = self.concat(self.derive(term.item, symbol), remaining)
+    self.derivatives[key] = result
+    return result
+  
+  def read(self, inputString: str) -> bool:
+    """
+    Reads an input string, deriving only the states it reaches.
+    """
+    state = 0
+    for char in inputString:
+      symbol = self.classifier.classify(char)
+      if symbol is None:
+        return False
+      state = self.successor(state, symbol)
+      if self.terms[state] is None:
+        return False
+    return self.isAccepting(state)
+  
+  @instrumented("derivative", lambda dfa, construction, *args, **kwargs: {**dfaCounters(dfa), "derivatives": len(construction.derivatives)})
+  def toDFA(self, maxStates: int | None = None) -> 'DFA':
+    """
+    Derives every reachable state and returns the complete DFA; the empty
+    language term, if reached, is its trap state.
+    Raises StateLimitError as soon as more than `maxStates` states exist.
+    """
+    done = 0
+    while done < len(self.terms):
+      for symbol in self.alphabet:
+        self.successor(done, symbol)
+        if maxStates is not None and len(self.terms) > maxStates:
+          raise StateLimitError(f"Derivative construction exceeded {maxStates} states")
+      done += 1
+    
+    states = set(range(len(self.terms)))
+    return DFA(
+      states=states,
+      alphabet=set(self.alphabet),
+      transition={(state, symbol): self.transitions[(state, symbol)] for state in states for symbol in self.alphabet},
+      startState=0,
+      acceptStates={state for state in states if self.isAccepting(state)}
+    )
+
+
+def symbolLabels(root: Node) -> set['str | CharSet']:
+  """
+  Returns the labels of every symbol in an AST.
+  """
+  labels: set['str | CharSet'] = set()
+  seen: set[int] = set()
+  work = [root]
+  while work:
+    node = work.pop()
+    if id(node) in seen:
+      continue
+    seen.add(id(node))
+    if isinstance(node, Symbol):
+      labels.add(node.label)
+    elif isinstance(node, (Concat, Alternation)):
+      work.extend(node.items)
+    elif not isinstance(node, Empty):
+      work.append(node.item)
+  return labels
@@ -0,0 +1,98 @@
+from typing import Callable, Iterable
+
+
+def components(numStates: int, nullSuccessors: Callable[[int], Iterable[int]]) -> tuple[list[int], list[list[int]]]:
+  """
+  Collapses ε-cycles with Tarjan's strongly connected components algorithm,
+  iteratively. Returns the component of every state and the members of
+  every component, numbered in reverse topological order.
+  """
+  index = [-1] * numStates
+  low = [0] * numStates
+  onStack = [False] * numStates
+  component = [-1] * numStates
+  groups: list[list[int]] = []    # component -> members
+  stack: list[int] = []
+  counter = 0
+  
+  for root in range(numStates):
+    if index[root] != -1:
+      continue
+    
+    index[root] = low[root] = counter
+    counter += 1
+    stack.append(root)
+    onStack[root] = True
+    work = [(root, iter(nullSuccessors(root)))]
+    
+    while work:
+      state, pending = work[-1]
+      for dest in pending:
+        if index[dest] == -1:
+          index[dest] = low[dest] = counter
+          counter += 1
+          stack.append(dest)
+          onStack[dest] = True
+          work.append((dest, iter(nullSuccessors(dest))))
+          break
+        elif onStack[dest]:
+          low[state] = min(low[state], index[dest])
+      else:
+        work.pop()
+        if work:
+          parent = work[-1][0]
+          low[parent] = min(low[parent], low[state])
+        if low[state] != index[state]:
+          continue
+        
+        # state is the root of a component, pop its members
+        id = len(groups)
+        members: list[int] = []
+        while True:
+          member = stack.pop()
+          onStack[member] = False
+          component[member] = id
+          members.append(member)
+          if member == state:
+            break
+        groups.append(members)
+  
+  return component, groups
+
+def epsilonClosures(numStates: int, nullSuccessors: Callable[[int], Iterable[int]]) -> list[int]:
+  """
+  Computes the ε-closure of every state in one pass over the components:
+  each closure is its own members plus the closures of the components it
+  reaches, which are already complete. Returns a table indexed by state
+  whose entries are bitsets (states of one component share the same int).
+  """
+  component, groups = components(numStates, nullSuccessors)
+  closures: list[int] = []        # component -> closure bitset
+  for id, members in enumerate(groups):
+    closure = 0
+    for member in members:
+      closure |= 1 << member
+    for member in members:
+      for dest in nullSuccessors(member):
+        if component[dest] != id:
+          closure |= closures[component[dest]]
+    closures.append(closure)
+  
+  return [closures[c] for c in component]
+
+def closureSets(numStates: int, nullSuccessors: Callable[[int], Iterable[int]]) -> list[frozenset[int]]:
+  """
+  Like epsilonClosures, but every closure is a frozenset, which stays
+  proportional to the closure's size instead of the largest state id.
+  """
+  component, groups = components(numStates, nullSuccessors)
+  closures: list[frozenset[int]] = []
+  for id, members in enumerate(groups):
+    closure = set(members)
+    for member in members:
+      for dest in nullSuccessors(member):
+        if component[dest] != id:
+          closure.update(closures[component[dest]])
+    closures.append(frozenset(closure))
+  
+  return [closures[c] for c in component]
@@ -0,0 +1,121 @@
+from typing import Hashable
+from BitParallelNFA import BitParallelNFA
+from CharClass import jointAlphabet, representative
+from PowersetConstruction import DFA
+from ProductConstruction import ProductConstruction
+from ThompsonConstruction import TCNFA
+
+
+class UnionFind:
+  """
+  Disjoint sets with path halving and union by size.
+  """
+  parent: dict[Hashable, Hashable]
+  size: dict[Hashable, int]
+  def __init__(self):
+    self.parent = dict()
+    self.size = dict()
+    
+  def find(self, x: Hashable) -> Hashable:
+    parent = self.parent
+    if x not in parent:
+      parent[x] = x
+      self.size[x] = 1
+      return x
+    while parent[x] != x:
+      parent[x] = parent[parent[x]]
+      x = parent[x]
+    return x
+  
+  def union(self, x: Hashable, y: Hashable) -> bool:
+    """
+    Merges the sets of x and y, returns False if they were already one set.
+    """
+    x, y = self.find(x), self.find(y)
+    if x == y:
+      return False
+    if self.size[x] < self.size[y]:
+      x, y = y, x
+    self.parent[y] = x
+    self.size[x] += self.size[y]
+    return True
+
+
+def equivalent(dfa1: 'DFA', dfa2: 'DFA') -> tuple[bool, str | None]:
+  """
+  Checks if two DFAs accept the same language (Hopcroft-Karp).
+  Pairs of states that must be equivalent are merged with union-find from
+  the pair of start states; a merged pair with different acceptance disproves
+  equivalence, which takes near-linear time in the number of states.
+  Returns (True, None), or (False, a shortest string only one DFA accepts).
+  """
+  left, right = dfa1.compile(), dfa2.compile()
+  alphabet = jointAlphabet(dfa1.alphabet, dfa2.alphabet)
+  columns = [(left.column(representative(symbol)), right.column(representative(symbol))) for symbol in alphabet]
+  leftTable, rightTable = left.table.tolist(), right.table.tolist()
+  leftAccept, rightAccept = left.accept.tolist(), right.accept.tolist()
+  offset = left.sink + 1                # right rows follow the left ones
+  
+  sets = UnionFind()
+  sets.union(left.startState, offset + right.startState)
+  pending = [(left.startState, right.startState)]
+  while pending:
+    p, q = pending.pop()
+    if leftAccept[p] != rightAccept[q]:
+      # union-find order gives no length guarantee, search the product for a shortest one
+      return False, ProductConstruction(dfa1, dfa2, lambda a, b: a != b).witness()
+    leftRow, rightRow = leftTable[p], rightTable[q]
+    for a, b in columns:
+      if sets.union(leftRow[a], offset + rightRow[b]):
+        pending.append((leftRow[a], rightRow[b]))
+  return True, None
+
+
+def equivalentNFA(nfa1: 'TCNFA', nfa2: 'TCNFA') -> tuple[bool, str | None]:
+  """
+  Checks if two NFAs accept the same language without determinizing either.
+  Runs the same union-find check on subsets of states (bitsets), which are
+  only computed when the check reaches them.
+  Returns (True, None), or (False, a shortest string only one NFA accepts).
+  """
+  first, second = BitParallelNFA(nfa1), BitParallelNFA(nfa2)
+  alphabet = [representative(symbol) for symbol in jointAlphabet(nfa1.alphabet, nfa2.alphabet)]
+  
+  sets = UnionFind()
+  sets.union((0, first.startMask), (1, second.startMask))
+  pending = [(first.startMask, second.startMask)]
+  while pending:
+    p, q = pending.pop()
+    if bool(p & first.acceptMask) != bool(q & second.acceptMask):
+      return False, subsetWitness(first, second, alphabet)
+    for symbol in alphabet:
+      nextP, nextQ = first.step(p, first.symbolFor(symbol)), second.step(q, second.symbolFor(symbol))
+      if sets.union((0, nextP), (1, nextQ)):
+        pending.append((nextP, nextQ))
+  return True, None
+
+def subsetWitness(first: BitParallelNFA, second: BitParallelNFA, alphabet: list[str]) -> str | None:
+  """
+  Breadth-first search over pairs of subsets for a shortest string accepted
+  by exactly one of the two NFAs. `alphabet` holds one character per symbol.
+  """
+  start = (first.startMask, second.startMask)
+  parents: dict[tuple[int, int], tuple[tuple[int, int], str] | None] = {start: None}
+  pending = [start]
+  
+  done = 0
+  while done < len(pending):
+    pair = pending[done]
+    if bool(pair[0] & first.acceptMask) != bool(pair[1] & second.acceptMask):
+      symbols: list[str] = []
+      while parents[pair] is not None:
+        pair, symbol = parents[pair]
+        symbols.append(symbol)
+      return "".join(reversed(symbols))
+    for symbol in alphabet:
+      nextPair = (first.step(pair[0], first.symbolFor(symbol)), second.step(pair[1], second.symbolFor(symbol)))
+      if nextPair not in parents:
+        parents[nextPair] = (pair, symbol)
+        pending.append(nextPair)
+    done += 1
+  return None
@@ -0,0 +1,167 @@
+from typing import Iterator
+from CharClass import CharSet
+from RegexParser import Node, Empty, Symbol, Concat, Alternation, Star, Plus, Option, Repeat, parse
+from Simplify import Simplifier
+from BitParallelNFA import BitParallelNFA
+from utils.bitset import iterBits, toBitmask
+from Instrumentation import instrumented, nfaCounters, instrumentedRead
+
+
+class GlushkovConstruction:
+  """
+  Builds the position (Glushkov) automaton of a regex: one state per symbol
+  occurrence in the regex plus a start state, and no ε-transitions.
+  The nullable/first/last sets of every subexpression come from one
+  post-order pass over the AST, during which follow sets are filled in.
+  """
+  ast: Node
+  labels: list['str | CharSet']    # position - 1 -> label of that symbol occurrence
+  follow: list[int]                # position -> bitset of positions that may come next
+  def __init__(self, regex: str, simplify: bool = False):
+    self.regex = regex
+    self.ast = parse(regex)
+    if simplify:
+      self.ast = Simplifier().simplify(self.ast)
+    self.labels = []
+    self.follow = [0]
+  
+  def addFollow(self, last: int, first: int):
+    for position in iterBits(last):
+      self.follow[position] |= first
+  
+  @instrumented("glushkov", nfaCounters)
+  def toNFA(self) -> 'GlushkovNFA':
+    """
+    Runs the construction. Positions are numbered 1..n in order of
+    occurrence; every copy made by a bounded repetition gets its own.
+    """
+    self.labels = []
+    self.follow = [0]
+    # per finished subexpression: (nullable, first positions, last positions)
+    results: list[tuple[bool, int, int]] = []
+    work: list[tuple[Node, bool]] = [(self.ast, False)]
+    while work:
+      node, ready = work.pop()
+      if isinstance(node, Repeat):
+        node = expandRepeat(node)
+      if isinstance(node, Empty):
+        results.append((True, 0, 0))
+        continue
+      if isinstance(node, Symbol):
+        self.labels.append(node.label)
+        self.follow.append(0)
+        bit = 1 << len(self.labels)
+        results.append((False, bit, bit))
+        continue
+      
+      children = node.items if isinstance(node, (Concat, Alternation)) else (node.item,)
+      if not ready:
+        work.append((node, True))
+        work.extend((child, False) for child in reversed(children))
+        continue
+      
+      parts = results[len(results) - len(children):]
+      del results[len(results) - len(children):]
+      if isinstance(node, Concat):
+        nullable, first, last = parts[0]
+        for partNullable, partFirst, partLast in parts[1:]:
+          self.addFollow(last, partFirst)
+          if nullable:
+            first |= partFirst
+          last = last | partLast if partNullable else partLast
+          nullable = nullable and partNullable
+        results.append((nullable, first, last))
+      elif isinstance(node, Alternation):
+        results.append((any(p[0] for p in parts), union(p[1] for p in parts), union(p[2] for p in parts)))
+      else:
+        nullable, first, last = parts[0]
+        if isinstance(node, (Star, Plus)):
+          self.addFollow(last, first)
+        results.append((nullable or not isinstance(node, Plus), first, last))
+    
+    nullable, first, last = results.pop()
+    self.follow[0] = first
+    return GlushkovNFA(self.labels, self.follow, last | (1 if nullable else 0))
+
+
+def union(masks: Iterator[int]) -> int:
+  result = 0
+  for mask in masks:
+    result |= mask
+  return result
+
+def expandRepeat(node: Repeat) -> Node:
+  """
+  Rewrites x{m,n} as m copies of x followed by n - m copies of x? (or by x*).
+  """
+  items: list[Node] = [node.item] * node.low
+  if node.high is None:
+    items.append(Star(node.item))
+  else:
+    items.extend([Option(node.item)] * (node.high - node.low))
+  if not items:
+    return Empty()
+  return items[0] if len(items) == 1 else Concat(tuple(items))
+
+
+class GlushkovNFA:
+  """
+  ε-free NFA from GlushkovConstruction. State 0 is the start, state p > 0
+  is position p and is only entered on `labels[p - 1]`. Unlike a TCNFA it
+  may have several accept states. Works wherever the bit-parallel simulator
+  is used: PowersetConstruction, LazyDFA, equivalentNFA.
+  """
+  states: range
+  alphabet: set['str | CharSet']
+  transitions: dict[tuple[int, 'str | CharSet'], set[int]]
+  startState: int
+  acceptStates: set[int]
+  simulator: BitParallelNFA | None
+  def __init__(self, labels: list['str | CharSet'], follow: list[int], acceptMask: int):
+    self.states = range(len(labels) + 1)
+    self.alphabet = set(labels)
+    self.startState = 0
+    self.acceptStates = set(iterBits(acceptMask))
+    self.simulator = None
+    
+    self.transitions = dict()
+    for src, successors in enumerate(follow):
+      for dest in iterBits(successors):
+        self.transitions.setdefault((src, labels[dest - 1]), set()).add(dest)
+  
+  def acceptMask(self) -> int:
+    return toBitmask(self.acceptStates)
+  
+  def closureTable(self) -> list[int]:
+    """
+    Every state is its own ε-closure.
+    """
+    return [1 << state for state in self.states]
+  
+  def symbolEdges(self) -> Iterator[tuple[int, 'str | CharSet', set[int]]]:
+    """
+    Yields (src, symbol, destinations) for every transition.
+    """
+    for (src, symbol), dest in self.transitions.items():
+      yield src, symbol, dest
+  
+  def successors(self, state: int, symbol: 'str | CharSet') -> set[int]:
+    return self.transitions.get((state, symbol), set())
+  
+  @instrumentedRead("read.nfa")
+  def read(self, inputString: str) -> bool:
+    """
+    Reads an input string and checks if it is accepted by the NFA.
+    """
+    if self.simulator is None:
+      self.simulator = BitParallelNFA(self)
+    return self.simulator.read(inputString)
+  
+  def __str__(self) -> str:
+    return {
+      "states": len(self.states),
+      "alphabet": self.alphabet,
+      "transitions": self.transitions,
+      "start": self.startState,
+      "accept": self.acceptStates
+    }.__str__()
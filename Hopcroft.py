@@ -1,49 +1,267 @@
+import itertools
+import numpy as np
 from PowersetConstruction import DFA
+from Instrumentation import instrumented
 
 
 class Hopcroft:
-  P: set[frozenset[int]]      # partitions
+  classes: dict[int, int]     # maps states to their block of the partition
+  stateMap: dict[int, int]    # maps states to their state in the minimized DFA
+  forward: list[np.ndarray]   # per symbol in sorted order: index of a state -> index of its successor
+  batchStates: int = 4096     # worklists this large (or n / 32) are split in one numpy pass, see splitAll
   def __init__(self, dfa: 'DFA'):
-    self.P = set()
-    self.P.add(frozenset(dfa.acceptStates))
-    self.P.add(frozenset(dfa.states.difference(dfa.acceptStates)))
+    self.classes = {s: 0 if s in dfa.acceptStates else 1 for s in dfa.states}
     
     self.dfa = dfa
     
+  @property
+  def P(self) -> set[frozenset[int]]:
+    """
+    The current partition of the states, as a set of blocks.
+    """
+    blocks = dict[int, set[int]]()
+    for state, block in self.classes.items():
+      blocks.setdefault(block, set()).add(state)
+    return {frozenset(block) for block in blocks.values()}
+    
   def coarsePartition(self):
-    changeMade = False
-    while not changeMade:
-      newP = set()
-      for p in self.P:
-        for c in self.dfa.alphabet:
-          A = frozenset({s for s in p if self.dfa.transitions[s, c] in self.dfa.acceptStates})
-          NA = p.difference(A)
-          if len(A) != 0 and len(NA) != 0:
-            newP.add(A)
-            newP.add(NA)
-            changeMade = True
-            break
+    """
+    Refines the partition into the coarsest one compatible with the transitions.
+    Hopcroft's worklist algorithm: blocks are kept contiguous in one array
+    of states and split in place. Every splitter block is run against the
+    inverse transitions of each symbol, and of the two halves of a split
+    block only the smaller one is queued, which gives O(m·n·log n).
+    While the worklist holds many states, splitAll takes all of it at once.
+    """
+    states = sorted(self.dfa.states)
+    n = len(states)
+    self.forward = forward = []
+    if n == 0:
+      return
+    transitions = self.dfa.transitions
+    index = None if states[0] == 0 and states[-1] == n - 1 else {state: i for i, state in enumerate(states)}
+    
+    # forward table and inverse transitions per symbol in CSR form: preds[a][offsets[a][t]:offsets[a][t+1]]
+    preds: list[np.ndarray] = []
+    offsets: list[np.ndarray] = []
+    for symbol in sorted(self.dfa.alphabet):
+      try:
+        targets = map(transitions.__getitem__, zip(states, itertools.repeat(symbol)))
+        if index is not None:
+          targets = map(index.__getitem__, targets)
+        targets = np.fromiter(targets, dtype=np.int64, count=n)
+      except KeyError:
+        raise ValueError("Hopcroft minimization requires a complete DFA")
+      forward.append(targets)
+      preds.append(np.argsort(targets, kind="stable"))
+      offsets.append(np.concatenate(([0], np.cumsum(np.bincount(targets, minlength=n)))))
+    predTables = [(p.tolist(), o.tolist()) for p, o in zip(preds, offsets)]
+    
+    # partition: block b holds elems[first[b]:end[b]], its marked states come first;
+    # initial blocks are numbered from smallest to largest
+    _, classOf, sizes = np.unique(np.fromiter(map(self.classes.__getitem__, states), dtype=np.int64, count=n), return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(sizes, kind="stable")] = np.arange(len(sizes))
+    blockArray = rank[classOf]
+    elemsArray = np.argsort(blockArray, kind="stable")
+    locArray = np.empty(n, dtype=np.int64)
+    locArray[elemsArray] = np.arange(n)
+    bounds = np.concatenate(([0], np.cumsum(np.sort(sizes))))
+    elems, loc, blockOf = elemsArray.tolist(), locArray.tolist(), blockArray.tolist()
+    first, end = bounds[:-1].tolist(), bounds[1:].tolist()
+    marked = [0] * len(first)
+    
+    worklist = list(range(len(first) - 1))  # every initial block but the largest
+    queued = [True] * len(worklist) + [False]
+    queuedStates = n - end[-1] + first[-1]
+    batchThreshold = max(self.batchStates, n >> 5)
+    while worklist:
+      if queuedStates >= batchThreshold:
+        partition = [np.array(elems), np.array(loc), np.array(blockOf), np.array(first), np.array(end)]
+        work = np.array(worklist)
+        while len(work) and (partition[4][work] - partition[3][work]).sum() >= batchThreshold:
+          work = self.splitAll(work, partition, forward, preds, offsets)
+        elems, loc, blockOf, first, end = (part.tolist() for part in partition)
+        worklist = work.tolist()
+        marked = [0] * len(first)
+        queued = [False] * len(first)
+        queuedStates = 0
+        for b in worklist:
+          queued[b] = True
+          queuedStates += end[b] - first[b]
+        continue
+      
+      b = worklist.pop()
+      queued[b] = False
+      splitter = elems[first[b]:end[b]]
+      queuedStates -= len(splitter)
+      if len(splitter) > 64:
+        splitterArray = np.array(splitter, dtype=np.int64)
+      for symbol, (symbolPreds, symbolOffsets) in enumerate(predTables):
+        # predecessors of the splitter on this symbol
+        if len(splitter) == 1:
+          s = splitter[0]
+          incoming = symbolPreds[symbolOffsets[s]:symbolOffsets[s + 1]]
+        elif len(splitter) > 64:
+          incoming = preds[symbol][gatherRanges(offsets[symbol][splitterArray], offsets[symbol][splitterArray + 1])].tolist()
         else:
-          newP.add(p)
-      self.P = newP.copy()
+          incoming = [p for s in splitter for p in symbolPreds[symbolOffsets[s]:symbolOffsets[s + 1]]]
+        if not incoming:
+          continue
+        
+        touched: list[int] = []
+        for p in incoming:
+          c = blockOf[p]
+          j = first[c] + marked[c]
+          i = loc[p]
+          if i < j:                         # already marked
+            continue
+          q = elems[j]
+          elems[i] = q
+          elems[j] = p
+          loc[q] = i
+          loc[p] = j
+          if marked[c] == 0:
+            touched.append(c)
+          marked[c] += 1
+        
+        for c in touched:
+          m = marked[c]
+          marked[c] = 0
+          size = end[c] - first[c]
+          if m == size:
+            continue
+          
+          # split off the smaller half as a new block and queue it
+          new = len(first)
+          if m <= size - m:
+            first.append(first[c])
+            end.append(first[c] + m)
+            first[c] += m
+          else:
+            first.append(first[c] + m)
+            end.append(end[c])
+            end[c] = first[c] + m
+          marked.append(0)
+          for k in range(first[new], end[new]):
+            blockOf[elems[k]] = new
+          worklist.append(new)
+          queued.append(True)
+          if not queued[c]:
+            queuedStates += end[new] - first[new]
+    
+    self.classes = dict(zip(states, blockOf))
+  
+  def splitAll(self, worklist: np.ndarray, partition: list[np.ndarray], forward: list[np.ndarray], preds: list[np.ndarray], offsets: list[np.ndarray]) -> np.ndarray:
+    """
+    Splits every block by every queued splitter at once, in one numpy pass
+    instead of a Python loop per splitter. A block splits into its
+    untouched rest, which keeps the block id, and one new block per
+    combination of splitters its touched states step into. Every part but
+    the largest is queued. Returns the new worklist and updates
+    `partition` (elems, loc, blockOf, first, end) in place.
+    """
+    elems, loc, blockOf, first, end = partition
+    n, blockCount = len(elems), len(first)
+    
+    isSplitter = np.zeros(blockCount, dtype=bool)
+    isSplitter[worklist] = True
+    splitterStates = elems[gatherRanges(first[worklist], end[worklist])]
+    hit = np.zeros(n, dtype=bool)
+    for symbol in range(len(preds)):
+      hit[preds[symbol][gatherRanges(offsets[symbol][splitterStates], offsets[symbol][splitterStates + 1])]] = True
+    touched = np.flatnonzero(hit)
+    if not len(touched):
+      return worklist[:0]
+    
+    # group touched states by block and by the splitter each symbol leads into, packed in one key
+    key = blockOf[touched]
+    keyBound = blockCount
+    for targets in forward:
+      successor = blockOf[targets[touched]]
+      if keyBound * (blockCount + 1) >= 1 << 62:
+        _, key = np.unique(key, return_inverse=True)
+        keyBound = int(key.max()) + 1
+      key = key * (blockCount + 1) + np.where(isSplitter[successor], successor + 1, 0)
+      keyBound *= blockCount + 1
+    order = np.argsort(key)
+    touched, key = touched[order], key[order]
+    groupStart = np.append(True, key[1:] != key[:-1])
+    groupOf = np.cumsum(groupStart) - 1
+    groupBlock = blockOf[touched[groupStart]]
+    groupSize = np.bincount(groupOf)
+    
+    # a block splits unless all of it lands in one group
+    blockSizes = end - first
+    rest = blockSizes - np.bincount(groupBlock, weights=groupSize, minlength=blockCount).astype(np.int64)
+    splits = np.bincount(groupBlock, minlength=blockCount) + (rest > 0) > 1
+    if not splits.any():
+      return worklist[:0]
+    newGroups = np.flatnonzero(splits[groupBlock])
+    newIds = blockCount + np.arange(len(newGroups))
+    groupIds = groupBlock.copy()
+    groupIds[newGroups] = newIds
+    blockOf[touched] = groupIds[groupOf]
+    
+    # make every part contiguous within its old block's range of elems
+    splitBlocks = np.flatnonzero(splits)
+    positions = gatherRanges(first[splitBlocks], end[splitBlocks])
+    moved = elems[positions]
+    moved = moved[np.lexsort((blockOf[moved], np.repeat(np.arange(len(splitBlocks)), blockSizes[splitBlocks])))]
+    elems[positions] = moved
+    loc[moved] = positions
+    movedBlocks = blockOf[moved]
+    runStart = np.append(True, movedBlocks[1:] != movedBlocks[:-1])
+    runEnd = np.append(runStart[1:], True)
+    first = partition[3] = np.concatenate((first, np.zeros(len(newIds), dtype=np.int64)))
+    end = partition[4] = np.concatenate((end, np.zeros(len(newIds), dtype=np.int64)))
+    first[movedBlocks[runStart]] = positions[runStart]
+    end[movedBlocks[runEnd]] = positions[runEnd] + 1
+    
+    # queue every part of a split block but its largest
+    rest = rest[splitBlocks]
+    end[splitBlocks[rest == 0]] = first[splitBlocks[rest == 0]]     # wholly split up, the id is left empty
+    owner = np.searchsorted(splitBlocks, groupBlock[newGroups])
+    groupSizes = end[newIds] - first[newIds]
+    best = np.lexsort((-groupSizes, owner))
+    best = best[np.append(True, owner[best][1:] != owner[best][:-1])]     # every split block has a new group
+    largest = np.zeros(len(first), dtype=bool)
+    largest[np.where(groupSizes[best] > rest, newIds[best], splitBlocks)] = True
+    parts = np.concatenate((splitBlocks[rest > 0], newIds))
+    return parts[~largest[parts]]
   
+  @instrumented("hopcroft", lambda minimal, hopcroft: {"statesBefore": len(hopcroft.dfa.states), "statesAfter": len(minimal.states)})
   def minimize(self):
     self.coarsePartition()
-    partition = list(self.P)
-    partition.sort(key= lambda x: min(x))
-    classes = dict[int, int]()      # maps states to their equivalence class
-    for i, c in enumerate(partition):
-      for s in c:
-        classes[s] = i
     
+    # number the classes in order of their smallest state
+    states = sorted(self.classes)
+    blocks = np.fromiter(map(self.classes.__getitem__, states), dtype=np.int64, count=len(states))
+    _, smallest, blockIndex = np.unique(blocks, return_index=True, return_inverse=True)
+    number = np.empty(len(smallest), dtype=np.int64)
+    number[np.argsort(smallest)] = np.arange(len(smallest))
+    number = number[blockIndex]
+    classes = dict(zip(states, number.tolist()))   # maps states to their equivalence class
+    self.stateMap = classes
+    
+    # equivalent states have equivalent successors, so one state per class is enough
+    representatives = np.sort(smallest)
     transitions = dict[tuple[int, str], int]()
-    for (src, sym), dest in self.dfa.transitions.items():
-      transitions[(classes[src], sym)] = classes[dest]
+    for sym, targets in zip(sorted(self.dfa.alphabet), self.forward):
+      transitions.update(zip(zip(range(len(representatives)), itertools.repeat(sym)), number[targets[representatives]].tolist()))
     
     return DFA(
-      states=set(range(len(self.P))),
+      states=set(range(len(representatives))),
       alphabet=self.dfa.alphabet,
       transition=transitions,
-      startState=0,
+      startState=classes[self.dfa.startState],
       acceptStates={classes[s] for s in self.dfa.acceptStates}
-    )
\ No newline at end of file
+    )
+
+
+def gatherRanges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+  """
+  Returns the concatenation of range(start, end) for every pair.
+  """
+  counts = ends - starts
+  return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
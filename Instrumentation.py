@@ -0,0 +1,216 @@
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class StageStats:
+  """
+  Wall time, counters and tracemalloc peak of one pipeline stage. In
+  PipelineStats the figures of every run of the stage are summed, and
+  `peakBytes` holds the largest peak, or None without memory tracing.
+  """
+  name: str
+  calls: int = 0
+  seconds: float = 0.0
+  peakBytes: int | None = None
+  counters: dict[str, int] = field(default_factory=dict)
+  
+  def merge(self, other: 'StageStats'):
+    self.calls += other.calls
+    self.seconds += other.seconds
+    if other.peakBytes is not None:
+      self.peakBytes = max(self.peakBytes or 0, other.peakBytes)
+    for key, value in other.counters.items():
+      self.counters[key] = self.counters.get(key, 0) + value
+
+
+@dataclass
+class PipelineStats:
+  """
+  Per-stage statistics collected by a Recorder, keyed by stage name,
+  e.g. "thompson", "powerset", "hopcroft" or "read.dfa". A stage run
+  inside another (all of them inside "compile") counts towards both.
+  """
+  stages: dict[str, StageStats] = field(default_factory=dict)
+  
+  def __getitem__(self, name: str) -> StageStats:
+    return self.stages[name]
+  
+  def __contains__(self, name: str) -> bool:
+    return name in self.stages
+  
+  def asDict(self) -> dict[str, dict[str, Any]]:
+    return {
+      name: {"calls": stage.calls, "seconds": stage.seconds, "peakBytes": stage.peakBytes, **stage.counters}
+      for name, stage in self.stages.items()
+    }
+
+
+class Stage:
+  """
+  One run of a stage, as a context manager. Stages may nest; with memory
+  tracing on, an enclosing stage's peak includes its inner stages.
+  """
+  recorder: 'Recorder'
+  stats: StageStats
+  start: float
+  baseBytes: int
+  innerPeak: int            # highest absolute traced memory seen by inner stages
+  def __init__(self, recorder: 'Recorder', name: str):
+    self.recorder = recorder
+    self.stats = StageStats(name, calls=1)
+    self.innerPeak = 0
+  
+  def record(self, **counters: int):
+    """
+    Adds to the counters of this run.
+    """
+    for key, value in counters.items():
+      self.stats.counters[key] = self.stats.counters.get(key, 0) + value
+  
+  def __enter__(self) -> 'Stage':
+    stack = self.recorder.openStages()
+    if self.recorder.traceMemory:
+      current, peak = tracemalloc.get_traced_memory()
+      if stack:
+        # the enclosing stage's peak so far, which reset_peak is about to lose
+        stack[-1].innerPeak = max(stack[-1].innerPeak, peak)
+      self.baseBytes = current
+      tracemalloc.reset_peak()
+    stack.append(self)
+    self.start = time.perf_counter()
+    return self
+  
+  def __exit__(self, *exc):
+    self.stats.seconds = time.perf_counter() - self.start
+    stack = self.recorder.openStages()
+    stack.pop()
+    if self.recorder.traceMemory:
+      peak = max(tracemalloc.get_traced_memory()[1], self.innerPeak)
+      self.stats.peakBytes = max(peak - self.baseBytes, 0)
+      if stack:
+        stack[-1].innerPeak = max(stack[-1].innerPeak, peak)
+    self.recorder.finish(self.stats)
+
+
+class Recorder:
+  """
+  Collects stage statistics into `stats` while active, see `profile`, and
+  passes the StageStats of every finished stage run to each hook.
+  With `traceMemory` set, tracemalloc runs while the recorder is active
+  and every stage reports its peak traced memory.
+  """
+  stats: PipelineStats
+  hooks: list[Callable[[StageStats], None]]
+  traceMemory: bool
+  def __init__(self, traceMemory: bool = False, hooks: list[Callable[[StageStats], None]] | None = None):
+    self.stats = PipelineStats()
+    self.hooks = list(hooks or [])
+    self.traceMemory = traceMemory
+    self.lock = threading.Lock()
+    self.local = threading.local()      # per-thread stack of open stages
+  
+  def subscribe(self, hook: Callable[[StageStats], None]):
+    self.hooks.append(hook)
+  
+  def openStages(self) -> list[Stage]:
+    if not hasattr(self.local, "stack"):
+      self.local.stack = []
+    return self.local.stack
+  
+  def stage(self, name: str) -> Stage:
+    return Stage(self, name)
+  
+  def finish(self, run: StageStats):
+    with self.lock:
+      total = self.stats.stages.get(run.name)
+      if total is None:
+        total = self.stats.stages[run.name] = StageStats(run.name)
+      total.merge(run)
+    for hook in self.hooks:
+      hook(run)
+
+
+# the recorder stages report to, None while instrumentation is off
+active: Recorder | None = None
+
+def instrumented(name: str, counters: Callable[..., dict[str, int]] | None = None) -> Callable[[F], F]:
+  """
+  Decorates a function as stage `name`. While a Recorder is active,
+  `counters(result, *args, **kwargs)` supplies the counters of each run.
+  While none is, the only cost is one extra call and a global lookup.
+  """
+  def decorate(function: F) -> F:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+      if active is None:
+        return function(*args, **kwargs)
+      with active.stage(name) as run:
+        result = function(*args, **kwargs)
+        if counters is not None:
+          run.record(**counters(result, *args, **kwargs))
+      return result
+    return wrapper
+  return decorate
+
+def instrumentedRead(name: str) -> Callable[[F], F]:
+  """
+  Decorates a `read(self, inputString)` method as stage `name`, counting
+  characters read and inputs accepted. The wrapper takes exactly those two
+  arguments, which keeps the cost of a read with instrumentation off to a
+  global lookup and one extra call (about 0.1 us).
+  """
+  def decorate(function: F) -> F:
+    @functools.wraps(function)
+    def wrapper(self, inputString):
+      if active is None:
+        return function(self, inputString)
+      with active.stage(name) as run:
+        accepted = function(self, inputString)
+        run.record(chars=len(inputString), accepted=int(accepted))
+      return accepted
+    return wrapper
+  return decorate
+
+def nfaCounters(nfa: Any, *args, **kwargs) -> dict[str, int]:
+  edges = nullEdges = 0
+  for (_, symbol), dest in nfa.transitions.items():
+    if symbol == 'ε':
+      nullEdges += len(dest)
+    else:
+      edges += len(dest)
+  return {"nfaStates": len(nfa.states), "nfaEdges": edges, "nfaNullEdges": nullEdges}
+
+def dfaCounters(dfa: Any, *args, **kwargs) -> dict[str, int]:
+  return {"dfaStates": len(dfa.states), "dfaEdges": len(dfa.transitions)}
+
+@contextmanager
+def profile(traceMemory: bool = False, hooks: list[Callable[[StageStats], None]] | None = None) -> Iterator[PipelineStats]:
+  """
+  Activates a Recorder for the duration of a with block:
+  
+    with profile(traceMemory=True) as stats:
+      compile("(a|b)*abb")
+    stats["powerset"].seconds
+  
+  The previously active recorder, if any, is restored on exit.
+  """
+  global active
+  recorder = Recorder(traceMemory, hooks)
+  startedTracing = traceMemory and not tracemalloc.is_tracing()
+  if startedTracing:
+    tracemalloc.start()
+  previous, active = active, recorder
+  try:
+    yield recorder.stats
+  finally:
+    active = previous
+    if startedTracing:
+      tracemalloc.stop()
@@ -0,0 +1,92 @@
+from BitParallelNFA import BitParallelNFA
+from ThompsonConstruction import TCNFA
+from CompactNFA import CompactNFA
+from GlushkovConstruction import GlushkovNFA
+
+
+class LazyDFA:
+  """
+  Runs the powerset construction on the fly: a DFA state (a bitset of NFA
+  states) and its transitions are only created when input reaches them.
+  At most `maxStates` states are cached; when the cache is full it is
+  flushed, together with the simulator's chunk tables, and rebuilt from
+  the states the input reaches next.
+  """
+  maxStates: int
+  simulator: BitParallelNFA
+  stateIds: dict[int, int]                 # NFA state bitset -> DFA state id
+  stateMasks: list[int]                    # DFA state id -> NFA state bitset
+  acceptStates: list[bool]
+  transitions: dict[tuple[int, str], int]
+  hits: int
+  misses: int
+  flushes: int
+  def __init__(self, nfa: 'TCNFA | CompactNFA | GlushkovNFA', maxStates: int = 10000):
+    if maxStates < 1:
+      raise ValueError("LazyDFA needs room for at least one cached state")
+    self.maxStates = maxStates
+    self.simulator = BitParallelNFA(nfa)
+    self.hits = 0
+    self.misses = 0
+    self.flushes = 0
+    self.flush()
+    self.flushes = 0
+    
+  def flush(self):
+    """
+    Drops every cached state and transition.
+    """
+    self.simulator.clearTables()
+    self.stateIds = dict()
+    self.stateMasks = []
+    self.acceptStates = []
+    self.transitions = dict()
+    self.flushes += 1
+    
+  def addState(self, mask: int) -> int:
+    """
+    Returns the id of the DFA state for `mask`, creating it if needed.
+    """
+    if mask in self.stateIds:
+      return self.stateIds[mask]
+    if len(self.stateMasks) >= self.maxStates:
+      self.flush()
+    id = len(self.stateMasks)
+    self.stateIds[mask] = id
+    self.stateMasks.append(mask)
+    self.acceptStates.append(bool(mask & self.simulator.acceptMask))
+    return id
+  
+  def read(self, inputString: str) -> bool:
+    """
+    Reads an input string and checks if it is accepted by the NFA.
+    """
+    if "ε" in inputString:   # null sentinel not allowed in input
+      raise ValueError("Input string cannot contain null symbol 'ε'")
+    
+    state = self.addState(self.simulator.startMask)
+    for symbol in inputString:
+      nextState = self.transitions.get((state, symbol))
+      if nextState is None:
+        self.misses += 1
+        mask = self.simulator.step(self.stateMasks[state], self.simulator.symbolFor(symbol))
+        flushes = self.flushes
+        nextState = self.addState(mask)
+        if flushes == self.flushes:     # `state` is gone after a flush
+          self.transitions[(state, symbol)] = nextState
+      else:
+        self.hits += 1
+      if not self.stateMasks[nextState]:  # the dead state, nothing can accept from here
+        return False
+      state = nextState
+    
+    return self.acceptStates[state]
+  
+  def stats(self) -> dict[str, int]:
+    return {
+      "states": len(self.stateMasks),
+      "transitions": len(self.transitions),
+      "hits": self.hits,
+      "misses": self.misses,
+      "flushes": self.flushes
+    }
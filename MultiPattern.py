@@ -0,0 +1,108 @@
+from typing import Sequence
+from Hopcroft import Hopcroft
+from PowersetConstruction import DFA, PowersetConstruction, StateLimitError
+from ThompsonConstruction import TCNFA, ThompsonConstruction
+
+
+def joinNFAs(nfas: Sequence[TCNFA]) -> tuple[TCNFA, dict[int, int]]:
+  """
+  Lays several NFAs side by side behind one start state.
+  Every NFA keeps its own accept state, which gets an ε-edge to the shared
+  accept state; returns the joined NFA and the map accept state -> index.
+  """
+  transitions: dict[tuple[int, str], set[int]] = {(0, 'ε'): set()}
+  alphabet: set[str] = set()
+  accepts: dict[int, int] = {}
+  offset = 1
+  for i, nfa in enumerate(nfas):
+    for (src, symbol), dest in nfa.transitions.items():
+      transitions[(src + offset, symbol)] = {d + offset for d in dest}
+    alphabet |= nfa.alphabet
+    transitions[(0, 'ε')].add(nfa.startState + offset)
+    accepts[nfa.acceptState + offset] = i
+    offset += max(nfa.states) + 1
+  
+  for state in accepts:
+    transitions.setdefault((state, 'ε'), set()).add(offset)
+  
+  nfa = TCNFA(
+    states=set(range(offset + 1)),
+    alphabet=alphabet,
+    transition=transitions,
+    startState=0,
+    acceptState=offset
+  )
+  return nfa, accepts
+
+
+class PatternGroup:
+  """
+  One minimized DFA for a set of patterns. `matches` maps every DFA state to
+  the ids of the patterns that accept when the input ends there.
+  """
+  patterns: list[int]                   # pattern ids in this group
+  dfa: DFA
+  matches: dict[int, frozenset[int]]
+  def __init__(self, patterns: list[int], nfas: Sequence[TCNFA], maxStates: int | None = None):
+    self.patterns = patterns
+    nfa, accepts = joinNFAs(nfas)
+    
+    pc = PowersetConstruction(nfa)
+    dfa = pc.toDFA(maxStates)
+    matches = {state: frozenset(patterns[accepts[s]] for s in pc.nfaStates(state) if s in accepts) for state in pc.newStates}
+    
+    # states only merge when they report the same patterns
+    hp = Hopcroft(dfa)
+    blocks: dict[frozenset[int], int] = {}
+    hp.classes = {state: blocks.setdefault(ids, len(blocks)) for state, ids in matches.items()}
+    self.dfa = hp.minimize()
+    self.matches = {hp.stateMap[state]: ids for state, ids in matches.items()}
+    
+  def match(self, inputString: str | bytes) -> frozenset[int]:
+    """
+    Returns the ids of the patterns in this group that accept the input.
+    """
+    compiled = self.dfa.compile()
+    row = compiled.advance(compiled.startState, inputString)
+    if row == compiled.sink:
+      return frozenset()
+    return self.matches[compiled.states[row]]
+
+
+class MultiPattern:
+  """
+  Compiles many regexes into as few DFAs as possible and reports which of
+  them accept an input in one pass per DFA. Pattern ids are positions in
+  `patterns`. With `maxStates` set, a group whose subset construction grows
+  past the cap is split in half and each half is compiled on its own.
+  """
+  patterns: list[str]
+  maxStates: int | None
+  groups: list[PatternGroup]
+  def __init__(self, patterns: Sequence[str], maxStates: int | None = None):
+    self.patterns = list(patterns)
+    self.maxStates = maxStates
+    self.groups = []
+    
+    nfas = [ThompsonConstruction(regex).toNFA() for regex in self.patterns]
+    work = [list(range(len(nfas)))] if nfas else []
+    while work:
+      ids = work.pop()
+      try:
+        # a single pattern cannot be split further, so it is never capped
+        group = PatternGroup(ids, [nfas[i] for i in ids], maxStates if len(ids) > 1 else None)
+      except StateLimitError:
+        half = len(ids) // 2
+        work.append(ids[half:])
+        work.append(ids[:half])
+        continue
+      self.groups.append(group)
+      
+  def match(self, inputString: str | bytes) -> set[int]:
+    """
+    Returns the ids of every pattern that accepts the whole input.
+    """
+    matched: set[int] = set()
+    for group in self.groups:
+      matched |= group.match(inputString)
+    return matched
@@ -0,0 +1,85 @@
+import mmap
+import os
+from functools import reduce
+from multiprocessing import Pool
+import numpy as np
+from CompiledDFA import CompiledDFA
+from PowersetConstruction import DFA
+
+workerDFA: CompiledDFA | None = None      # the DFA installed in a worker process
+probeBytes = 4096                         # prefix run from every row to see whether rows collapse
+
+
+def initWorker(dfa: 'CompiledDFA'):
+  global workerDFA
+  workerDFA = dfa
+
+def chunkMapping(dfa: 'CompiledDFA', data: bytes | memoryview) -> np.ndarray:
+  """
+  Runs the chunk from every row of the table at once and returns the
+  row -> row mapping it induces. Rows that reach the same state are merged
+  as they go, and once few distinct states are left each one is advanced
+  with the scalar read loop.
+  """
+  rows = np.arange(dfa.sink + 1, dtype=np.int32)     # distinct current rows
+  inverse = np.arange(dfa.sink + 1, dtype=np.int32)  # start row -> index into rows
+  position = 0
+  block = 256
+  while position < len(data):
+    part = bytes(data[position:position + block])
+    if len(rows) <= 8:
+      rows = np.array([dfa.advance(int(row), part) for row in rows], dtype=np.int32)
+    else:
+      for column in dfa.byteColumns[np.frombuffer(part, dtype=np.uint8)].tolist():
+        rows = dfa.table[rows, column]
+    rows, merged = np.unique(rows, return_inverse=True)
+    inverse = merged.astype(np.int32)[inverse]
+    position += block
+    block = min(block * 4, 1 << 20)
+  return rows[inverse]
+
+def mapFileChunk(path: str, start: int, end: int) -> np.ndarray:
+  """
+  Worker task: maps [start, end) of the file and computes its row mapping.
+  """
+  with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+    view = memoryview(data)
+    try:
+      return chunkMapping(workerDFA, view[start:end])
+    finally:
+      view.release()
+
+def parallelRead(dfa: 'DFA | CompiledDFA', path: str, workers: int | None = None, chunkSize: int | None = None) -> bool:
+  """
+  Checks whether the contents of the file at `path` are accepted by the DFA,
+  splitting the file across worker processes. Each worker computes the
+  state -> state mapping of its chunk; mappings compose associatively, so
+  applying the composition to the start state gives the exact final state.
+  Workers memory-map the file themselves, no input is sent between processes.
+  Falls back to one sequential pass when rows don't collapse on a prefix
+  of the file, as for a DFA counting modulo k.
+  """
+  if isinstance(dfa, DFA):
+    dfa = dfa.compile()
+  workers = workers or os.cpu_count() or 1
+  size = os.path.getsize(path)
+  if size == 0:
+    return bool(dfa.accept[dfa.startState])
+  
+  # a chunk costs a pass per distinct row left, so unless the rows collapse
+  # below the number of workers one sequential pass is faster
+  with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+    view = memoryview(data)
+    try:
+      if workers == 1 or len(np.unique(chunkMapping(dfa, view[:probeBytes]))) >= workers:
+        return bool(dfa.accept[dfa.advance(dfa.startState, view)])
+    finally:
+      view.release()
+  
+  chunkSize = chunkSize or -(-size // workers)
+  bounds = [(path, start, min(start + chunkSize, size)) for start in range(0, size, chunkSize)]
+  with Pool(processes=workers, initializer=initWorker, initargs=(dfa,)) as pool:
+    mappings = pool.starmap(mapFileChunk, bounds)
+  
+  composed = reduce(lambda first, second: second[first], mappings)
+  return bool(dfa.accept[composed[dfa.startState]])
@@ -1,82 +1,201 @@
-from typing import Callable
-from queue import Queue
+import numpy as np
+from typing import Callable, Iterable, Sequence
 from ThompsonConstruction import TCNFA
+from CompactNFA import CompactNFA
+from GlushkovConstruction import GlushkovNFA
+from CompiledDFA import CompiledDFA
+from CharClass import CharSet, Classifier, atomize, labelRanges, simplify, sortKey
+from EpsilonClosure import closureSets
+from utils.bitset import iterBits, toBitmask
+from Instrumentation import instrumented, dfaCounters, instrumentedRead
+
+
+class StateLimitError(Exception):
+  """
+  Raised when a subset construction grows past its `maxStates` cap.
+  """
+  pass
+
+
+def powersetCounters(dfa: 'DFA', construction: 'PowersetConstruction', *args, **kwargs) -> dict[str, int]:
+  return {
+    **dfaCounters(dfa),
+    "symbols": len(construction.alphabet),
+    "internHits": construction.internHits,
+    "internMisses": construction.internMisses,
+  }
 
 
 class PowersetConstruction:
-  nullClosures: dict[int, set[int]]
-  newStatesInv: dict[int, int]
-  newStates: dict[int, set[int]]
+  """
+  Subset construction over interned sets of NFA states. Every subset is
+  hashed to its DFA state id; on NFAs with at least `sparseStates` states
+  it is kept as a frozenset, so a step costs time in the size of the
+  subsets and moves involved, not in the number of NFA states. Narrower
+  NFAs keep subsets as bitsets, which hash and union faster there. Both
+  forms support & and |, so only `step` and `nfaStates` tell them apart.
+  """
+  newStatesInv: dict[int | frozenset[int], int]
+  newStates: dict[int, int | frozenset[int]]    # DFA state -> NFA states, see nfaStates
   acceptStates: set[int]
   newTransitions: dict[tuple[int, str], int]
-  nfa: 'TCNFA'
-  def __init__(self, nfa: 'TCNFA'):
+  nfa: 'TCNFA | CompactNFA | GlushkovNFA'
+  alphabet: list['str | CharSet']     # disjoint DFA symbols
+  compressAlphabet: bool
+  accepting: int | frozenset[int]     # accept states of the NFA
+  sources: dict['str | CharSet', int | frozenset[int]]                 # symbol -> states with a move on it
+  moves: dict['str | CharSet', dict[int, int | frozenset[int]]]        # symbol -> state -> ε-closed successors
+  sparseStates: int = 4096            # NFAs this wide keep subsets as frozensets
+  internHits: int                     # successor subsets that were already interned
+  internMisses: int                   # successor subsets interned as new DFA states
+  def __init__(self, nfa: 'TCNFA | CompactNFA | GlushkovNFA', compressAlphabet: bool = False):
     self.nfa = nfa
-    self.nullClosures = dict()
+    self.alphabet = []
+    self.compressAlphabet = compressAlphabet
+    self.accepting = frozenset()
+    self.sources = dict()
+    self.moves = dict()
+    self.internHits = 0
+    self.internMisses = 0
     
     self.newStates = dict()
     self.newStatesInv = dict()
     self.acceptStates = set()
     self.newTransitions = dict()
 
-  def toDFA(self) -> 'DFA':
-    count = 0     #number of items in the system (processed + in queue)
-    done = 0      #number if items waiting (in queue)
-    currentSet = Queue[set[int]]()
-    start = self.nfa.nonDeterministicRead(self.nfa.startState, self.nullClosures)
-
-    self.addState(count, {*start})
-    if self.nfa.acceptState in start:
-        self.acceptStates.add(count)
-    count += 1
+  @instrumented("powerset", powersetCounters)
+  def toDFA(self, maxStates: int | None = None) -> 'DFA':
+    """
+    Runs the subset construction on interned subsets.
+    Successor subsets are unions of the per-symbol moves (ε-closure applied)
+    of their states, so no intermediate closures are built.
+    Raises StateLimitError as soon as more than `maxStates` states exist.
+    With `compressAlphabet` set, symbols that no NFA transition tells apart
+    are merged into one class first, so the DFA has one column per class.
+    """
+    start, roots = self.buildMoves()
+    if self.compressAlphabet:
+      self.compressSymbols(roots)
+    alphabet = self.alphabet
+    accepting = self.accepting
     
-    currentSet.put({*start})
+    pending: list[int | frozenset[int]] = [start]   # DFA state id -> subset, in FIFO order
+    self.addState(0, start)
+    if start & accepting:
+      self.acceptStates.add(0)
     
-    while not currentSet.empty():
-      #pop item
-      newState = currentSet.get()
-      done += 1
-      
-      #process transitions
-      nrStates = set[int]()     # null reachable states
-      for i in newState:
-        nrStates.update(self.nfa.nonDeterministicRead(i, self.nullClosures))
-      
-      for symbol in self.nfa.alphabet:
-        rStates = set[int]()    # reachable states via symbol
-        for i in nrStates:
-          if (i, symbol) in self.nfa.transitions:
-            for dest in self.nfa.transitions[(i, symbol)]:
-              rStates.update(self.nfa.nonDeterministicRead(dest, self.nullClosures))
-        
-        if len(rStates) == 0 or rStates in newState:
+    done = 0
+    while done < len(pending):
+      subset = pending[done]
+      for symbol in alphabet:
+        rStates = self.step(subset, symbol)    # reachable states via symbol
+        if not rStates:
           continue
         
-        #add to new states and transition
-        bitmask = self.to_bitmask(rStates)
-        id: int
-        if bitmask in self.newStatesInv:
-          id = self.newStatesInv[bitmask]
-        else:
-          id = count
+        id = self.newStatesInv.get(rStates)
+        if id is None:
+          id = len(pending)
+          if maxStates is not None and id >= maxStates:
+            raise StateLimitError(f"Subset construction exceeded {maxStates} states")
+          self.internMisses += 1
           self.addState(id, rStates)
-          if self.nfa.acceptState in rStates:
-              self.acceptStates.add(id)
-          #add next states to queue
-          currentSet.put(rStates)
-          count += 1
-        self.newTransitions[(done - 1, symbol)] = id   #id of predecessor state is done - 1
+          if rStates & accepting:
+            self.acceptStates.add(id)
+          pending.append(rStates)
+        else:
+          self.internHits += 1
+        self.newTransitions[(done, symbol)] = id
+      done += 1
     
     self.introduceTrapState()
          
     return DFA(
       states={*self.newStates.keys()},
-      alphabet=self.nfa.alphabet,
+      alphabet=set(alphabet),
       transition=self.newTransitions,
       startState=0,
       acceptStates=self.acceptStates
     )
   
+  def buildMoves(self) -> tuple[int | frozenset[int], list[int | frozenset[int]]]:
+    """
+    Fills `moves` and `sources` with the ε-closed successors of every state
+    on every symbol, with CharSet labels split into disjoint atoms. Returns
+    the closure of the start state and the roots compressSymbols needs.
+    """
+    nfa = self.nfa
+    narrow = max(nfa.states) < self.sparseStates
+    if narrow:
+      closures, empty, accepting = nfa.closureTable(), 0, nfa.acceptMask()
+    else:
+      closures = closureSets(max(nfa.states) + 1, lambda state: nfa.successors(state, 'ε'))
+      empty, accepting = frozenset(), frozenset(iterBits(nfa.acceptMask()))
+    
+    coverage: dict['str | CharSet', list['str | CharSet']] | None = None
+    if any(isinstance(label, CharSet) for label in nfa.alphabet):
+      self.alphabet, coverage = atomize(nfa.alphabet)
+    else:
+      self.alphabet = sorted(nfa.alphabet)
+    
+    self.moves = {symbol: dict() for symbol in self.alphabet}
+    targets = {nfa.startState}
+    for src, label, dests in nfa.symbolEdges():
+      closed = empty
+      for dest in dests:
+        closed = closed | closures[dest]
+      targets.update(dests)
+      for symbol in (coverage[label] if coverage is not None else (label,)):
+        succ = self.moves[symbol]
+        succ[src] = succ.get(src, empty) | closed
+    
+    self.sources = {symbol: toBitmask(succ) if narrow else frozenset(succ) for symbol, succ in self.moves.items()}
+    self.accepting = accepting
+    roots = list({closures[state] for state in targets}) if self.compressAlphabet else []
+    return closures[nfa.startState], roots
+  
+  def compressSymbols(self, roots: list[int | frozenset[int]]):
+    """
+    Merges symbols that no transition tells apart into one class.
+    Every reachable subset is a union of `roots` (closures of the start
+    state and of edge targets), so two symbols are equivalent when each
+    root steps to the same set on both, counting only states that have a
+    symbol edge or accept. The class is labelled by the CharSet of all its
+    characters, which DFA maps input characters to.
+    """
+    relevant = self.accepting
+    for states in self.sources.values():
+      relevant = relevant | states
+    groups: dict[tuple[int | frozenset[int], ...], list['str | CharSet']] = {}
+    for symbol in self.alphabet:
+      groups.setdefault(tuple(self.step(root, symbol) & relevant for root in roots), []).append(symbol)
+    if len(groups) == len(self.alphabet):
+      return
+    
+    moves, sources = dict(), dict()
+    for members in groups.values():
+      label = members[0] if len(members) == 1 else simplify(CharSet(r for m in members for r in labelRanges(m)))
+      moves[label] = self.moves[members[0]]
+      sources[label] = self.sources[members[0]]
+    self.moves, self.sources = moves, sources
+    self.alphabet = sorted(moves, key=sortKey)
+  
+  def step(self, subset: int | frozenset[int], symbol: 'str | CharSet') -> int | frozenset[int]:
+    """
+    Returns the ε-closed set of states reached from `subset` on `symbol`.
+    """
+    succ = self.moves[symbol]
+    active = subset & self.sources[symbol]
+    if isinstance(active, int):
+      reached = 0
+      while active:
+        low = active & -active
+        reached |= succ[low.bit_length() - 1]
+        active ^= low
+      return reached
+    if len(active) == 1:
+      return succ[next(iter(active))]
+    return frozenset().union(*map(succ.__getitem__, active))
+  
   def introduceTrapState(self):
     """
     Introduces a trap state to the DFA.
@@ -86,33 +205,41 @@ class PowersetConstruction:
     trapState = max(self.newStates.keys()) + 1
     
     for state in self.newStates:
-      for symbol in self.nfa.alphabet:
+      for symbol in self.alphabet:
         if (state, symbol) not in self.newTransitions:
           isNeeded = True
           self.newTransitions[(state, symbol)] = trapState
     
     if isNeeded:
-      for symbol in self.nfa.alphabet:
+      for symbol in self.alphabet:
         self.newTransitions[(trapState, symbol)] = trapState
-      self.newStates[trapState] = set()
+      self.newStates[trapState] = type(self.newStates[0])()    # the empty bitset or frozenset
   
-  def addState(self, id: int, old: set[int]):
+  def addState(self, id: int, old: int | frozenset[int]):
     self.newStates[id] = old
-    self.newStatesInv[self.to_bitmask(old)] = id
+    self.newStatesInv[old] = id
+  
+  def nfaStates(self, state: int) -> Iterable[int]:
+    """
+    Returns the NFA states a DFA state stands for.
+    """
+    subset = self.newStates[state]
+    return iterBits(subset) if isinstance(subset, int) else subset
     
   def to_bitmask(self, s: set[int]):
-    bitmask = 0
-    for val in s:
-      bitmask |= (1<<val)
-    return bitmask
+    return toBitmask(s)
   
 class DFA:
-  def __init__(self, states: set[int], alphabet: set[str], transition: dict[tuple[int, str], int], startState: int, acceptStates: set[int]):
+  compiled: CompiledDFA | None
+  classifier: Classifier | None     # input character -> CharSet symbol, when the alphabet has any
+  def __init__(self, states: set[int], alphabet: set['str | CharSet'], transition: dict[tuple[int, 'str | CharSet'], int], startState: int, acceptStates: set[int]):
     self.startState = startState
     self.states = states
     self.acceptStates = acceptStates
     self.transitions = transition
     self.alphabet = alphabet
+    self.compiled = None
+    self.classifier = Classifier(alphabet) if any(isinstance(symbol, CharSet) for symbol in alphabet) else None
     
   def changeTransition(self, src: int, symbol: str, dest: int):
     """
@@ -120,22 +247,40 @@ class DFA:
     This method will implement the transition change logic.
     """
     self.transitions[(src, symbol)] = dest
+    self.compiled = None
+    
+  def compile(self) -> CompiledDFA:
+    """
+    Returns the dense table form of the DFA, built once and reused.
+    """
+    if self.compiled is None:
+      self.compiled = CompiledDFA(self)
+    return self.compiled
     
+  @instrumentedRead("read.dfa")
   def read(self, inputString: str) -> bool:
     """
     Reads an input string and checks if it is accepted by the NFA.
     This method will implement the NFA acceptance logic.
     """
     currentState = self.startState
+    classify = self.classifier.classify if self.classifier is not None else None
     
     for symbol in inputString:
-      currentState = self.transitions[(currentState, symbol)]
+      currentState = self.transitions[(currentState, classify(symbol) if classify else symbol)]
     
     if currentState in self.acceptStates:
       return True
     
     return False
 
+  def read_many(self, inputs: Sequence[str | bytes] | bytes, offsets: Sequence[int] | None = None) -> np.ndarray:
+    """
+    Checks a batch of strings (or a packed buffer plus offsets) at once.
+    Returns a NumPy boolean array, see CompiledDFA.read_many.
+    """
+    return self.compile().read_many(inputs, offsets)
+
   def __str__(self) -> str:
     return {
       "state": self.states,
@@ -0,0 +1,171 @@
+from typing import TYPE_CHECKING, Callable, Iterator
+from CharClass import jointAlphabet, representative
+from PowersetConstruction import DFA
+
+if TYPE_CHECKING:
+  from CharClass import CharSet
+
+
+class ProductConstruction:
+  """
+  Product automaton of two DFAs, explored lazily from the pair of start states.
+  Both DFAs are run through their compiled tables, where every state that
+  cannot accept (and every symbol outside a DFA's alphabet) leads to the
+  sink row. `accept` decides whether a pair accepts from whether each side
+  does; pairs that can never accept under it are not explored.
+  """
+  alphabet: list['str | CharSet']
+  columns: list[tuple[int, int]]      # symbol index -> (left column, right column)
+  accept: Callable[[bool, bool], bool]
+  def __init__(self, dfa1: 'DFA', dfa2: 'DFA', accept: Callable[[bool, bool], bool]):
+    self.left = dfa1.compile()
+    self.right = dfa2.compile()
+    self.accept = accept
+    self.alphabet = jointAlphabet(dfa1.alphabet, dfa2.alphabet)
+    self.columns = [(self.left.column(representative(symbol)), self.right.column(representative(symbol))) for symbol in self.alphabet]
+    
+    # once a side is in its sink it stays rejecting, so only one outcome is left for it
+    self.leftLive = accept(False, False) or accept(False, True)
+    self.rightLive = accept(False, False) or accept(True, False)
+    self.start = (self.left.startState, self.right.startState)
+    
+  def isAccepting(self, pair: tuple[int, int]) -> bool:
+    return self.accept(bool(self.left.accept[pair[0]]), bool(self.right.accept[pair[1]]))
+  
+  def isHopeless(self, pair: tuple[int, int]) -> bool:
+    """
+    Checks if no string read from `pair` can end in an accepting pair.
+    """
+    leftSink = pair[0] == self.left.sink
+    rightSink = pair[1] == self.right.sink
+    if leftSink and rightSink:
+      return not self.accept(False, False)
+    return (leftSink and not self.leftLive) or (rightSink and not self.rightLive)
+  
+  def successors(self, pair: tuple[int, int]) -> Iterator[tuple[int, tuple[int, int]]]:
+    """
+    Yields (symbol index, next pair) for every symbol of the joint alphabet.
+    """
+    leftTable, rightTable = self.left.table, self.right.table
+    p, q = pair
+    for i, (a, b) in enumerate(self.columns):
+      yield i, (int(leftTable[p, a]), int(rightTable[q, b]))
+      
+  def toDFA(self) -> 'DFA':
+    """
+    Builds the reachable part of the product as a complete DFA.
+    Hopeless pairs all share one trap state.
+    """
+    ids: dict[tuple[int, int], int] = {self.start: 0}
+    pending = [self.start]
+    transitions: dict[tuple[int, str], int] = {}
+    acceptStates: set[int] = set()
+    hasTrap = False
+    
+    done = 0
+    while done < len(pending):
+      pair = pending[done]
+      if self.isAccepting(pair):
+        acceptStates.add(done)
+      for i, nextPair in self.successors(pair):
+        if self.isHopeless(nextPair):
+          hasTrap = True
+          transitions[(done, self.alphabet[i])] = -1     # patched to the trap state below
+          continue
+        id = ids.get(nextPair)
+        if id is None:
+          id = len(pending)
+          ids[nextPair] = id
+          pending.append(nextPair)
+        transitions[(done, self.alphabet[i])] = id
+      done += 1
+      
+    states = set(range(len(pending)))
+    if hasTrap:
+      trapState = len(pending)
+      states.add(trapState)
+      for key, dest in transitions.items():
+        if dest == -1:
+          transitions[key] = trapState
+      for symbol in self.alphabet:
+        transitions[(trapState, symbol)] = trapState
+        
+    return DFA(
+      states=states,
+      alphabet=set(self.alphabet),
+      transition=transitions,
+      startState=0,
+      acceptStates=acceptStates
+    )
+    
+  def witness(self) -> str | None:
+    """
+    Returns a shortest string ending in an accepting pair, or None if there is none.
+    The search stops at the first accepting pair, so the product is only
+    built as far as needed.
+    """
+    if self.isHopeless(self.start):
+      return None
+    parents: dict[tuple[int, int], tuple[tuple[int, int], int] | None] = {self.start: None}
+    pending = [self.start]
+    
+    done = 0
+    while done < len(pending):
+      pair = pending[done]
+      if self.isAccepting(pair):
+        symbols: list[str] = []
+        while parents[pair] is not None:
+          pair, i = parents[pair]
+          symbols.append(representative(self.alphabet[i]))
+        return "".join(reversed(symbols))
+      for i, nextPair in self.successors(pair):
+        if nextPair not in parents and not self.isHopeless(nextPair):
+          parents[nextPair] = (pair, i)
+          pending.append(nextPair)
+      done += 1
+    return None
+
+
+def intersection(dfa1: 'DFA', dfa2: 'DFA') -> 'DFA':
+  return ProductConstruction(dfa1, dfa2, lambda a, b: a and b).toDFA()
+
+def difference(dfa1: 'DFA', dfa2: 'DFA') -> 'DFA':
+  return ProductConstruction(dfa1, dfa2, lambda a, b: a and not b).toDFA()
+
+def symmetricDifference(dfa1: 'DFA', dfa2: 'DFA') -> 'DFA':
+  return ProductConstruction(dfa1, dfa2, lambda a, b: a != b).toDFA()
+
+def complement(dfa: 'DFA', alphabet: set[str]) -> 'DFA':
+  """
+  Returns a DFA accepting every string over `alphabet` that `dfa` rejects.
+  The alphabet is required: the DFA's own alphabet only holds the symbols
+  its regex mentions, so `a*` would never accept "b".
+  """
+  symbols = set(alphabet)
+  universe = DFA(
+    states={0},
+    alphabet=symbols,
+    transition={(0, symbol): 0 for symbol in symbols},
+    startState=0,
+    acceptStates={0}
+  )
+  return difference(universe, dfa)
+
+def isEmpty(dfa: 'DFA') -> bool:
+  return ProductConstruction(dfa, dfa, lambda a, b: a).witness() is None
+
+def inclusionWitness(dfa1: 'DFA', dfa2: 'DFA') -> str | None:
+  """
+  Returns a shortest string accepted by `dfa1` but not by `dfa2`, or None
+  if the language of `dfa1` is included in that of `dfa2`.
+  """
+  return ProductConstruction(dfa1, dfa2, lambda a, b: a and not b).witness()
+
+def isSubset(dfa1: 'DFA', dfa2: 'DFA') -> bool:
+  return inclusionWitness(dfa1, dfa2) is None
+
+def intersectionWitness(dfa1: 'DFA', dfa2: 'DFA') -> str | None:
+  """
+  Returns a shortest string accepted by both DFAs, or None if they are disjoint.
+  """
+  return ProductConstruction(dfa1, dfa2, lambda a, b: a and b).witness()
@@ -0,0 +1,294 @@
+from dataclasses import dataclass, field
+from CharClass import CharSet, parseBracket
+
+# +--------------------------------------------------------------------------+
+# |                      Grammar (highest binding last)                      |
+# +--------------------------------------------------------------------------+
+# | alternation := concatenation ("|" concatenation)*                        |
+# | concatenation := repetition ("."? repetition)*                           |
+# | repetition := atom ("*" | "+" | "?" | "{m}" | "{m,}" | "{m,n}")*         |
+# | atom := "(" alternation ")" | "[" bracket "]" | "\" char | "ε" | char    |
+# +--------------------------------------------------------------------------+
+# Unescaped spaces are ignored.
+
+special = set("()|*+?{}.[]\\ε ")
+
+
+class RegexSyntaxError(ValueError):
+  """
+  Raised for an invalid regex, `offset` is the index of the offending character.
+  """
+  offset: int
+  pattern: str
+  def __init__(self, message: str, pattern: str, offset: int):
+    super().__init__(f"{message} at offset {offset}")
+    self.offset = offset
+    self.pattern = pattern
+
+
+# nodes compare and hash by structure only, the source span is informational
+@dataclass(frozen=True)
+class Node:
+  start: int = field(default=0, compare=False, kw_only=True)
+  end: int = field(default=0, compare=False, kw_only=True)
+
+@dataclass(frozen=True)
+class Empty(Node):
+  pass
+
+@dataclass(frozen=True)
+class Symbol(Node):
+  label: 'str | CharSet'
+
+@dataclass(frozen=True)
+class Concat(Node):
+  items: tuple[Node, ...]
+
+@dataclass(frozen=True)
+class Alternation(Node):
+  items: tuple[Node, ...]
+
+@dataclass(frozen=True)
+class Star(Node):
+  item: Node
+
+@dataclass(frozen=True)
+class Plus(Node):
+  item: Node
+
+@dataclass(frozen=True)
+class Option(Node):
+  item: Node
+
+@dataclass(frozen=True)
+class Repeat(Node):
+  item: Node
+  low: int
+  high: int | None      # None when unbounded
+
+
+class Parser:
+  """
+  Single-pass regex parser producing a typed AST, following the grammar
+  above top-down. Descending into a group pushes the enclosing alternation
+  onto an explicit stack instead of recursing, so nesting depth is
+  unbounded. Every character is looked at a constant number of times,
+  which makes parsing linear in the length of the pattern.
+  """
+  pattern: str
+  length: int
+  pos: int
+  def __init__(self, pattern: str):
+    self.pattern = pattern
+    self.length = len(pattern)
+    self.pos = 0
+  
+  def error(self, message: str, offset: int | None = None) -> RegexSyntaxError:
+    return RegexSyntaxError(message, self.pattern, self.pos if offset is None else offset)
+  
+  def peek(self) -> str | None:
+    """
+    Skips spaces and returns the next character, None at the end.
+    """
+    pos = self.pos
+    if pos < self.length and self.pattern[pos] != " ":
+      return self.pattern[pos]
+    while pos < self.length and self.pattern[pos] == " ":
+      pos += 1
+    self.pos = pos
+    return self.pattern[pos] if pos < self.length else None
+  
+  def parse(self) -> Node:
+    if self.peek() is None:
+      raise self.error("Empty regex")
+    
+    # one frame per open group: (offset of "(", alternatives so far, items of the current concatenation)
+    frames: list[tuple[int, list[Node], list[Node]]] = []
+    groupStart = -1
+    alternatives: list[Node] = []
+    items: list[Node] = []
+    while True:
+      char = self.peek()
+      if char is None or char == "|" or char == ")":
+        if not items:
+          raise self.error("Expected an expression")
+        alternatives.append(concatenation(items))
+        if char == "|":
+          self.pos += 1
+          items = []
+          continue
+        
+        node = alternation(alternatives)
+        if char is None:
+          if frames:
+            raise self.error("Unclosed '('", groupStart)
+          return node
+        if not frames:
+          raise self.error("Unmatched ')'")
+        self.pos += 1
+        start = groupStart
+        groupStart, alternatives, items = frames.pop()
+        items.append(self.repetition(node, start))
+        continue
+      
+      if char == ".":       # explicit concatenation
+        if not items:
+          raise self.error("Unexpected '.'")
+        self.pos += 1
+        char = self.peek()
+        if char is None or char in "|).":
+          raise self.error("Expected an expression")
+      
+      if char == "(":
+        frames.append((groupStart, alternatives, items))
+        groupStart = self.pos
+        self.pos += 1
+        alternatives, items = [], []
+        continue
+      start = self.pos
+      items.append(self.repetition(self.atom(), start))
+  
+  def repetition(self, node: Node, start: int) -> Node:
+    """
+    Applies the postfix operators following an atom that began at `start`.
+    """
+    while True:
+      char = self.peek()
+      if char == "*":
+        self.pos += 1
+        node = Star(node, start=start, end=self.pos)
+      elif char == "+":
+        self.pos += 1
+        node = Plus(node, start=start, end=self.pos)
+      elif char == "?":
+        self.pos += 1
+        node = Option(node, start=start, end=self.pos)
+      elif char == "{":
+        low, high = self.bounds()
+        node = Repeat(node, low, high, start=start, end=self.pos)
+      else:
+        return node
+  
+  def bounds(self) -> tuple[int, int | None]:
+    """
+    Reads "{m}", "{m,}" or "{m,n}".
+    """
+    pattern = self.pattern
+    opening = self.pos
+    pos = opening + 1
+    digits = pos
+    while pos < len(pattern) and pattern[pos].isdigit():
+      pos += 1
+    if pos == digits:
+      raise self.error("Expected a number", pos)
+    low = int(pattern[digits:pos])
+    high: int | None = low
+    if pos < len(pattern) and pattern[pos] == ",":
+      pos += 1
+      digits = pos
+      while pos < len(pattern) and pattern[pos].isdigit():
+        pos += 1
+      high = int(pattern[digits:pos]) if pos > digits else None
+    if pos >= len(pattern) or pattern[pos] != "}":
+      raise self.error("Expected '}'", pos)
+    if high is not None and high < low:
+      raise self.error(f"Repetition bound {high} is below {low}", opening)
+    self.pos = pos + 1
+    return low, high
+  
+  def atom(self) -> Node:
+    char = self.peek()
+    start = self.pos
+    
+    if char == "[":
+      return Symbol(self.bracket(), start=start, end=self.pos)
+    if char == "\\":
+      if start + 1 >= len(self.pattern):
+        raise self.error("Trailing escape")
+      self.pos += 2
+      return Symbol(self.pattern[start + 1], start=start, end=self.pos)
+    if char == "ε":
+      self.pos += 1
+      return Empty(start=start, end=self.pos)
+    if char in special:
+      raise self.error(f"Unexpected '{char}'")
+    self.pos += 1
+    return Symbol(char, start=start, end=self.pos)
+  
+  def bracket(self) -> 'str | CharSet':
+    pattern = self.pattern
+    start = self.pos
+    pos = start + 1
+    if pos < len(pattern) and pattern[pos] == "^":
+      pos += 1
+    if pos < len(pattern) and pattern[pos] == "]":    # a leading "]" is literal
+      pos += 1
+    while pos < len(pattern) and pattern[pos] != "]":
+      pos += 2 if pattern[pos] == "\\" else 1
+    if pos >= len(pattern):
+      raise self.error("Unterminated bracket expression", start)
+    self.pos = pos + 1
+    try:
+      return parseBracket(pattern[start:pos + 1])
+    except ValueError as e:
+      raise self.error(str(e), start)
+
+
+def concatenation(items: list[Node]) -> Node:
+  if len(items) == 1:
+    return items[0]
+  return Concat(tuple(items), start=items[0].start, end=items[-1].end)
+
+def alternation(items: list[Node]) -> Node:
+  if len(items) == 1:
+    return items[0]
+  return Alternation(tuple(items), start=items[0].start, end=items[-1].end)
+
+def parse(pattern: str) -> Node:
+  """
+  Parses a regex into its AST.
+  """
+  return Parser(pattern).parse()
+
+def escapeSymbol(label: 'str | CharSet') -> str:
+  if isinstance(label, CharSet):
+    return str(label)
+  return "\\" + label if label in special else label
+
+def renderBounds(low: int, high: int | None) -> str:
+  if high == low:
+    return f"{{{low}}}"
+  return f"{{{low},{'' if high is None else high}}}"
+
+def toPostfix(node: Node) -> str:
+  """
+  Renders an AST in the postfix notation ThompsonConstruction consumes.
+  Concatenations nest to the right and alternations to the left, e.g.
+  "abc" -> "abc.." and "a|b|c" -> "ab|c|".
+  """
+  out: list[str] = []
+  # explicit stack of nodes to render and of operator strings to emit
+  work: list[Node | str] = [node]
+  while work:
+    item = work.pop()
+    if isinstance(item, str):
+      out.append(item)
+    elif isinstance(item, Empty):
+      out.append("ε")
+    elif isinstance(item, Symbol):
+      out.append(escapeSymbol(item.label))
+    elif isinstance(item, Concat):
+      work.append("." * (len(item.items) - 1))
+      work.extend(reversed(item.items))
+    elif isinstance(item, Alternation):
+      for other in reversed(item.items[1:]):
+        work.append("|")
+        work.append(other)
+      work.append(item.items[0])
+    elif isinstance(item, Repeat):
+      work.append(renderBounds(item.low, item.high))
+      work.append(item.item)
+    else:
+      work.append({Star: "*", Plus: "+", Option: "?"}[type(item)])
+      work.append(item.item)
+  return "".join(out)
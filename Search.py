@@ -0,0 +1,127 @@
+from typing import Iterator
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+
+
+class Searcher:
+  """
+  Finds the leftmost-longest, non-overlapping matches of a regex inside a text
+  in time linear in the text.
+  One right-to-left pass computes, for every position, the set of forward DFA
+  rows from which the rest of the text still leads to an accepting row (a
+  lazily built reverse subset DFA of the forward DFA). A match starts
+  wherever the start row is in that set. Each reported match is then run
+  forward from its start and stopped as soon as its row leaves the set, one
+  step after its longest end, so no position is read forward twice.
+  """
+  forwardAccept: list[bool]
+  predecessors: list[list[int]]       # column -> row -> bitset of rows moving to it
+  liveIds: dict[int, int]             # bitset of rows -> id
+  liveSets: list[int]                 # id -> bitset of rows
+  liveSteps: dict[tuple[int, int], int]   # (id, column) -> id of the set one position to the left
+  def __init__(self, regex: str):
+    self.regex = regex
+    nfa = ThompsonConstruction(regex).toNFA()
+    self.forward = PowersetConstruction(nfa).toDFA().compile()
+    self.forwardAccept = self.forward.accept.tolist()
+    
+    dfa = self.forward
+    rows = len(self.forwardAccept)
+    self.predecessors = [[0] * rows for _ in range(dfa.width)]
+    for row in range(rows):
+      for column in range(dfa.width):
+        target = dfa.flat[row * dfa.width + column] // dfa.width
+        self.predecessors[column][target] |= 1 << row
+    acceptMask = sum(1 << row for row, accepting in enumerate(self.forwardAccept) if accepting)
+    self.liveIds = {acceptMask: 0}
+    self.liveSets = [acceptMask]
+    self.liveSteps = dict()
+  
+  def liveStep(self, live: int, column: int) -> int:
+    """
+    Returns the id of the rows that are accepting or move on `column` into set `live`.
+    """
+    mask = self.liveSets[0]
+    predecessors = self.predecessors[column]
+    rows = self.liveSets[live]
+    while rows:
+      low = rows & -rows
+      mask |= predecessors[low.bit_length() - 1]
+      rows ^= low
+    result = self.liveIds.get(mask)
+    if result is None:
+      result = self.liveIds[mask] = len(self.liveSets)
+      self.liveSets.append(mask)
+    self.liveSteps[(live, column)] = result
+    return result
+  
+  def liveRows(self, columns: bytes | list[int]) -> list[int]:
+    """
+    Returns, for every position i (0 <= i <= len(text)), the id of the set of
+    rows from which text[i:j] reaches an accepting row for some j >= i.
+    """
+    live = [0] * (len(columns) + 1)
+    steps = self.liveSteps
+    current = 0
+    for i in range(len(columns) - 1, -1, -1):
+      column = columns[i]
+      step = steps.get((current, column))
+      current = step if step is not None else self.liveStep(current, column)
+      live[i] = current
+    return live
+  
+  def matchStarts(self, text: str | bytes) -> list[bool]:
+    """
+    Marks every position i (0 <= i <= len(text)) where a match text[i:j] starts.
+    """
+    startBit = 1 << self.forward.startState
+    live = self.liveRows(self.forward.inputColumns(text))
+    sets = self.liveSets
+    return [bool(sets[i] & startBit) for i in live]
+  
+  def longestEnd(self, columns: bytes | list[int], live: list[int], start: int) -> int:
+    """
+    Returns the end of the longest match starting at `start`, which must be a
+    match start. Reads one symbol past that end at most.
+    """
+    dfa = self.forward
+    flat, width, accept, sets = dfa.flat, dfa.width, self.forwardAccept, self.liveSets
+    
+    row = dfa.startState
+    end = start
+    for i in range(start, len(columns)):
+      row = flat[row * width + columns[i]] // width
+      if not sets[live[i + 1]] >> row & 1:
+        break
+      if accept[row]:
+        end = i + 1
+    return end
+  
+  def finditer(self, text: str | bytes) -> Iterator[tuple[int, int]]:
+    """
+    Yields the (start, end) spans of the leftmost-longest matches, left to right.
+    An empty match is reported at most once per position.
+    """
+    columns = self.forward.inputColumns(text)
+    live = self.liveRows(columns)
+    sets = self.liveSets
+    startBit = 1 << self.forward.startState
+    n = len(columns)
+    
+    i = 0
+    while i <= n:
+      if not sets[live[i]] & startBit:
+        i += 1
+        continue
+      end = self.longestEnd(columns, live, i)
+      yield i, end
+      i = end if end > i else i + 1
+  
+  def findAll(self, text: str | bytes) -> list[tuple[int, int]]:
+    return list(self.finditer(text))
+  
+  def search(self, text: str | bytes) -> tuple[int, int] | None:
+    """
+    Returns the span of the leftmost-longest match, or None.
+    """
+    return next(self.finditer(text), None)
@@ -0,0 +1,197 @@
+from RegexParser import Node, Empty, Symbol, Concat, Alternation, Star, Plus, Option, Repeat
+
+
+class Simplifier:
+  """
+  Rewrites a regex AST into a smaller one with the same language, bottom-up:
+  star idempotence ((a*)* -> a*, (a?)+ -> a*, a*a* -> a*), ε-elimination
+  (aε -> a, (ε|a)* -> a*, ε|a -> a?), flattening and deduplication of
+  alternations (a|a -> a) and factoring of shared prefixes out of
+  alternatives (ab|ac -> a(b|c)).
+  Every node built is hash-consed, so structurally equal subtrees are one
+  object and compare by identity.
+  """
+  table: dict[tuple, Node]          # structural key -> the one node with that structure
+  nullable: dict[int, bool]         # id(node) -> accepts the empty string
+  def __init__(self):
+    self.table = dict()
+    self.nullable = dict()
+  
+  def intern(self, node: Node) -> Node:
+    """
+    Returns the canonical node equal to `node`, whose children are already canonical.
+    """
+    if isinstance(node, Empty):
+      key: tuple = (Empty,)
+    elif isinstance(node, Symbol):
+      key = (Symbol, node.label)
+    elif isinstance(node, (Concat, Alternation)):
+      key = (type(node), tuple(map(id, node.items)))
+    elif isinstance(node, Repeat):
+      key = (Repeat, id(node.item), node.low, node.high)
+    else:
+      key = (type(node), id(node.item))
+    
+    canonical = self.table.get(key)
+    if canonical is None:
+      canonical = self.table[key] = node
+      self.nullable[id(node)] = self.computeNullable(node)
+    return canonical
+  
+  def computeNullable(self, node: Node) -> bool:
+    if isinstance(node, (Empty, Star, Option)):
+      return True
+    if isinstance(node, Symbol):
+      return False
+    if isinstance(node, Concat):
+      return all(self.nullable[id(item)] for item in node.items)
+    if isinstance(node, Alternation):
+      return any(self.nullable[id(item)] for item in node.items)
+    if isinstance(node, Repeat):
+      return node.low == 0 or self.nullable[id(node.item)]
+    return self.nullable[id(node.item)]
+  
+  def simplify(self, root: Node) -> Node:
+    """
+    Returns the simplified, hash-consed form of `root`.
+    """
+    done: dict[int, Node] = {}      # id(original node) -> simplified node
+    work: list[tuple[Node, bool]] = [(root, False)]
+    while work:
+      node, ready = work.pop()
+      if id(node) in done:
+        continue
+      children = node.items if isinstance(node, (Concat, Alternation)) else (node.item,) if hasattr(node, "item") else ()
+      if not ready and children:
+        work.append((node, True))
+        work.extend((child, False) for child in children)
+        continue
+      
+      span = (node.start, node.end)
+      if isinstance(node, Empty):
+        result = self.intern(Empty(start=span[0], end=span[1]))
+      elif isinstance(node, Symbol):
+        result = self.intern(Symbol(node.label, start=span[0], end=span[1]))
+      elif isinstance(node, Concat):
+        result = self.concat([done[id(item)] for item in node.items], span)
+      elif isinstance(node, Alternation):
+        result = self.alternation([done[id(item)] for item in node.items], span)
+      elif isinstance(node, Star):
+        result = self.star(done[id(node.item)], span)
+      elif isinstance(node, Plus):
+        result = self.plus(done[id(node.item)], span)
+      elif isinstance(node, Option):
+        result = self.option(done[id(node.item)], span)
+      else:
+        result = self.repeat(done[id(node.item)], node.low, node.high, span)
+      done[id(node)] = result
+    return done[id(root)]
+  
+  def concat(self, items: list[Node], span: tuple[int, int]) -> Node:
+    flat: list[Node] = []
+    for item in items:
+      for part in (item.items if isinstance(item, Concat) else (item,)):
+        if isinstance(part, Empty):
+          continue
+        if flat and isinstance(part, Star) and flat[-1] is part:    # a*a* -> a*
+          continue
+        flat.append(part)
+    if not flat:
+      return self.intern(Empty(start=span[0], end=span[1]))
+    if len(flat) == 1:
+      return flat[0]
+    return self.intern(Concat(tuple(flat), start=span[0], end=span[1]))
+  
+  def alternation(self, items: list[Node], span: tuple[int, int]) -> Node:
+    flat: list[Node] = []
+    seen: set[int] = set()
+    hasEmpty = False
+    for item in items:
+      for part in (item.items if isinstance(item, Alternation) else (item,)):
+        if isinstance(part, Empty):
+          hasEmpty = True
+        elif id(part) not in seen:
+          seen.add(id(part))
+          flat.append(part)
+    
+    flat = self.factor(flat, span)
+    if not flat:
+      return self.intern(Empty(start=span[0], end=span[1]))
+    node = flat[0] if len(flat) == 1 else self.intern(Alternation(tuple(flat), start=span[0], end=span[1]))
+    if hasEmpty and not self.nullable[id(node)]:
+      return self.option(node, span)
+    return node
+  
+  def factor(self, alternatives: list[Node], span: tuple[int, int]) -> list[Node]:
+    """
+    Merges alternatives that start with the same node into one
+    "prefix(tail1|tail2|...)" alternative, keeping first-appearance order.
+    """
+    groups: dict[int, list[tuple[Node, ...]]] = {}
+    for alternative in alternatives:
+      parts = alternative.items if isinstance(alternative, Concat) else (alternative,)
+      groups.setdefault(id(parts[0]), []).append(parts)
+    if len(groups) == len(alternatives):
+      return alternatives
+    
+    factored: list[Node] = []
+    for group in groups.values():
+      if len(group) == 1:
+        parts = group[0]
+        factored.append(parts[0] if len(parts) == 1 else self.concat(list(parts), span))
+        continue
+      # the longest prefix every member shares
+      length = 1
+      while all(len(parts) > length for parts in group) and all(parts[length] is group[0][length] for parts in group):
+        length += 1
+      tails = [self.concat(list(parts[length:]), span) for parts in group]
+      factored.append(self.concat([*group[0][:length], self.alternation(tails, span)], span))
+    return factored
+  
+  def star(self, item: Node, span: tuple[int, int]) -> Node:
+    if isinstance(item, Empty):
+      return item
+    if isinstance(item, (Star, Plus, Option)):
+      item = item.item
+    if isinstance(item, Alternation):
+      # (a*|b)* -> (a|b)*, ε is already gone from alternations under a star
+      unwrapped = [part.item if isinstance(part, (Star, Plus, Option)) else part for part in item.items]
+      if any(new is not old for new, old in zip(unwrapped, item.items)):
+        item = self.alternation(unwrapped, (item.start, item.end))
+    if isinstance(item, Option):
+      item = item.item
+    return self.intern(Star(item, start=span[0], end=span[1]))
+  
+  def plus(self, item: Node, span: tuple[int, int]) -> Node:
+    if isinstance(item, (Empty, Star, Plus)):
+      return item
+    if self.nullable[id(item)]:
+      return self.star(item, span)
+    return self.intern(Plus(item, start=span[0], end=span[1]))
+  
+  def option(self, item: Node, span: tuple[int, int]) -> Node:
+    if self.nullable[id(item)]:
+      return item
+    if isinstance(item, Plus):
+      return self.star(item.item, span)
+    return self.intern(Option(item, start=span[0], end=span[1]))
+  
+  def repeat(self, item: Node, low: int, high: int | None, span: tuple[int, int]) -> Node:
+    if isinstance(item, Empty) or high == 0:
+      return self.intern(Empty(start=span[0], end=span[1]))
+    if (low, high) == (0, None):
+      return self.star(item, span)
+    if (low, high) == (1, None):
+      return self.plus(item, span)
+    if (low, high) == (0, 1):
+      return self.option(item, span)
+    if (low, high) == (1, 1):
+      return item
+    return self.intern(Repeat(item, low, high, start=span[0], end=span[1]))
+
+
+def simplify(node: Node) -> Node:
+  """
+  Simplifies a regex AST, see Simplifier.
+  """
+  return Simplifier().simplify(node)
@@ -0,0 +1,80 @@
+from BitParallelNFA import BitParallelNFA
+from CompactNFA import CompactNFA
+from CompiledDFA import CompiledDFA
+from GlushkovConstruction import GlushkovNFA
+from PowersetConstruction import DFA
+from ThompsonConstruction import TCNFA
+
+
+class StreamMatcher:
+  """
+  Matches input that arrives in chunks, in constant memory.
+  Only the current automaton state is carried across chunk boundaries: a
+  row of the compiled table for DFAs, a bitset of NFA states for NFAs.
+  Byte chunks are read as latin-1 code units. The NFA simulator's chunk
+  tables are capped at `maxTableEntries` masks.
+  """
+  engine: CompiledDFA | BitParallelNFA
+  state: int            # current DFA row, or bitset of current NFA states
+  consumed: int         # number of symbols fed so far
+  finished: bool
+  def __init__(self, automaton: 'DFA | CompiledDFA | TCNFA | CompactNFA | GlushkovNFA', maxTableEntries: int = 1 << 16):
+    if isinstance(automaton, DFA):
+      self.engine = automaton.compile()
+    elif isinstance(automaton, (TCNFA, CompactNFA, GlushkovNFA)):
+      self.engine = BitParallelNFA(automaton, maxEntries=maxTableEntries)
+    else:
+      self.engine = automaton
+    self.reset()
+    
+  def reset(self):
+    """
+    Rewinds the matcher to the start of a new stream.
+    """
+    self.state = self.engine.startState if isinstance(self.engine, CompiledDFA) else self.engine.startMask
+    self.consumed = 0
+    self.finished = False
+    
+  def feed(self, chunk: str | bytes):
+    """
+    Advances the matcher over the next chunk of the stream.
+    """
+    if self.finished:
+      raise ValueError("Cannot feed a finished stream")
+    if isinstance(self.engine, BitParallelNFA) and not isinstance(chunk, str):
+      chunk = bytes(chunk).decode("latin-1")
+    self.state = self.engine.advance(self.state, chunk)
+    self.consumed += len(chunk)
+    
+  def accepting(self) -> bool:
+    """
+    Returns whether the input fed so far is accepted.
+    """
+    if isinstance(self.engine, CompiledDFA):
+      return bool(self.engine.accept[self.state])
+    return bool(self.state & self.engine.acceptMask)
+  
+  def finish(self) -> bool:
+    """
+    Ends the stream and returns whether it was accepted.
+    """
+    self.finished = True
+    return self.accepting()
+  
+  def snapshot(self) -> dict[str, int | bool]:
+    """
+    Returns a checkpoint of the stream that `restore` can resume from.
+    """
+    return {
+      "state": self.state,
+      "consumed": self.consumed,
+      "finished": self.finished
+    }
+  
+  def restore(self, snapshot: dict[str, int | bool]):
+    """
+    Resumes the stream from a checkpoint taken with `snapshot`.
+    """
+    self.state = int(snapshot["state"])
+    self.consumed = int(snapshot["consumed"])
+    self.finished = bool(snapshot["finished"])
@@ -1,10 +1,20 @@
-from typing import TypeVar, Generic, Callable
+import re
+from typing import TypeVar, Generic, Callable, Iterator
 from queue import Queue
+from CharClass import CharSet, parseBracket
+from RegexParser import Node, Empty, Symbol, Concat, Alternation, Star, Plus, Option, Repeat, parse, toPostfix
+from Simplify import Simplifier
+from EpsilonClosure import epsilonClosures
+from BitParallelNFA import BitParallelNFA
+from utils.bitset import fromBitmask
+from Instrumentation import instrumented, nfaCounters, instrumentedRead
 
 T = TypeVar("T")
 
 class Stack(Generic[T]):
-  data: list[T] = []
+  data: list[T]
+  def __init__(self):
+    self.data = []
   
   def isEmpty(self) -> bool:
     return len(self.data) == 0
@@ -44,85 +54,148 @@ operations: dict[str, int] = {
   "|": 8
 }
 
+def precedence(token: str) -> int | None:
+  """
+  Returns the precedence of an operator token, None for operands.
+  """
+  if token in operations:
+    return operations[token]
+  if token[0] == "{":
+    return 5
+  return None
+
+def parseRepetition(token: str) -> tuple[int, int | None]:
+  """
+  Parses "{m}", "{m,}" or "{m,n}" into (m, n), n being None when unbounded.
+  """
+  match = re.fullmatch(r"\{(\d+)(,(\d*))?\}", token)
+  if match is None:
+    raise ValueError(f"Invalid repetition '{token}'")
+  low = int(match.group(1))
+  if match.group(2) is None:
+    return low, low
+  high = int(match.group(3)) if match.group(3) else None
+  if high is not None and high < low:
+    raise ValueError(f"Invalid repetition '{token}'")
+  return low, high
+
+def tokenize(string: str) -> list[str]:
+  """
+  Splits a regex into tokens: single characters, escapes ("\\x"), bracket
+  expressions ("[...]") and bounded repetitions ("{m,n}").
+  """
+  tokens: list[str] = []
+  i = 0
+  n = len(string)
+  while i < n:
+    char = string[i]
+    if char == "\\":
+      if i + 1 >= n:
+        raise ValueError("Invalid input regex: trailing escape")
+      tokens.append(string[i:i + 2])
+      i += 2
+    elif char == "[":
+      j = i + 1
+      if j < n and string[j] == "^":
+        j += 1
+      if j < n and string[j] == "]":    # a leading "]" is literal
+        j += 1
+      while j < n and string[j] != "]":
+        j += 2 if string[j] == "\\" else 1
+      if j >= n:
+        raise ValueError("Invalid input regex: unterminated bracket expression")
+      tokens.append(string[i:j + 1])
+      i = j + 1
+    elif char == "{":
+      j = string.find("}", i)
+      if j < 0:
+        raise ValueError("Invalid input regex: unterminated repetition")
+      parseRepetition(string[i:j + 1])
+      tokens.append(string[i:j + 1])
+      i = j + 1
+    else:
+      tokens.append(char)
+      i += 1
+  return tokens
+
+def tokenLabel(token: str) -> 'str | CharSet':
+  """
+  Returns the transition label of an operand token.
+  """
+  if token[0] == "[":
+    return parseBracket(token)
+  if token[0] == "\\":
+    return token[1]
+  return token
+
+def astChildren(node: Node) -> tuple[Node, ...]:
+  if isinstance(node, (Concat, Alternation)):
+    return node.items
+  if isinstance(node, (Star, Plus, Option, Repeat)):
+    return (node.item,)
+  return ()
+
 def standardizeRegex(string: str) -> str:
   """
   Standardizes a regex string by adding implicit concatenation operators.
   This function ensures that concatenation is explicitly represented in the regex.
   """
-  standardized = ""
-  for i in range(len(string)):
-    currentChar = string[i]
+  tokens = tokenize(string)
+  standardized: list[str] = []
+  for i in range(len(tokens)):
+    currentToken = tokens[i]
     
     # handle implicit concatenation
-    if i > 0 and (string[i-1] not in operations or operations[string[i-1]] == 5 or string[i-1] == ")") and (currentChar not in operations or currentChar == "("):
-      standardized += "."
+    if i > 0 and (precedence(tokens[i-1]) in (None, 5) or tokens[i-1] == ")") and (precedence(currentToken) is None or currentToken == "("):
+      standardized.append(".")
       
-    standardized += currentChar
+    standardized.append(currentToken)
     
-  return standardized
+  return "".join(standardized)
     
 
 def infixToPostfix(string: str) -> str:
-  stack: Stack[str] = Stack()
-  postfix: str = ""
-  for i in range(len(string)):
-    currentChar: str = string[i]
-    if currentChar == " ":
-      continue  # skip spaces
-      
-    if currentChar in operations:
-      if currentChar == ")":
-        while True:
-          top = stack.peek()
-          if top is None:
-            raise ValueError("Invalid input regex")
-          if top == "(":
-            stack.pop()
-            break
-          postfix += stack.pop()
-        top = stack.peek()
-      elif operations[currentChar] == 5:
-        postfix += currentChar
-      else:
-        stack.push(currentChar)
-    else:
-      postfix += currentChar
-      top = stack.peek()
-      if top and top != "(":
-        if i >= len(string) - 1 or (string[i + 1] in operations and operations[string[i+1]] >= operations[top]):
-          postfix += stack.pop()
-  
-       
-  while not stack.isEmpty():
-    top = stack.pop()
-    if top == "(":
-      raise ValueError("Invalid input regex")
-    postfix += top
-  
-  return postfix
+  """
+  Converts an infix regex (explicit "." optional) to postfix, via its AST.
+  """
+  return toPostfix(parse(string))
 
 class ThompsonConstruction:
-  def __init__(self, regex: str):
+  """
+  With `simplify` set, the AST is rewritten into an equivalent smaller one
+  (see Simplifier) before any NFA is built.
+  """
+  ast: Node
+  postfix: str
+  def __init__(self, regex: str, simplify: bool = False):
     self.regex = regex
-    standardRegex = standardizeRegex(regex)
-    self.postfix = infixToPostfix(standardRegex)
+    self.ast = parse(regex)
+    if simplify:
+      self.ast = Simplifier().simplify(self.ast)
+    self.postfix = toPostfix(self.ast)
 
-  def toNFA(self) -> 'TCNFA':
+  @instrumented("thompson", nfaCounters)
+  def toNFA(self, arena: bool = True) -> 'TCNFA':
     """
     Converts the postfix regex to an NFA using Thompson's construction.
-    This method will implement the actual NFA construction logic.
+    With `arena` set, every fragment is written straight into one shared
+    state arena (linear time); otherwise fragments are built separately and
+    renumbered on every operation. Both modes produce the same TCNFA.
     """
+    if arena:
+      return self.arenaToNFA()
+    
     if not self.postfix:
       raise ValueError("Postfix expression is empty, cannot construct NFA")
     
     stack = Stack[TCNFA]()
     
-    for char in self.postfix:
-      if char == 'ε':
+    for token in tokenize(self.postfix):
+      if token == 'ε':
         stack.push(self.nullSymbol())
-      elif char not in operations:
-        stack.push(self.symbolToNFA(char))
-      elif char == '|':
+      elif precedence(token) is None:
+        stack.push(self.symbolToNFA(tokenLabel(token)))
+      elif token == '|':
         nfa2 = stack.pop()
         nfa1 = stack.pop()
         
@@ -131,7 +204,7 @@ class ThompsonConstruction:
         
         newNFA = self.union(nfa1, nfa2)
         stack.push(newNFA)
-      elif char == '.':
+      elif token == '.':
         nfa2 = stack.pop()
         nfa1 = stack.pop()
         
@@ -146,7 +219,14 @@ class ThompsonConstruction:
         if nfa is None:
           raise ValueError("Invalid NFA stack state for Kleene closure operation")
         
-        newNFA = self.kleeneClosure(nfa)
+        if token == '*':
+          newNFA = self.kleeneClosure(nfa)
+        elif token == '+':
+          newNFA = self.concatenation(nfa, self.kleeneClosure(nfa))
+        elif token == '?':
+          newNFA = self.optional(nfa)
+        else:
+          newNFA = self.repetition(nfa, *parseRepetition(token))
         stack.push(newNFA)
         
     NFA = stack.pop()
@@ -156,6 +236,129 @@ class ThompsonConstruction:
     return NFA
     
     
+  def arenaToNFA(self) -> 'TCNFA':
+    """
+    Builds the Thompson NFA in a single shared arena of states.
+    The AST is first folded into a tree of fragment handles whose sizes
+    are known up front, so each fragment is then laid out once at its final
+    offset and no state is ever renumbered. "+" and "{m,n}" become chains of
+    concatenations that reuse the handle of their operand, as does any AST
+    node shared between several parents.
+    """
+    kinds: list[str] = []           # handle -> 'ε', 'sym', '|', '.', '*' or '?'
+    labels: list['str | CharSet | None'] = []
+    children: list[tuple[int, ...]] = []
+    sizes: list[int] = []           # handle -> number of states in fragment
+    handles: dict[int, int] = {}    # id(AST node) -> handle
+    
+    def node(kind: str, operands: tuple[int, ...], size: int, label: 'str | CharSet | None' = None) -> int:
+      kinds.append(kind)
+      labels.append(label)
+      children.append(operands)
+      sizes.append(size)
+      return len(kinds) - 1
+    
+    def concat(nfa1: int, nfa2: int) -> int:
+      return node('.', (nfa1, nfa2), sizes[nfa1] + sizes[nfa2] - 1)
+    
+    # post-order walk of the AST, children get their handles first
+    work: list[tuple[Node, bool]] = [(self.ast, False)]
+    while work:
+      ast, ready = work.pop()
+      if id(ast) in handles:
+        continue
+      operands = astChildren(ast)
+      if not ready and operands:
+        work.append((ast, True))
+        work.extend((child, False) for child in reversed(operands))
+        continue
+      
+      if isinstance(ast, Empty):
+        handle = node('ε', (), 2)
+      elif isinstance(ast, Symbol):
+        handle = node('sym', (), 2, ast.label)
+      elif isinstance(ast, Concat):
+        handle = handles[id(ast.items[-1])]
+        for item in reversed(ast.items[:-1]):
+          handle = concat(handles[id(item)], handle)
+      elif isinstance(ast, Alternation):
+        handle = handles[id(ast.items[0])]
+        for item in ast.items[1:]:
+          other = handles[id(item)]
+          handle = node('|', (handle, other), sizes[handle] + sizes[other] + 2)
+      else:
+        nfa = handles[id(ast.item)]
+        if isinstance(ast, Star):
+          handle = node('*', (nfa,), sizes[nfa] + 2)
+        elif isinstance(ast, Option):
+          handle = node('?', (nfa,), sizes[nfa] + 2)
+        elif isinstance(ast, Plus):
+          handle = concat(nfa, node('*', (nfa,), sizes[nfa] + 2))
+        else:
+          parts = [nfa] * ast.low
+          if ast.high is None:
+            parts.append(node('*', (nfa,), sizes[nfa] + 2))
+          elif ast.high > ast.low:
+            optional = node('?', (nfa,), sizes[nfa] + 2)
+            parts.extend([optional] * (ast.high - ast.low))
+          if parts:
+            handle = parts[0]
+            for part in parts[1:]:
+              handle = concat(handle, part)
+          else:
+            handle = node('ε', (), 2)
+      handles[id(ast)] = handle
+    
+    root = handles[id(self.ast)]
+    transitions: dict[tuple[int, 'str | CharSet'], set[int]] = {}
+    alphabet: set['str | CharSet'] = set()
+    
+    def link(src: int, symbol: 'str | CharSet', *dest: int):
+      if (src, symbol) in transitions:
+        transitions[(src, symbol)].update(dest)
+      else:
+        transitions[(src, symbol)] = set(dest)
+    
+    # lay out fragments top-down, a fragment at offset o occupies [o, o + size)
+    work: list[tuple[int, int]] = [(root, 0)]
+    while work:
+      handle, offset = work.pop()
+      kind = kinds[handle]
+      accept = offset + sizes[handle] - 1
+      if kind == 'ε':
+        link(offset, 'ε', accept)
+      elif kind == 'sym':
+        alphabet.add(labels[handle])
+        link(offset, labels[handle], accept)
+      elif kind == '|':
+        nfa1, nfa2 = children[handle]
+        start2 = offset + 1 + sizes[nfa1]
+        link(offset, 'ε', offset + 1, start2)
+        link(start2 - 1, 'ε', accept)
+        link(accept - 1, 'ε', accept)
+        work.append((nfa1, offset + 1))
+        work.append((nfa2, start2))
+      elif kind == '.':
+        nfa1, nfa2 = children[handle]
+        work.append((nfa1, offset))
+        work.append((nfa2, offset + sizes[nfa1] - 1))
+      elif kind == '?':
+        link(offset, 'ε', offset + 1, accept)
+        link(accept - 1, 'ε', accept)
+        work.append((children[handle][0], offset + 1))
+      else:
+        link(offset, 'ε', offset + 1, accept)
+        link(accept - 1, 'ε', offset + 1, accept)
+        work.append((children[handle][0], offset + 1))
+    
+    return TCNFA(
+      states=set(range(sizes[root])),
+      alphabet=alphabet,
+      transition=transitions,
+      startState=0,
+      acceptState=sizes[root] - 1
+    )
+    
   def nullSymbol(self) -> 'TCNFA':
     """
     Creates an NFA that accepts the empty string (null symbol).
@@ -184,6 +387,47 @@ class ThompsonConstruction:
     )
     return nfa
   
+  def optional(self, nfa: 'TCNFA') -> 'TCNFA':
+    """
+    Creates an NFA that accepts the empty string or the language of `nfa`.
+    """
+    n = len(nfa.states)
+    
+    nfa = nfa.remapStates(lambda x: x + 1)
+    nfa.addTransition(nfa.acceptState, 'ε', n+1)
+    
+    newNFA = TCNFA(
+      states={0, n+1},
+      alphabet=set(),
+      transition={
+        (0, 'ε'): {nfa.startState, n+1},
+      },
+      startState=0,
+      acceptState=n+1
+    )
+    
+    newNFA.mergeNFA(nfa)
+    
+    return newNFA
+  
+  def repetition(self, nfa: 'TCNFA', low: int, high: int | None) -> 'TCNFA':
+    """
+    Creates an NFA that accepts `low` to `high` (None: any number of)
+    repetitions of `nfa`.
+    """
+    parts = [nfa] * low
+    if high is None:
+      parts.append(self.kleeneClosure(nfa))
+    elif high > low:
+      parts.extend([self.optional(nfa)] * (high - low))
+    if not parts:
+      return self.nullSymbol()
+    
+    newNFA = parts[0]
+    for part in parts[1:]:
+      newNFA = self.concatenation(newNFA, part)
+    return newNFA
+  
   def union(self, nfa1: 'TCNFA', nfa2: 'TCNFA') -> 'TCNFA':
     """
     Creates an NFA that represents the union of two NFAs.
@@ -258,6 +502,8 @@ class ThompsonConstruction:
 
 class TCNFA:
   nullCache: dict[int, set[int]]
+  closures: list[int] | None          # closures[s] = ε-closure of s as a bitset
+  simulator: BitParallelNFA | None
   def __init__(self, states: set[int], alphabet: set[str], transition: dict[tuple[int, str], set[int]], startState: int, acceptState: int):
     self.startState = startState
     self.states = states
@@ -265,6 +511,27 @@ class TCNFA:
     self.transitions = transition
     self.alphabet = alphabet
     self.nullCache = dict()
+    self.closures = None
+    self.simulator = None
+    
+  def invalidate(self):
+    """
+    Drops everything derived from the transitions, called after each change.
+    """
+    self.nullCache = dict()
+    self.closures = None
+    self.simulator = None
+    
+  def acceptMask(self) -> int:
+    return 1 << self.acceptState
+    
+  def closureTable(self) -> list[int]:
+    """
+    Returns the ε-closure bitset of every state, computed once per NFA.
+    """
+    if self.closures is None:
+      self.closures = epsilonClosures(max(self.states) + 1, lambda s: self.transitions.get((s, 'ε'), ()))
+    return self.closures
     
   def addTransition(self, src: int, symbol: str, *dest: int):
     """
@@ -275,6 +542,21 @@ class TCNFA:
       self.transitions[(src, symbol)].update(dest)
     else:
       self.transitions[(src, symbol)] = set(dest)
+    self.invalidate()
+      
+  def symbolEdges(self) -> Iterator[tuple[int, str, set[int]]]:
+    """
+    Yields (src, symbol, destinations) for every non-null transition.
+    """
+    for (src, symbol), dest in self.transitions.items():
+      if symbol != 'ε':
+        yield src, symbol, dest
+    
+  def successors(self, state: int, symbol: str) -> set[int]:
+    """
+    Returns the states reachable from `state` on `symbol` (or 'ε').
+    """
+    return self.transitions.get((state, symbol), set())
       
   def remapStates(self, x: Callable[[int], int]) -> 'TCNFA':
     """
@@ -309,60 +591,42 @@ class TCNFA:
     self.states = newStates
     self.alphabet = newAlphabet
     self.transitions = newTransitions
+    self.invalidate()
     
+  @instrumentedRead("read.nfa")
   def read(self, inputString: str) -> bool:
     """
     Reads an input string and checks if it is accepted by the NFA.
-    This method will implement the NFA acceptance logic.
+    Runs on the bit-parallel simulator, built once per NFA.
     """
-    currentStates = self.nonDeterministicRead(self.startState, cache=self.nullCache)
-    
-    for symbol in inputString:
-      nextStates = set()
-      if symbol == "ε":   # null sentinel not allowed in input
-        raise ValueError("Input string cannot contain null symbol 'ε'")
-      for state in currentStates:
-        if (state, symbol) in self.transitions:
-          nextStates.update(*[self.nonDeterministicRead(s, cache=self.nullCache) for s in self.transitions[(state, symbol)]])
-          
-      currentStates = nextStates
-    
-    if self.acceptState in currentStates:
-      return True
+    if self.simulator is None:
+      self.simulator = BitParallelNFA(self)
+    return self.simulator.read(inputString)
     
-    return False
-    
-  def nonDeterministicRead(self, state: int, cache: dict[int, set[int]] | None = None, processing: set[int] | None = None) -> set[int]:
+  def nonDeterministicRead(self, state: int, cache: dict[int, set[int]] | None = None) -> set[int]:
     """
     Returns all null reachable states from the given state.
-    This method will implement the logic to find all null reachable states.
-    Caches in 'cache'
-    """
-    # keep track of states being processed to avoid deadlock 0 -> 1 -> 2 -> 0
-    # will lead to infinite loop it 0 is still being processed
-    if not processing:
-      processing = set()
-    if state in processing:
-      return {state}
-    else:
-      processing.add(state)
-    
+    Looked up in the precomputed closure table; caches in 'cache'
+    """
     if cache is None:
-      cache = dict()
-      
-    if state in cache:
-      processing.remove(state)
-      return cache[state]
-    
-    reachableStates = {state}
-    
-    if (state, 'ε') in self.transitions:
-      reachableStates.update(*[self.nonDeterministicRead(s, cache, processing=processing) for s in self.transitions[(state, 'ε')]])
-    
-    cache[state] = {*reachableStates}
-    processing.remove(state)
-
-    return reachableStates
+      cache = self.nullCache
+    if state not in cache:
+      cache[state] = fromBitmask(self.closureTable()[state])
+    return cache[state]
+  
+  def __eq__(self, other: object) -> bool:
+    if not isinstance(other, TCNFA):
+      return NotImplemented
+    return (
+      self.states == other.states
+      and self.alphabet == other.alphabet
+      and self.transitions == other.transitions
+      and self.startState == other.startState
+      and self.acceptState == other.acceptState
+    )
+  
+  __hash__ = object.__hash__      # NFAs are mutable, so identity hashing keeps them usable as keys
+  
   def __str__(self) -> str:
     return {
       "state": self.states,
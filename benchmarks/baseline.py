@@ -0,0 +1,22 @@
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+BASELINE = "8daeee1"    # the commit before the bitset and arena rewrites
+
+
+def baselineModule(name: str) -> types.ModuleType:
+  """
+  Loads module `name` as it was in the baseline commit, read with git show,
+  so benchmarks can time the original code without keeping a copy of it.
+  Imports inside it resolve to the current tree.
+  """
+  key = f"baseline.{name}"
+  if key not in sys.modules:
+    root = Path(__file__).resolve().parent.parent
+    source = subprocess.run(["git", "show", f"{BASELINE}:{name}.py"], cwd=root, capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType(key)
+    exec(compile(source, f"{BASELINE}:{name}.py", "exec"), module.__dict__)
+    sys.modules[key] = module
+  return sys.modules[key]
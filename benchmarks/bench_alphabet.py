@@ -0,0 +1,33 @@
+import string
+import time
+from Hopcroft import Hopcroft
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+
+
+def alternation(chars: str) -> str:
+  return "(" + "|".join(chars) + ")"
+
+def main():
+  lower = string.ascii_lowercase
+  word = alternation(lower + string.digits + "_")
+  patterns = {
+    "identifier": alternation(lower + "_") + word + "*",
+    "keywords": "(" + "|".join(["while", "for", "return", "yield", "import"]) + ")" + alternation("-:") + word + word + "*",
+    "hex literal": "0x" + alternation(string.hexdigits) + "{1,8}",
+    "log line": alternation(string.digits) + "{4}-" + alternation(string.digits) + "{2}" + alternation("-" + lower) + "*(error|warn)",
+  }
+  print(f"{'pattern':>12} | {'symbols':>7} | {'classes':>7} | {'DFA states':>10} | {'cells':>6} | {'cells (c)':>9} | {'build (s)':>9} | {'build (c)':>9}")
+  for name, regex in patterns.items():
+    nfa = ThompsonConstruction(regex).toNFA()
+    results = []
+    for compress in (False, True):
+      start = time.perf_counter()
+      dfa = Hopcroft(PowersetConstruction(nfa, compressAlphabet=compress).toDFA()).minimize()
+      table = dfa.compile().table
+      results.append((len(dfa.alphabet), len(dfa.states), table.size, time.perf_counter() - start))
+    (symbols, states, cells, plain), (classes, _, compressedCells, compressed) = results
+    print(f"{name:>12} | {symbols:>7} | {classes:>7} | {states:>10} | {cells:>6} | {compressedCells:>9} | {plain:>9.4f} | {compressed:>9.4f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,26 @@
+import sys
+from CompactNFA import CompactNFA
+from ThompsonConstruction import ThompsonConstruction, TCNFA
+from benchmarks.bench_thompson import generatePattern
+
+
+def sizeOfTCNFA(nfa: 'TCNFA') -> int:
+  """
+  Approximates the bytes held by a TCNFA's state set and transition map.
+  Small ints are interned by CPython and are not counted.
+  """
+  total = sys.getsizeof(nfa.states) + sys.getsizeof(nfa.transitions)
+  for key, dest in nfa.transitions.items():
+    total += sys.getsizeof(key) + sys.getsizeof(dest)
+  return total
+
+def main():
+  print(f"{'states':>8} | {'TCNFA B/state':>13} | {'CompactNFA B/state':>18}")
+  for n in [1000, 10000, 100000]:
+    nfa = ThompsonConstruction(generatePattern(n)).toNFA()
+    compact = CompactNFA.fromTCNFA(nfa)
+    states = len(nfa.states)
+    print(f"{states:>8} | {sizeOfTCNFA(nfa) / states:>13.1f} | {compact.nbytes() / states:>18.1f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,27 @@
+import random
+import time
+from CompiledDFA import CompiledDFA
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+
+
+def throughput(read, data: str | bytes) -> float:
+  best = float("inf")
+  for _ in range(3):
+    start = time.perf_counter()
+    read(data)
+    best = min(best, time.perf_counter() - start)
+  return len(data) / best / 1e6
+
+def main():
+  rng = random.Random(0)
+  text = "".join(rng.choice("ab") for _ in range(2_000_000))
+  data = text.encode()
+  print(f"{'pattern':>20} | {'dict (MB/s)':>11} | {'compiled str (MB/s)':>19} | {'compiled bytes (MB/s)':>21}")
+  for regex in ["(a|b)*abb", "(a|b)*a(a|b)(a|b)(a|b)(a|b)"]:
+    dfa = PowersetConstruction(ThompsonConstruction(regex).toNFA()).toDFA()
+    compiled = CompiledDFA(dfa)
+    print(f"{regex:>20.20} | {throughput(dfa.read, text):>11.2f} | {throughput(compiled.read, text):>19.2f} | {throughput(compiled.read, data):>21.2f}")
+
+if __name__ == "__main__":
+  main()
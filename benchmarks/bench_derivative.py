@@ -0,0 +1,36 @@
+import time
+from DerivativeConstruction import DerivativeConstruction
+from Hopcroft import Hopcroft
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+from benchmarks.bench_thompson import generatePattern
+
+
+patterns = {
+  "(a|b)*abb": "(a|b)*abb",
+  "a(a|b){8}": "(a|b)*a(a|b){8}",
+  "binary mod 3": "(0|(1(01*(00)*0)*1)*)*",
+  "keywords": "|".join(["if", "in", "int", "import", "for", "float", "from", "while", "with", "return"]),
+  "identifier": "[a-z_][a-z0-9_]*(-[a-z]+)*",
+  "date": "[0-9]{4}-[0-9]{2}-[0-9]{2}",
+  "generated 200": generatePattern(200),
+}
+
+def best(action, repeat: int = 3) -> tuple[float, object]:
+  fastest, result = float("inf"), None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    result = action()
+    fastest = min(fastest, time.perf_counter() - start)
+  return fastest, result
+
+def main():
+  print(f"{'pattern':>13} | {'powerset':>8} | {'derivative':>10} | {'minimal':>7} | {'powerset (ms)':>13} | {'derivative (ms)':>15}")
+  for name, regex in patterns.items():
+    powersetTime, powerset = best(lambda: PowersetConstruction(ThompsonConstruction(regex).toNFA()).toDFA())
+    derivativeTime, derivative = best(lambda: DerivativeConstruction(regex).toDFA())
+    minimal = len(Hopcroft(powerset).minimize().states)
+    print(f"{name:>13} | {len(powerset.states):>8} | {len(derivative.states):>10} | {minimal:>7} | {powersetTime * 1e3:>13.2f} | {derivativeTime * 1e3:>15.2f}")
+
+if __name__ == "__main__":
+  main()
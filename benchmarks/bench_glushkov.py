@@ -0,0 +1,58 @@
+import random
+import time
+from GlushkovConstruction import GlushkovConstruction
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+from benchmarks.bench_thompson import generatePattern
+
+
+patterns = {
+  "(a|b)*abb": "(a|b)*abb",
+  "a(a|b){8}": "(a|b)*a(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)",
+  "identifier": "[a-z_][a-z0-9_]*(-[a-z]+)*",
+  "generated 200": generatePattern(200),
+  "generated 1000": generatePattern(1000),
+}
+
+def walk(nfa, rng: random.Random, limit: int = 20000) -> str:
+  """
+  Returns the labels along a random path of a Glushkov NFA, so every prefix
+  of it keeps both NFAs alive.
+  """
+  chars, state = [], nfa.startState
+  while len(chars) < limit:
+    options = [(symbol, dest) for (src, symbol), dests in nfa.transitions.items() if src == state for dest in dests]
+    if not options:
+      break
+    symbol, state = rng.choice(options)
+    chars.append(symbol if isinstance(symbol, str) else chr(symbol.ranges[0][0]))
+  return "".join(chars)
+
+def best(action, repeat: int = 3) -> float:
+  fastest = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    action()
+    fastest = min(fastest, time.perf_counter() - start)
+  return fastest
+
+def main():
+  rng = random.Random(0)
+  builders = {
+    "thompson": lambda regex: ThompsonConstruction(regex).toNFA(),
+    "glushkov": lambda regex: GlushkovConstruction(regex).toNFA(),
+  }
+  print(f"{'pattern':>15} | {'backend':>8} | {'states':>6} | {'edges':>6} | {'ε-edges':>7} | {'NFA (ms)':>8} | {'DFA (ms)':>8} | {'read (us/char)':>14}")
+  for name, regex in patterns.items():
+    text = walk(GlushkovConstruction(regex).toNFA(), rng)
+    for backend, build in builders.items():
+      nfa = build(regex)
+      edges = sum(len(dest) for (_, symbol), dest in nfa.transitions.items() if symbol != 'ε')
+      nullEdges = sum(len(dest) for (_, symbol), dest in nfa.transitions.items() if symbol == 'ε')
+      construct = best(lambda: build(regex))
+      subsets = best(lambda: PowersetConstruction(nfa).toDFA())
+      read = best(lambda: nfa.read(text)) / len(text)
+      print(f"{name:>15} | {backend:>8} | {len(nfa.states):>6} | {edges:>6} | {nullEdges:>7} | {construct * 1e3:>8.2f} | {subsets * 1e3:>8.2f} | {read * 1e6:>14.3f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,45 @@
+import random
+import time
+import Compiler
+import Instrumentation
+from CompiledDFA import CompiledDFA
+from PowersetConstruction import DFA
+
+
+def best(action, repeat: int = 5) -> float:
+  fastest = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    action()
+    fastest = min(fastest, time.perf_counter() - start)
+  return fastest
+
+def main():
+  rng = random.Random(0)
+  dfa = Compiler.compileUncached("(a|b)*a(a|b){6}")
+  compiled = dfa.compile()
+  words = ["".join(rng.choice("ab") for _ in range(rng.randrange(1, 16))) for _ in range(20000)]
+  patterns = ["(a|b)*a(a|b){6}", "[a-z_][a-z0-9_]*", "(0|(1(01*(00)*0)*1)*)*", "if|in|int|for|float"]
+  
+  def compileAll():
+    for regex in patterns:
+      Compiler.compileUncached(regex)
+  
+  bareDFA, bareCompiled = DFA.read.__wrapped__, CompiledDFA.read.__wrapped__
+  cases = {
+    "DFA.read x20000": (lambda: [dfa.read(w) for w in words], lambda: [bareDFA(dfa, w) for w in words]),
+    "CompiledDFA.read x20000": (lambda: [compiled.read(w) for w in words], lambda: [bareCompiled(compiled, w) for w in words]),
+    "compile x4": (compileAll, None),
+  }
+  print(f"{'case':>24} | {'bare (ms)':>9} | {'off (ms)':>8} | {'on (ms)':>8} | {'on+memory (ms)':>14}")
+  for name, (instrumented, bare) in cases.items():
+    bareTime = best(bare) if bare is not None else float("nan")
+    off = best(instrumented)
+    with Instrumentation.profile():
+      on = best(instrumented)
+    with Instrumentation.profile(traceMemory=True):
+      memory = best(instrumented, repeat=2)
+    print(f"{name:>24} | {bareTime * 1e3:>9.2f} | {off * 1e3:>8.2f} | {on * 1e3:>8.2f} | {memory * 1e3:>14.2f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,38 @@
+import os
+import random
+import tempfile
+import time
+from ParallelMatch import parallelRead
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+
+
+def main():
+  rng = random.Random(0)
+  size = 32 << 20
+  with tempfile.NamedTemporaryFile(delete=False) as f:
+    block = bytes(rng.choice(b"ab") for _ in range(1 << 20))
+    for _ in range(size >> 20):
+      f.write(block)
+  
+  try:
+    cores = os.cpu_count() or 1
+    print(f"file: {size >> 20} MB, cores available: {cores}")
+    print(f"{'pattern':>18} | {'sequential (s)':>14} | " + " | ".join(f"{f'{w} proc (s)':>11}" for w in [1, 2, 4, 8]))
+    for regex in ["(a|b)*abb", "(a|bb)*", "((a|b)(a|b)(a|b))*"]:
+      dfa = PowersetConstruction(ThompsonConstruction(regex).toNFA()).toDFA().compile()
+      with open(f.name, "rb") as data:
+        start = time.perf_counter()
+        dfa.read(data.read())
+        sequential = time.perf_counter() - start
+      timings = []
+      for workers in [1, 2, 4, 8]:
+        start = time.perf_counter()
+        parallelRead(dfa, f.name, workers=workers)
+        timings.append(time.perf_counter() - start)
+      print(f"{regex:>18} | {sequential:>14.2f} | " + " | ".join(f"{t:>11.2f}" for t in timings))
+  finally:
+    os.unlink(f.name)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,65 @@
+import time
+from benchmarks.bench_thompson import generatePattern
+from RegexParser import parse, toPostfix
+
+operations: dict[str, int] = {"(": 4, ")": 10, "*": 5, "+": 5, "?": 5, ".": 6, "|": 8}
+
+def legacyStandardize(string: str) -> str:
+  """
+  The standardizeRegex used before the AST parser.
+  """
+  standardized = ""
+  for i in range(len(string)):
+    currentChar = string[i]
+    if i > 0 and (string[i-1] not in operations or operations[string[i-1]] == 5 or string[i-1] == ")") and (currentChar not in operations or currentChar == "("):
+      standardized += "."
+    standardized += currentChar
+  return standardized
+
+def legacyPostfix(string: str) -> str:
+  """
+  The shunting-yard infixToPostfix used before the AST parser.
+  """
+  stack: list[str] = []
+  postfix = ""
+  for i in range(len(string)):
+    currentChar = string[i]
+    if currentChar in operations:
+      if currentChar == ")":
+        while stack[-1] != "(":
+          postfix += stack.pop()
+        stack.pop()
+      elif operations[currentChar] == 5:
+        postfix += currentChar
+      else:
+        stack.append(currentChar)
+    else:
+      postfix += currentChar
+      top = stack[-1] if stack else None
+      if top and top != "(":
+        if i >= len(string) - 1 or (string[i + 1] in operations and operations[string[i+1]] >= operations[top]):
+          postfix += stack.pop()
+  while stack:
+    postfix += stack.pop()
+  return postfix
+
+def best(f, repeat: int = 3) -> float:
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    f()
+    times.append(time.perf_counter() - start)
+  return min(times)
+
+def main():
+  print(f"{'chars':>8} | {'legacy (ms)':>11} | {'parse (ms)':>10} | {'+postfix (ms)':>13} | {'parse ns/char':>13}")
+  for n in [12500, 25000, 50000, 100000, 200000]:
+    pattern = generatePattern(n)
+    legacy = best(lambda: legacyPostfix(legacyStandardize(pattern)))
+    parsed = best(lambda: parse(pattern))
+    ast = parse(pattern)
+    postfix = best(lambda: toPostfix(ast))
+    print(f"{len(pattern):>8} | {legacy * 1e3:>11.1f} | {parsed * 1e3:>10.1f} | {postfix * 1e3:>13.1f} | {parsed * 1e9 / len(pattern):>13.0f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,45 @@
+import time
+import tracemalloc
+from typing import Callable
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+from benchmarks.baseline import baselineModule
+
+
+def measure(construct: Callable[[], object]) -> tuple[int, float, float]:
+  """
+  Returns the DFA state count, the seconds and the peak MB of a construction;
+  memory is traced in a second run so tracing doesn't skew the timing.
+  """
+  start = time.perf_counter()
+  states = len(construct().states)
+  seconds = time.perf_counter() - start
+  tracemalloc.start()
+  construct()
+  peak = tracemalloc.get_traced_memory()[1] / 2**20
+  tracemalloc.stop()
+  return states, seconds, peak
+
+def main():
+  """
+  Both constructions run on the same Thompson NFA, the baseline one through
+  the baseline TCNFA and its recursive ε-closures. The baseline grows
+  quadratically and is skipped past 150k NFA states.
+  """
+  legacyPC = baselineModule("PowersetConstruction")
+  legacyTC = baselineModule("ThompsonConstruction")
+  print(f"{'pattern':>20} | {'NFA states':>10} | {'DFA states':>10} | {'sets (s)':>9} | {'interned (s)':>12} | {'sets (MB)':>9} | {'interned (MB)':>13}")
+  for n in [1000, 10000, 100000, 150000, 1000000]:
+    regex = "(a|b)*c" * (n // 8) + "(a|b|c)*(ab|c)"
+    nfa = ThompsonConstruction(regex).toNFA()
+    states, interned, internedPeak = measure(lambda: PowersetConstruction(nfa).toDFA())
+    legacy, legacyPeak = "-", "-"
+    if n <= 150000:
+      legacyNFA = legacyTC.TCNFA(nfa.states, nfa.alphabet, nfa.transitions, nfa.startState, nfa.acceptState)
+      expected, seconds, peak = measure(lambda: legacyPC.PowersetConstruction(legacyNFA).toDFA())
+      assert states == expected
+      legacy, legacyPeak = f"{seconds:.3f}", f"{peak:.1f}"
+    print(f"{f'(a|b)*c x{n // 8}':>20} | {len(nfa.states):>10} | {states:>10} | {legacy:>9} | {interned:>12.3f} | {legacyPeak:>9} | {internedPeak:>13.1f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,24 @@
+import random
+import time
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+
+
+def main():
+  rng = random.Random(0)
+  dfa = PowersetConstruction(ThompsonConstruction("(0|(1(01*(00)*0)*1)*)*").toNFA()).toDFA()
+  print(f"{'strings':>9} | {'DFA.read loop (s)':>17} | {'read_many (s)':>13}")
+  for count in [10_000, 100_000, 1_000_000]:
+    strings = [bin(rng.getrandbits(rng.randint(1, 32)))[2:] for _ in range(count)]
+    
+    start = time.perf_counter()
+    [dfa.read(s) for s in strings]
+    loop = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    dfa.read_many(strings)
+    batch = time.perf_counter() - start
+    print(f"{count:>9} | {loop:>17.3f} | {batch:>13.3f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,35 @@
+import time
+from Hopcroft import Hopcroft
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction
+
+
+corpus = {
+  "nested stars": "((a*)*|(b?)+)*c",
+  "keywords": "|".join(["if", "in", "int", "import", "for", "float", "from", "while", "with", "return", "raise"]),
+  "duplicates": "(ab|cd|ab|ef|cd)(x|y|x)*",
+  "optional ε": "(ε|a)(ε|b)(ε|c)(ε|a*)*d",
+  "url prefixes": "|".join(["http://a", "http://b", "https://a", "https://b", "ftp://a", "ftp://b"]),
+  "repeated groups": "((ab)*c(ab)*)|((ab)*d)",
+}
+
+def build(regex: str, simplify: bool, repeat: int = 5) -> tuple[int, int, int, float]:
+  best = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    nfa = ThompsonConstruction(regex, simplify=simplify).toNFA()
+    dfa = PowersetConstruction(nfa).toDFA()
+    minimal = Hopcroft(dfa).minimize()
+    best = min(best, time.perf_counter() - start)
+  return len(nfa.states), len(dfa.states), len(minimal.states), best
+
+def main():
+  print(f"{'pattern':>15} | {'NFA':>5} | {'NFA (s)':>7} | {'DFA':>5} | {'DFA (s)':>7} | {'min DFA':>7} | {'ms':>6} | {'ms (s)':>6}")
+  for name, regex in corpus.items():
+    nfa, dfa, minimal, plain = build(regex, False)
+    nfaS, dfaS, minimalS, simplified = build(regex, True)
+    assert minimal == minimalS
+    print(f"{name:>15} | {nfa:>5} | {nfaS:>7} | {dfa:>5} | {dfaS:>7} | {minimal:>7} | {plain * 1e3:>6.2f} | {simplified * 1e3:>6.2f}")
+
+if __name__ == "__main__":
+  main()
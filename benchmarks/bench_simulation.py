@@ -0,0 +1,41 @@
+import random
+import time
+from BitParallelNFA import BitParallelNFA
+from PowersetConstruction import PowersetConstruction
+from ThompsonConstruction import ThompsonConstruction, TCNFA
+
+
+def setRead(nfa: 'TCNFA', inputString: str) -> bool:
+  """
+  The set-based simulation TCNFA.read used before the bit-parallel engine.
+  """
+  closures = {s: nfa.nonDeterministicRead(s) for s in nfa.states}
+  currentStates = closures[nfa.startState]
+  for symbol in inputString:
+    nextStates = set()
+    for state in currentStates:
+      for dest in nfa.transitions.get((state, symbol), ()):
+        nextStates.update(closures[dest])
+    currentStates = nextStates
+  return nfa.acceptState in currentStates
+
+def throughput(read, text: str) -> float:
+  start = time.perf_counter()
+  read(text)
+  return len(text) / (time.perf_counter() - start) / 1e6
+
+def main():
+  rng = random.Random(0)
+  text = "".join(rng.choice("ab") for _ in range(100_000))
+  print(f"{'pattern':>22} | {'states':>6} | {'set (Mch/s)':>11} | {'bitmask (Mch/s)':>15} | {'DFA (Mch/s)':>11}")
+  for k in [4, 8, 12]:
+    regex = "(a|b)*a" + "(a|b)" * k
+    nfa = ThompsonConstruction(regex).toNFA()
+    simulator = BitParallelNFA(nfa)
+    dfa = PowersetConstruction(nfa).toDFA()
+    label = f"(a|b)*a(a|b){{{k}}}"
+    print(f"{label:>22} | {len(nfa.states):>6} | {throughput(lambda t: setRead(nfa, t), text):>11.3f} | "
+          f"{throughput(simulator.read, text):>15.3f} | {throughput(dfa.read, text):>11.3f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,30 @@
+import time
+from ThompsonConstruction import ThompsonConstruction
+
+
+def generatePattern(n: int) -> str:
+  """
+  Builds a generated pattern of roughly `n` regex tokens.
+  """
+  pieces = ["(a|b)*c", "(ab|c)*", "a(b|c)d*"]
+  return "".join(pieces[i % len(pieces)] for i in range(n // 7 + 1))
+
+def timeBuild(tc: ThompsonConstruction, arena: bool, repeat: int = 3) -> float:
+  best = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    tc.toNFA(arena=arena)
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def main():
+  print(f"{'tokens':>8} | {'legacy (ms)':>12} | {'arena (ms)':>11} | {'arena us/token':>14}")
+  for n in [500, 1000, 2000, 4000, 8000]:
+    tc = ThompsonConstruction(generatePattern(n))
+    tokens = len(tc.postfix)
+    legacy = timeBuild(tc, arena=False)
+    arena = timeBuild(tc, arena=True)
+    print(f"{tokens:>8} | {legacy * 1e3:>12.2f} | {arena * 1e3:>11.2f} | {arena * 1e6 / tokens:>14.3f}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,25 @@
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from BitParallelNFA import BitParallelNFA
+
+
+class TestBitParallelNFA(unittest.TestCase):
+  def test_agreesWithDFA(self):
+    for regex in ["ε|a*.b", "(a|b)*a(a|b)(a|b)", "(0|(1(01*(00)*0)*1)*)*"]:
+      nfa = TC.ThompsonConstruction(regex).toNFA()
+      dfa = PC.PowersetConstruction(nfa).toDFA()
+      for chunkBits in [1, 3, 8, 16]:
+        simulator = BitParallelNFA(nfa, chunkBits=chunkBits)
+        for s in ["", "a", "b", "ab", "aab", "abab", "baaa", "0", "11", "1001", "111"]:
+          if all(c in dfa.alphabet for c in s):
+            self.assertEqual(simulator.read(s), dfa.read(s), f"Simulator disagrees with DFA of '{regex}' on '{s}'")
+            
+  def test_unknownSymbol(self):
+    simulator = BitParallelNFA(TC.ThompsonConstruction("a*").toNFA())
+    self.assertFalse(simulator.read("ac"))
+    with self.assertRaises(ValueError):
+      simulator.read("aε")
+    
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,63 @@
+import itertools
+import re
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from CharClass import CharSet, Classifier, atomize, parseBracket
+from Equivalence import equivalent
+from Hopcroft import Hopcroft
+
+
+def toDFA(regex: str) -> 'PC.DFA':
+  return PC.PowersetConstruction(TC.ThompsonConstruction(regex).toNFA()).toDFA()
+
+class TestCharClass(unittest.TestCase):
+  def test_charSet(self):
+    letters = parseBracket("[a-zA-Z_]")
+    self.assertEqual(letters.ranges, ((ord("A"), ord("Z")), (ord("_"), ord("_")), (ord("a"), ord("z"))))
+    self.assertIn("q", letters)
+    self.assertNotIn("0", letters)
+    self.assertEqual(parseBracket("[^a]").negate(), CharSet.fromChars("a"))
+    self.assertEqual(parseBracket("[x]"), "x", "A single character is not a set")
+    self.assertEqual(parseBracket("[]a-]"), CharSet.fromChars("]a-"))
+    self.assertEqual(parseBracket("[\\^\\]]"), CharSet.fromChars("^]"))
+    self.assertEqual(str(parseBracket("[0-9a-fx]")), "[0-9a-fx]")
+    with self.assertRaises(ValueError):
+      parseBracket("[z-a]")
+      
+  def test_atomize(self):
+    atoms, coverage = atomize(["a", parseBracket("[a-z]"), parseBracket("[x-z0-9]")])
+    self.assertEqual(atoms, [parseBracket("[0-9]"), "a", parseBracket("[b-w]"), parseBracket("[x-z]")])
+    self.assertEqual(coverage[parseBracket("[a-z]")], ["a", parseBracket("[b-w]"), parseBracket("[x-z]")])
+    classifier = Classifier(atoms)
+    self.assertEqual(classifier.classify("y"), parseBracket("[x-z]"))
+    self.assertIsNone(classifier.classify("!"))
+    
+  def test_matchesPythonRe(self):
+    patterns = ["[a-c]{2,3}", "(ab|[^a])+c?", "[0-9]{2}(x|[a-c]){0,2}", "a{3,}", "(a|b)?[bc]*", "\\+[+]?", "[a\\-c]{1}"]
+    for pattern in patterns:
+      nfa = TC.ThompsonConstruction(pattern).toNFA()
+      dfa = Hopcroft(PC.PowersetConstruction(nfa).toDFA()).minimize().compile()
+      for n in range(6):
+        for s in map("".join, itertools.product("abcx1+-", repeat=n)):
+          expected = re.fullmatch(pattern, s) is not None
+          self.assertEqual(nfa.read(s), expected, f"NFA of '{pattern}' is wrong on '{s}'")
+          self.assertEqual(dfa.read(s), expected, f"DFA of '{pattern}' is wrong on '{s}'")
+          
+  def test_noAlphabetBlowUp(self):
+    dfa = toDFA("[a-z0-9]{3,8}")
+    self.assertEqual(len(dfa.alphabet), 1, "One class should stay one symbol")
+    self.assertTrue(dfa.read("ab12"))
+    self.assertTrue(dfa.compile().read("zz9"))
+    self.assertFalse(dfa.compile().read("ab"))
+    self.assertTrue(toDFA("[^a]").compile().read("é"))
+    self.assertEqual(equivalent(toDFA("[a-c]+"), toDFA("(a|b|c)(a|b|c)*")), (True, None))
+    self.assertEqual(equivalent(toDFA("[a-z]*"), toDFA("[a-y]*")), (False, "z"))
+    
+  def test_arenaMatchesLegacy(self):
+    for regex in ["a+b?", "[a-c]{2,3}", "(ab){0,}", "x{0}", "a{2,}|[^b]"]:
+      tc = TC.ThompsonConstruction(regex)
+      self.assertEqual(tc.toNFA(arena=True), tc.toNFA(arena=False), f"Arena NFA differs from legacy NFA for '{regex}'")
+      
+if __name__ == '__main__':
+  unittest.main()
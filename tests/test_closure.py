@@ -0,0 +1,45 @@
+import random
+import unittest
+import ThompsonConstruction as TC
+from EpsilonClosure import epsilonClosures
+from utils.bitset import toBitmask
+
+
+class TestEpsilonClosure(unittest.TestCase):
+  def test_matchesSearch(self):
+    rng = random.Random(7)
+    for _ in range(50):
+      n = rng.randint(1, 30)
+      edges = {s: [rng.randrange(n) for _ in range(rng.randint(0, 3))] for s in range(n)}
+      closures = epsilonClosures(n, lambda s: edges[s])
+      for s in range(n):
+        reachable = {s}
+        pending = [s]
+        while pending:
+          for dest in edges[pending.pop()]:
+            if dest not in reachable:
+              reachable.add(dest)
+              pending.append(dest)
+        self.assertEqual(closures[s], toBitmask(reachable), f"Wrong closure for state {s}")
+        
+  def test_cycle(self):
+    nfa = TC.TCNFA(
+      states={0, 1, 2, 3},
+      alphabet=set(),
+      transition={(0, 'ε'): {1}, (1, 'ε'): {2}, (2, 'ε'): {0, 3}},
+      startState=1,
+      acceptState=3
+    )
+    for s in range(3):
+      self.assertEqual(nfa.nonDeterministicRead(s), {0, 1, 2, 3}, f"Incomplete closure inside ε-cycle for state {s}")
+    self.assertTrue(nfa.read(""))
+    
+  def test_deepKleeneNesting(self):
+    depth = 3000
+    nfa = TC.ThompsonConstruction("(" * depth + "a" + ")*" * depth).toNFA()
+    self.assertTrue(nfa.read(""))
+    self.assertTrue(nfa.read("aaa"))
+    self.assertFalse(nfa.read("ab"))
+    
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from CompactNFA import CompactNFA
+
+
+class TestCompactNFA(unittest.TestCase):
+  def test_roundTrip(self):
+    for regex in ["ε", "a", "ε|a*.b", "(0|(1(01*(00)*0)*1)*)*"]:
+      nfa = TC.ThompsonConstruction(regex).toNFA()
+      compact = CompactNFA.fromTCNFA(nfa)
+      self.assertEqual(compact.toTCNFA(), nfa, f"Round trip through CompactNFA changed the NFA for '{regex}'")
+      self.assertIn(nfa, {nfa}, "TCNFA should stay hashable")
+      
+  def test_read(self):
+    nfa = TC.ThompsonConstruction("ε|a*.b").toNFA()
+    compact = CompactNFA.fromTCNFA(nfa)
+    for s in ["", "b", "ab", "aab", "a", "aa", "bb", "c"]:
+      self.assertEqual(compact.read(s), nfa.read(s), f"CompactNFA disagrees with TCNFA on '{s}'")
+    self.assertEqual(compact.nonDeterministicRead(nfa.startState), nfa.nonDeterministicRead(nfa.startState))
+    with self.assertRaises(ValueError):
+      compact.read("ε")
+      
+  def test_immutable(self):
+    compact = CompactNFA.fromTCNFA(TC.ThompsonConstruction("a").toNFA())
+    with self.assertRaises(AttributeError):
+      compact.startState = 1
+      
+  def test_powersetConstruction(self):
+    compact = CompactNFA.fromTCNFA(TC.ThompsonConstruction("(0|(1(01*(00)*0)*1)*)*").toNFA())
+    dfa = PC.PowersetConstruction(compact).toDFA()
+    for s in ["", "0", "11", "110", "1001", "1111"]:
+      self.assertTrue(dfa.read(s), f"DFA built from CompactNFA should accept '{s}'")
+    for s in ["1", "10", "111"]:
+      self.assertFalse(dfa.read(s), f"DFA built from CompactNFA should reject '{s}'")
+    
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,45 @@
+import itertools
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from CompiledDFA import CompiledDFA
+
+
+class TestCompiledDFA(unittest.TestCase):
+  def test_agreesWithDFA(self):
+    for regex in ["ε", "ε|a*.b", "(a|b)*abb", "(0|(1(01*(00)*0)*1)*)*"]:
+      dfa = PC.PowersetConstruction(TC.ThompsonConstruction(regex).toNFA()).toDFA()
+      compiled = CompiledDFA(dfa)
+      for n in range(6):
+        for s in map("".join, itertools.product(sorted(dfa.alphabet), repeat=n)):
+          self.assertEqual(compiled.read(s), dfa.read(s), f"CompiledDFA of '{regex}' disagrees on '{s}'")
+          self.assertEqual(compiled.read(s.encode()), dfa.read(s), f"CompiledDFA of '{regex}' disagrees on b'{s}'")
+          
+  def test_unknownSymbols(self):
+    compiled = CompiledDFA(PC.PowersetConstruction(TC.ThompsonConstruction("a*").toNFA()).toDFA())
+    self.assertTrue(compiled.read("aaa"))
+    self.assertFalse(compiled.read("aca"))
+    self.assertFalse(compiled.read("aε"))
+    
+  def test_deadStates(self):
+    dfa = PC.PowersetConstruction(TC.ThompsonConstruction("ab").toNFA()).toDFA()
+    compiled = CompiledDFA(dfa)
+    self.assertTrue(compiled.dead[compiled.sink])
+    self.assertFalse(compiled.dead[compiled.startState])
+    self.assertEqual(int(compiled.dead.sum()), 2, "The trap state and the sink should be dead")
+    
+  def test_readMany(self):
+    dfa = PC.PowersetConstruction(TC.ThompsonConstruction("(0|(1(01*(00)*0)*1)*)*").toNFA()).toDFA()
+    strings = [bin(n)[2:] for n in range(200)] + ["", "1x1", "11ε", "ε"]
+    expected = [dfa.compile().read(s) for s in strings]
+    self.assertEqual(dfa.read_many(strings).tolist(), expected)
+    self.assertEqual(dfa.read_many([s.encode() for s in strings]).tolist(), expected)
+    
+    offsets = [0]
+    for s in strings:
+      offsets.append(offsets[-1] + len(s.encode()))
+    self.assertEqual(dfa.read_many("".join(strings).encode(), offsets).tolist(), expected)
+    self.assertEqual(dfa.read_many([]).tolist(), [])
+    
+if __name__ == '__main__':
+  unittest.main()
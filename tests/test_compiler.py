@@ -0,0 +1,62 @@
+import threading
+import unittest
+import Compiler
+from Compiler import PatternCache
+
+
+class TestCompiler(unittest.TestCase):
+  def test_compile(self):
+    cache = PatternCache()
+    dfa = Compiler.compile("(0|(1(01*(00)*0)*1)*)*", cache)
+    self.assertEqual(len(dfa.states), 3)
+    self.assertTrue(dfa.read("110"))
+    self.assertIs(Compiler.compile("(0|(1(01*(00)*0)*1)*)*", cache), dfa, "Second compile should come from the cache")
+    self.assertEqual(cache.stats()["hits"], 1)
+    self.assertEqual(cache.stats()["misses"], 1)
+    
+  def test_backendKeys(self):
+    cache = PatternCache()
+    thompson = cache.get("(a|b)*abb")
+    glushkov = cache.get("(a|b)*abb", "glushkov")
+    self.assertIsNot(glushkov, thompson, "Each backend gets its own entry")
+    self.assertIs(cache.get("(a|b)*abb", "glushkov"), glushkov)
+    self.assertEqual(cache.stats()["misses"], 2)
+    self.assertEqual(cache.stats()["hits"], 1)
+    
+    cache.warm(["a|b"], "glushkov")
+    self.assertIn(("a|b", "glushkov"), cache.entries)
+    self.assertNotIn(("a|b", "thompson"), cache.entries)
+    
+  def test_lruEviction(self):
+    cache = PatternCache(maxEntries=2)
+    cache.warm(["a", "b"])
+    cache.get("a")                # "b" is now the least recently used
+    cache.get("c")
+    self.assertEqual(list(cache.entries), [("a", "thompson"), ("c", "thompson")])
+    self.assertEqual(cache.stats()["evictions"], 1)
+    
+  def test_memoryBound(self):
+    cache = PatternCache(maxBytes=1)
+    cache.warm(["a", "b", "c"])
+    stats = cache.stats()
+    self.assertEqual(stats["entries"], 1, "The newest entry is always kept")
+    self.assertEqual(stats["evictions"], 2)
+    
+  def test_threads(self):
+    cache = PatternCache()
+    patterns = [f"(a|b)*{'ab' * i}" for i in range(1, 8)]
+    results: list[dict[str, int]] = []
+    def work():
+      results.append({p: id(cache.get(p)) for p in patterns})
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+    self.assertTrue(all(r == results[0] for r in results), "Every thread should share the same compiled DFAs")
+    stats = cache.stats()
+    self.assertEqual(stats["entries"], len(patterns))
+    self.assertEqual(stats["hits"] + stats["misses"], 8 * len(patterns))
+    
+if __name__ == '__main__':
+  unittest.main()
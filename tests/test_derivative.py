@@ -0,0 +1,39 @@
+import random
+import unittest
+import Compiler
+from DerivativeConstruction import DerivativeConstruction
+from Equivalence import equivalent
+from Hopcroft import Hopcroft
+from PowersetConstruction import StateLimitError
+
+
+class TestDerivative(unittest.TestCase):
+  def test_sameLanguageAsCompiler(self):
+    rng = random.Random(5)
+    atoms = ["a", "b", "[a-c]", "ε"]
+    for _ in range(80):
+      regex = rng.choice(atoms)
+      for _ in range(rng.randrange(1, 6)):
+        regex = rng.choice([
+          f"{regex}{rng.choice(atoms)}", f"({regex})|{rng.choice(atoms)}", f"({regex})*",
+          f"({regex})+", f"({regex})?", f"({regex}){{1,3}}", f"({regex}){{2,}}"
+        ])
+      dfa = DerivativeConstruction(regex).toDFA()
+      self.assertEqual(equivalent(dfa, Compiler.compileUncached(regex)), (True, None), f"Wrong DFA for '{regex}'")
+  
+  def test_nearMinimal(self):
+    for regex in ["(a|b)*abb", "if|in|int|for", "[a-z_][a-z0-9_]*", "a{2,4}"]:
+      dfa = DerivativeConstruction(regex).toDFA()
+      self.assertEqual(len(dfa.states), len(Hopcroft(dfa).minimize().states), f"'{regex}' should come out minimal")
+  
+  def test_lazy(self):
+    derivatives = DerivativeConstruction("(a|b)*a(a|b){12}")
+    self.assertTrue(derivatives.read("a" * 13))
+    self.assertFalse(derivatives.read("b" * 13))
+    self.assertFalse(derivatives.read("abc"))
+    self.assertLess(len(derivatives.terms), 40, "Only the states the input reaches are derived")
+    with self.assertRaises(StateLimitError):
+      DerivativeConstruction("(a|b)*a(a|b){12}").toDFA(maxStates=1000)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,49 @@
+import contextlib
+import io
+import itertools
+import unittest
+from DFA import DFA
+
+
+def strings(alphabet: str, length: int):
+  for n in range(length + 1):
+    yield from map("".join, itertools.product(alphabet, repeat=n))
+
+class TestDFA(unittest.TestCase):
+  def test_manyClasses(self):
+    # a chain S0 -a-> S1 -a-> ... -a-> S13 (accepting), every state at its own distance from S13
+    states = [f"S{i}" for i in range(14)]
+    dfa = DFA(states, ["a"], {s: [states[min(i + 1, 13)]] for i, s in enumerate(states)}, "S0", {"S13"})
+    equivalence = dfa.generateEquivalence()
+    self.assertEqual(len(set(equivalence)), 14, "States of the chain were merged")
+    
+  def test_removeEquivalentStates(self):
+    # binary multiples of 3, with D and E duplicating A and B
+    transitions = {"A": ["D", "B"], "B": ["C", "D"], "C": ["E", "C"], "D": ["A", "E"], "E": ["C", "D"]}
+    dfa = DFA(["A", "B", "C", "D", "E"], ["0", "1"], transitions, "A", {"A", "D"})
+    before = {s: dfa.read(s) for s in strings("01", 7)}
+    dfa.removeEquivalentStates()
+    self.assertEqual(len(dfa.transitions), 3)
+    for s, result in before.items():
+      self.assertEqual(dfa.read(s), result, f"Minimized DFA is wrong on '{s}'")
+      
+  def test_printout(self):
+    transitions = {"A": ["A", "B"], "B": ["B", "A"]}
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet):
+      DFA(["A", "B"], ["0", "1"], transitions, "A", {"A"}).removeEquivalentStates()
+    self.assertEqual(quiet.getvalue(), "")
+    
+    rounds = io.StringIO()
+    with contextlib.redirect_stdout(rounds):
+      DFA(["A", "B"], ["0", "1"], transitions, "A", {"A"}).generateEquivalence(printout=True)
+    self.assertIn("'equiv': [", rounds.getvalue())
+    self.assertIn("≡₀", rounds.getvalue())
+    
+    verbose = io.StringIO()
+    with contextlib.redirect_stdout(verbose):
+      DFA(["A", "B"], ["0", "1"], transitions, "A", {"A"}, verbose=True).removeEquivalentStates()
+    self.assertIn("≡₁", verbose.getvalue())
+    
+if __name__ == '__main__':
+  unittest.main()
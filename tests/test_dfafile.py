@@ -0,0 +1,83 @@
+import gc
+import itertools
+import os
+import tempfile
+import unittest
+import warnings
+import DFAFile
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+
+
+class TestDFAFile(unittest.TestCase):
+  def setUp(self):
+    handle, self.path = tempfile.mkstemp(suffix=".dfa")
+    os.close(handle)
+    
+  def tearDown(self):
+    os.unlink(self.path)
+    
+  def test_roundTrip(self):
+    for regex in ["ε", "ε|a*.b", "(0|(1(01*(00)*0)*1)*)*"]:
+      dfa = PC.PowersetConstruction(TC.ThompsonConstruction(regex).toNFA()).toDFA()
+      DFAFile.save(dfa, self.path)
+      with DFAFile.load(self.path) as mapped:
+        for n in range(6):
+          for s in map("".join, itertools.product(sorted(dfa.alphabet) + ["x"], repeat=n)):
+            self.assertEqual(mapped.read(s), dfa.compile().read(s), f"Mapped DFA of '{regex}' disagrees on '{s}'")
+            self.assertEqual(mapped.read(s.encode()), dfa.compile().read(s))
+        self.assertFalse(mapped.read("aε"))
+        
+  def test_charClasses(self):
+    dfa = PC.PowersetConstruction(TC.ThompsonConstruction("[a-c]x{1,2}|[^a]").toNFA()).toDFA()
+    DFAFile.save(dfa, self.path)
+    with DFAFile.load(self.path) as mapped:
+      for s in ["bx", "cxx", "axxx", "é", "a", "ā", "", "zx"]:
+        self.assertEqual(mapped.read(s), dfa.compile().read(s), f"Mapped DFA disagrees on '{s}'")
+        
+  def test_badFile(self):
+    with open(self.path, "wb") as f:
+      f.write(b"NOPE" + b"\0" * 64)
+    with self.assertRaises(ValueError):
+      DFAFile.load(self.path)
+      
+    dfa = PC.PowersetConstruction(TC.ThompsonConstruction("a").toNFA()).toDFA()
+    DFAFile.save(dfa, self.path)
+    with open(self.path, "r+b") as f:
+      f.seek(4)
+      f.write(b"\x63\x00")
+    with self.assertRaises(ValueError) as context:
+      DFAFile.load(self.path)
+    self.assertEqual(context.exception.args[0], "Unsupported compiled DFA version 99")
+    
+  def test_truncatedFile(self):
+    dfa = PC.PowersetConstruction(TC.ThompsonConstruction("(a|b)*abb").toNFA()).toDFA()
+    DFAFile.save(dfa, self.path)
+    with open(self.path, "rb") as f:
+      data = f.read()
+    for size in [DFAFile.HEADER.size, DFAFile.HEADER.size + 6, len(data) - 5, len(data) - 1]:
+      with open(self.path, "wb") as f:
+        f.write(data[:size])
+      with self.assertRaises(ValueError, msg=f"File cut to {size} bytes was accepted"):
+        DFAFile.load(self.path)
+    
+    # an empty file cannot be mapped at all, and must not leak its handle
+    with open(self.path, "wb"):
+      pass
+    with warnings.catch_warnings(record=True) as caught:
+      warnings.simplefilter("always", ResourceWarning)
+      with self.assertRaises(ValueError) as context:
+        DFAFile.load(self.path)
+      self.assertEqual(context.exception.args[0], "File is too short to be a compiled DFA")
+      del context
+      gc.collect()
+    self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+    
+    # start row past the end of the table
+    with open(self.path, "wb") as f:
+      f.write(data[:16] + (1 << 20).to_bytes(4, "little") + data[20:])
+    with self.assertRaises(ValueError):
+      DFAFile.load(self.path)
+    
+if __name__ == '__main__':
+  unittest.main()
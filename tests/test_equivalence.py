@@ -0,0 +1,49 @@
+import itertools
+import random
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from Equivalence import equivalent, equivalentNFA
+from Hopcroft import Hopcroft
+
+
+def toNFA(regex: str) -> 'TC.TCNFA':
+  return TC.ThompsonConstruction(regex).toNFA()
+
+def toDFA(regex: str) -> 'PC.DFA':
+  return PC.PowersetConstruction(toNFA(regex)).toDFA()
+
+class TestEquivalence(unittest.TestCase):
+  def test_equivalent(self):
+    pairs = [("(a|b)*", "(a*b*)*"), ("(0|(1(01*(00)*0)*1)*)*", "(0|1(01*(00)*0)*1)*"), ("a(ba)*", "(ab)*a")]
+    for r1, r2 in pairs:
+      self.assertEqual(equivalent(toDFA(r1), toDFA(r2)), (True, None), f"'{r1}' and '{r2}' are equivalent")
+      self.assertEqual(equivalentNFA(toNFA(r1), toNFA(r2)), (True, None), f"'{r1}' and '{r2}' are equivalent")
+    dfa = toDFA("(0|(1(01*(00)*0)*1)*)*")
+    self.assertEqual(equivalent(dfa, Hopcroft(dfa).minimize()), (True, None))
+      
+  def test_counterexample(self):
+    pairs = [("(a|b)*", "a*b*", "ba"), ("a*", "aa*", ""), ("(ab)*", "(ab)*|abab(ab)*c", "ababc"), ("a", "b", "a")]
+    for r1, r2, shortest in pairs:
+      self.assertEqual(equivalent(toDFA(r1), toDFA(r2)), (False, shortest))
+      self.assertEqual(equivalentNFA(toNFA(r1), toNFA(r2)), (False, shortest))
+      
+  def test_randomPatterns(self):
+    rng = random.Random(7)
+    atoms = ["a", "b", "ε", "(a|b)", "a*", "(ab)*"]
+    words = [w for n in range(7) for w in map("".join, itertools.product("ab", repeat=n))]
+    for _ in range(40):
+      r1, r2 = ("".join(rng.choice(atoms) for _ in range(rng.randint(1, 4))) for _ in range(2))
+      d1, d2 = toDFA(r1), toDFA(r2)
+      same, witness = equivalent(d1, d2)
+      self.assertEqual(equivalentNFA(toNFA(r1), toNFA(r2)), (same, witness))
+      differ = [w for w in words if d1.compile().read(w) != d2.compile().read(w)]
+      if same:
+        self.assertEqual(differ, [], f"'{r1}' and '{r2}' reported equivalent")
+      else:
+        self.assertNotEqual(d1.compile().read(witness), d2.compile().read(witness))
+        if differ:
+          self.assertEqual(len(witness), len(differ[0]), "Counterexample should be a shortest one")
+          
+if __name__ == '__main__':
+  unittest.main()
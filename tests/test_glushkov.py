@@ -0,0 +1,50 @@
+import random
+import unittest
+import Compiler
+from Equivalence import equivalent, equivalentNFA
+from GlushkovConstruction import GlushkovConstruction
+from Hopcroft import Hopcroft
+from PowersetConstruction import PowersetConstruction
+from StreamMatcher import StreamMatcher
+from ThompsonConstruction import ThompsonConstruction
+
+
+class TestGlushkov(unittest.TestCase):
+  def test_positions(self):
+    nfa = GlushkovConstruction("(a|b)*abb").toNFA()
+    self.assertEqual(len(nfa.states), 6, "One state per symbol occurrence plus the start")
+    self.assertNotIn('ε', nfa.alphabet)
+    self.assertEqual(nfa.acceptStates, {5})
+    self.assertEqual(nfa.successors(0, "a"), {1, 3})
+    self.assertEqual(GlushkovConstruction("a*|b").toNFA().acceptStates, {0, 1, 2})
+  
+  def test_sameLanguageAsThompson(self):
+    rng = random.Random(11)
+    atoms = ["a", "b", "[a-c]", "ε"]
+    for _ in range(100):
+      regex = rng.choice(atoms)
+      for _ in range(rng.randrange(1, 6)):
+        regex = rng.choice([
+          f"{regex}{rng.choice(atoms)}", f"({regex})|{rng.choice(atoms)}", f"({regex})*",
+          f"({regex})+", f"({regex})?", f"({regex}){{1,3}}", f"({regex}){{2,}}"
+        ])
+      glushkov = GlushkovConstruction(regex).toNFA()
+      thompson = ThompsonConstruction(regex).toNFA()
+      self.assertEqual(equivalentNFA(glushkov, thompson), (True, None), f"Backends disagree on '{regex}'")
+  
+  def test_backends(self):
+    regex = "(0|1(01*0)*1)*"
+    glushkov = Hopcroft(PowersetConstruction(GlushkovConstruction(regex).toNFA()).toDFA()).minimize()
+    self.assertEqual(len(glushkov.states), 3)
+    self.assertEqual(equivalent(glushkov, Compiler.compileUncached(regex)), (True, None))
+    self.assertEqual(equivalent(Compiler.compileUncached(regex, "glushkov"), glushkov), (True, None))
+    with self.assertRaises(ValueError):
+      Compiler.compileUncached(regex, "brzozowski")
+    
+    matcher = StreamMatcher(GlushkovConstruction(regex).toNFA())
+    matcher.feed("11")
+    matcher.feed("0")
+    self.assertTrue(matcher.accepting(), "110 is a multiple of three")
+
+if __name__ == '__main__':
+  unittest.main()
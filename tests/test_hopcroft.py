@@ -0,0 +1,61 @@
+import itertools
+import random
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from Hopcroft import Hopcroft
+
+
+class TestHopcroft(unittest.TestCase):
+  def test_multiplesOfThree(self):
+    dfa = PC.PowersetConstruction(TC.ThompsonConstruction("(0|(1(01*(00)*0)*1)*)*").toNFA()).toDFA()
+    minimized = Hopcroft(dfa).minimize()
+    self.assertEqual(len(minimized.states), 3, "Binary multiples of 3 need exactly 3 states")
+    for n in range(64):
+      self.assertEqual(minimized.read(bin(n)[2:]), n % 3 == 0, f"Minimized DFA is wrong for {n}")
+      
+  def test_needsSeveralRounds(self):
+    # a chain 0 -a-> 1 -a-> ... -a-> 5 (accepting) where only the distance to 5 tells states apart
+    transitions = {(s, 'a'): min(s + 1, 6) for s in range(7)}
+    dfa = PC.DFA(states=set(range(7)), alphabet={'a'}, transition=transitions, startState=0, acceptStates={5})
+    self.assertEqual(len(Hopcroft(dfa).minimize().states), 7, "No two states of the chain are equivalent")
+    
+  def test_randomDFAs(self):
+    rng = random.Random(4)
+    for _ in range(100):
+      n = rng.randint(1, 8)
+      alphabet = ['a', 'b']
+      transitions = {(s, a): rng.randrange(n) for s in range(n) for a in alphabet}
+      dfa = PC.DFA(states=set(range(n)), alphabet=set(alphabet), transition=transitions, startState=0, acceptStates={s for s in range(n) if rng.random() < 0.5})
+      minimized = Hopcroft(dfa).minimize()
+      
+      # states are equivalent iff they agree on every word up to length n
+      words = [w for k in range(n + 1) for w in itertools.product(alphabet, repeat=k)]
+      def signature(state: int) -> tuple[bool, ...]:
+        result = []
+        for w in words:
+          s = state
+          for a in w:
+            s = transitions[(s, a)]
+          result.append(s in dfa.acceptStates)
+        return tuple(result)
+      self.assertEqual(len(minimized.states), len({signature(s) for s in range(n)}))
+      for w in words:
+        self.assertEqual(minimized.read(w), dfa.read(w))
+  
+  def test_batchedSplits(self):
+    rng = random.Random(7)
+    for _ in range(200):
+      n = rng.randint(1, 300)
+      alphabet = ['a', 'b', 'c'][:rng.randint(1, 3)]
+      reach = rng.randint(1, n)
+      transitions = {(s, a): rng.randrange(reach) for s in range(n) for a in alphabet}
+      dfa = PC.DFA(states=set(range(n)), alphabet=set(alphabet), transition=transitions, startState=0, acceptStates={s for s in range(n) if rng.random() < 0.3})
+      sequential, batched = Hopcroft(dfa), Hopcroft(dfa)
+      sequential.batchStates = n + 1
+      batched.batchStates = 1
+      self.assertEqual(len(batched.minimize().states), len(sequential.minimize().states))
+      self.assertEqual(batched.stateMap, sequential.stateMap, "Batched splitting found a different partition")
+    
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import Compiler
+import Instrumentation
+from Instrumentation import StageStats, profile
+from ThompsonConstruction import ThompsonConstruction
+
+
+class TestInstrumentation(unittest.TestCase):
+  def test_stages(self):
+    with profile() as stats:
+      dfa = Compiler.compileUncached("(a|b)*abb")
+      dfa.read("aabb")
+      dfa.read("ab")
+    self.assertIsNone(Instrumentation.active, "Recording stops with the block")
+    
+    for name in ["compile", "thompson", "powerset", "hopcroft", "read.dfa"]:
+      self.assertIn(name, stats)
+    self.assertGreaterEqual(stats["compile"].seconds, stats["thompson"].seconds + stats["powerset"].seconds)
+    self.assertEqual(stats["thompson"].counters["nfaStates"], len(ThompsonConstruction("(a|b)*abb", simplify=True).toNFA().states))
+    self.assertEqual(stats["hopcroft"].counters["statesAfter"], len(dfa.states))
+    powerset = stats["powerset"].counters
+    self.assertEqual(powerset["internMisses"], powerset["dfaStates"] - 1, "Every state but the start state is interned once")
+    self.assertGreater(powerset["internHits"], 0)
+    self.assertEqual(stats["read.dfa"].calls, 2)
+    self.assertEqual(stats["read.dfa"].counters, {"chars": 6, "accepted": 1})
+    self.assertIsNone(stats["powerset"].peakBytes, "No memory figures unless traced")
+  
+  def test_hooksAndMemory(self):
+    runs: list[StageStats] = []
+    with profile(traceMemory=True, hooks=[runs.append]) as stats:
+      ThompsonConstruction("a{50}").toNFA().read("a" * 50)
+    self.assertEqual([run.name for run in runs], ["thompson", "read.nfa"])
+    self.assertEqual(runs[1].counters, {"chars": 50, "accepted": 1})
+    self.assertGreater(stats["thompson"].peakBytes, 0)
+  
+  def test_nestedPeaks(self):
+    with profile(traceMemory=True) as stats:
+      with Instrumentation.active.stage("outer"):
+        block = bytearray(1 << 20)
+        del block
+        with Instrumentation.active.stage("inner"):
+          small = bytearray(1 << 10)
+          del small
+    self.assertGreaterEqual(stats["outer"].peakBytes, 1 << 20, "Peak before an inner stage was lost")
+    self.assertLess(stats["inner"].peakBytes, 1 << 19)
+  
+  def test_disabled(self):
+    with profile() as stats:
+      pass
+    ThompsonConstruction("ab").toNFA()
+    self.assertEqual(stats.stages, {}, "Nothing is recorded outside a profile block")
+
+if __name__ == '__main__':
+  unittest.main()
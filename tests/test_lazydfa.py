@@ -0,0 +1,54 @@
+import random
+import unittest
+import ThompsonConstruction as TC
+from GlushkovConstruction import GlushkovConstruction
+from LazyDFA import LazyDFA
+
+
+class TestLazyDFA(unittest.TestCase):
+  def test_read(self):
+    nfa = TC.ThompsonConstruction("ε|a*.b").toNFA()
+    lazy = LazyDFA(nfa)
+    for s in ["", "b", "ab", "aab", "a", "aa", "bb", "c"]:
+      self.assertEqual(lazy.read(s), nfa.read(s), f"LazyDFA disagrees with NFA on '{s}'")
+    with self.assertRaises(ValueError):
+      lazy.read("ε")
+  
+  def test_deadTransitions(self):
+    lazy = LazyDFA(TC.ThompsonConstruction("a*b").toNFA())
+    self.assertFalse(lazy.read("ba"))
+    self.assertFalse(lazy.read("c"))
+    misses = lazy.stats()["misses"]
+    for s in ["ba", "bab", "c", "ca"]:
+      self.assertFalse(lazy.read(s))
+    self.assertEqual(lazy.stats()["misses"], misses, "Dying transitions must be cached")
+    self.assertTrue(lazy.read("ab"))
+  
+  def test_boundedCache(self):
+    nfa = TC.ThompsonConstruction("(a|b)*a" + "(a|b)" * 12).toNFA()
+    lazy = LazyDFA(nfa, maxStates=64)
+    rng = random.Random(1)
+    for _ in range(50):
+      s = "".join(rng.choice("ab") for _ in range(rng.randint(0, 60)))
+      self.assertEqual(lazy.read(s), nfa.read(s), f"LazyDFA disagrees with NFA on '{s}'")
+      self.assertLessEqual(lazy.stats()["states"], 64)
+    stats = lazy.stats()
+    self.assertGreater(stats["flushes"], 0)
+    self.assertGreater(stats["hits"], 0)
+    self.assertGreater(stats["misses"], 0)
+  
+  def test_boundedChunkTables(self):
+    # dense position automaton, so random input keeps reaching new chunk slices
+    nfa = GlushkovConstruction("(a|b)*a(a|b){30}").toNFA()
+    lazy = LazyDFA(nfa, maxStates=16)
+    chunks = -(-len(nfa.states) // lazy.simulator.chunkBits)
+    rng = random.Random(1)
+    for _ in range(100):
+      lazy.read("".join(rng.choice("ab") for _ in range(100)))
+      entries = sum(len(table) for table in lazy.simulator.tables.values())
+      # every cached transition fills at most one entry per chunk
+      self.assertLessEqual(entries, 16 * 2 * chunks, "Chunk tables must be flushed with the states")
+    self.assertGreater(lazy.stats()["flushes"], 0)
+
+if __name__ == '__main__':
+  unittest.main()
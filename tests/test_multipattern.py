@@ -0,0 +1,32 @@
+import itertools
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from MultiPattern import MultiPattern
+
+
+patterns = ["a*b", "(a|b)*abb", "ab", "b*", "(ab)*", "a(a|b)*"]
+
+class TestMultiPattern(unittest.TestCase):
+  def assertMatchesSeparately(self, multi: MultiPattern):
+    dfas = [PC.PowersetConstruction(TC.ThompsonConstruction(p).toNFA()).toDFA() for p in patterns]
+    for n in range(7):
+      for s in map("".join, itertools.product("abc", repeat=n)):
+        expected = {i for i, dfa in enumerate(dfas) if dfa.compile().read(s)}
+        self.assertEqual(multi.match(s), expected, f"Wrong pattern ids for '{s}'")
+        
+  def test_match(self):
+    multi = MultiPattern(patterns)
+    self.assertEqual(len(multi.groups), 1)
+    self.assertEqual(multi.match("abb"), {1, 5})
+    self.assertEqual(multi.match(""), {3, 4})
+    self.assertMatchesSeparately(multi)
+    
+  def test_groupSplitting(self):
+    multi = MultiPattern(patterns, maxStates=4)
+    self.assertGreater(len(multi.groups), 1, "A tight cap should split the patterns")
+    self.assertEqual(sorted(i for g in multi.groups for i in g.patterns), list(range(len(patterns))))
+    self.assertMatchesSeparately(multi)
+    
+if __name__ == '__main__':
+  unittest.main()
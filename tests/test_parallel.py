@@ -0,0 +1,33 @@
+import os
+import random
+import tempfile
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from ParallelMatch import chunkMapping, parallelRead
+
+
+class TestParallelMatch(unittest.TestCase):
+  def test_chunkMapping(self):
+    dfa = PC.PowersetConstruction(TC.ThompsonConstruction("(0|(1(01*(00)*0)*1)*)*").toNFA()).toDFA().compile()
+    data = "".join(random.Random(5).choice("01") for _ in range(3000)).encode()
+    mapping = chunkMapping(dfa, data)
+    for row in range(dfa.sink + 1):
+      self.assertEqual(mapping[row], dfa.advance(row, data), f"Wrong mapping for row {row}")
+      
+  def test_parallelRead(self):
+    rng = random.Random(2)
+    for regex in ["(a|b)*abb", "(0|(1(01*(00)*0)*1)*)*"]:
+      dfa = PC.PowersetConstruction(TC.ThompsonConstruction(regex).toNFA()).toDFA()
+      for _ in range(5):
+        text = "".join(rng.choice(sorted(dfa.alphabet)) for _ in range(rng.randint(0, 4000))).encode()
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+          f.write(text)
+        try:
+          for workers, chunkSize in [(1, None), (2, 333), (2, None)]:
+            self.assertEqual(parallelRead(dfa, f.name, workers=workers, chunkSize=chunkSize), dfa.compile().read(text))
+        finally:
+          os.unlink(f.name)
+    
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import ThompsonConstruction as TC
+from CharClass import parseBracket
+from RegexParser import Alternation, Concat, Empty, Option, Plus, Repeat, RegexSyntaxError, Star, Symbol, parse, toPostfix
+
+
+class TestParser(unittest.TestCase):
+  def test_ast(self):
+    self.assertEqual(parse("ε|a*b"), Alternation((Empty(), Concat((Star(Symbol("a")), Symbol("b"))))))
+    self.assertEqual(parse("a.b"), parse("ab"), "Explicit and implicit concatenation are the same")
+    self.assertEqual(parse("(a|b)+[x-z]?c{2,}"), Concat((
+      Plus(Alternation((Symbol("a"), Symbol("b")))),
+      Option(Symbol(parseBracket("[x-z]"))),
+      Repeat(Symbol("c"), 2, None),
+    )))
+    self.assertEqual(parse("\\*\\("), Concat((Symbol("*"), Symbol("("))))
+    
+  def test_positions(self):
+    node = parse("ab|c*")
+    self.assertEqual((node.start, node.end), (0, 5))
+    star = node.items[1]
+    self.assertEqual((star.start, star.end), (3, 5))
+    self.assertEqual((star.item.start, star.item.end), (3, 4))
+    
+  def test_errors(self):
+    cases = {
+      "": ("Empty regex", 0),
+      "ab)": ("Unmatched ')'", 2),
+      "a(b|c": ("Unclosed '('", 1),
+      "a||b": ("Expected an expression", 2),
+      "*a": ("Unexpected '*'", 0),
+      "a{3,1}": ("Repetition bound 1 is below 3", 1),
+      "a{x}": ("Expected a number", 2),
+      "ab[c-": ("Unterminated bracket expression", 2),
+      "x[z-a]": ("Invalid character range z-a", 1),
+      "ab\\": ("Trailing escape", 2),
+    }
+    for pattern, (message, offset) in cases.items():
+      with self.assertRaises(RegexSyntaxError, msg=pattern) as context:
+        parse(pattern)
+      self.assertEqual(context.exception.offset, offset, f"Wrong offset for '{pattern}'")
+      self.assertEqual(context.exception.args[0], f"{message} at offset {offset}")
+      
+  def test_postfixRoundTrip(self):
+    for regex in ["ε|a*b", "(0|(1(01*(00)*0)*1)*)*", "a|b|c", "[^a-c]{2,3}x+\\.", "(ab)?c{4}"]:
+      postfix = toPostfix(parse(regex))
+      tc = TC.ThompsonConstruction(regex)
+      self.assertEqual(tc.postfix, postfix)
+      self.assertEqual(tc.toNFA(arena=True), tc.toNFA(arena=False), f"Arena NFA differs from legacy NFA for '{regex}'")
+      
+  def test_stacksAreIndependent(self):
+    first, second = TC.Stack[int](), TC.Stack[int]()
+    first.push(1)
+    self.assertTrue(second.isEmpty(), "Stacks must not share their data")
+    
+if __name__ == '__main__':
+  unittest.main()
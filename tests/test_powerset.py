@@ -1,3 +1,4 @@
+import itertools
 import unittest
 import PowersetConstruction as PC
 import ThompsonConstruction as TC
@@ -34,5 +35,29 @@ class TestPowerset(unittest.TestCase):
     for s in validStrings:
       self.assertTrue(dfa.read(s), f"Constructed DFA should be valid for '{s}'")
     
+  def test_compressAlphabet(self):
+    nfa = TC.ThompsonConstruction("(a|b|c|d)*(e|f)(a|b)").toNFA()
+    plain = PC.PowersetConstruction(nfa).toDFA()
+    compressed = PC.PowersetConstruction(nfa, compressAlphabet=True).toDFA()
+    self.assertEqual(len(plain.alphabet), 6)
+    self.assertEqual(len(compressed.alphabet), 3, "Classes should be {a, b}, {c, d} and {e, f}")
+    for n in range(5):
+      for s in map("".join, itertools.product("abcdefg", repeat=n)):
+        self.assertEqual(compressed.compile().read(s), plain.compile().read(s), f"Compressed DFA is wrong for '{s}'")
+    
+  def test_sparseSubsets(self):
+    for regex in ["(a|b|c|d)*(e|f)(a|b)", "[a-f]x{2,3}|[c-z]*y", "(0|(1(01*(00)*0)*1)*)*"]:
+      nfa = TC.ThompsonConstruction(regex).toNFA()
+      for compress in (False, True):
+        narrow, sparse = PC.PowersetConstruction(nfa, compress), PC.PowersetConstruction(nfa, compress)
+        sparse.sparseStates = 0
+        narrowDFA, sparseDFA = narrow.toDFA(), sparse.toDFA()
+        self.assertIsInstance(sparse.newStates[0], frozenset)
+        self.assertEqual(sparseDFA.alphabet, narrowDFA.alphabet)
+        self.assertEqual(sparseDFA.transitions, narrowDFA.transitions, f"Sparse subsets built a different DFA for {regex}")
+        self.assertEqual(sparseDFA.acceptStates, narrowDFA.acceptStates)
+        for state in narrow.newStates:
+          self.assertEqual(set(sparse.nfaStates(state)), set(narrow.nfaStates(state)))
+    
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,49 @@
+import itertools
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+import ProductConstruction as Product
+
+
+def toDFA(regex: str) -> 'PC.DFA':
+  return PC.PowersetConstruction(TC.ThompsonConstruction(regex).toNFA()).toDFA()
+
+def strings(alphabet: str, length: int):
+  for n in range(length + 1):
+    yield from map("".join, itertools.product(alphabet, repeat=n))
+
+class TestProduct(unittest.TestCase):
+  def test_operations(self):
+    a, b = toDFA("(a|b)*a"), toDFA("a*b*|c")
+    operations = [
+      (Product.intersection, lambda x, y: x and y),
+      (Product.difference, lambda x, y: x and not y),
+      (Product.symmetricDifference, lambda x, y: x != y),
+    ]
+    for operation, expected in operations:
+      dfa = operation(a, b)
+      for s in strings("abc", 6):
+        self.assertEqual(dfa.read(s), expected(a.compile().read(s), b.compile().read(s)), f"{operation.__name__} is wrong on '{s}'")
+        
+    complement = Product.complement(a, {"a", "b", "c"})
+    for s in strings("abc", 6):
+      self.assertEqual(complement.read(s), not a.compile().read(s))
+    
+    # symbols the DFA never mentions are part of the complement
+    complement = Product.complement(toDFA("a*"), {"a", "b"})
+    self.assertTrue(complement.read("b"))
+    self.assertTrue(complement.read("aab"))
+    self.assertFalse(complement.read("aa"))
+    self.assertFalse(complement.read(""))
+    
+  def test_witnesses(self):
+    self.assertEqual(Product.inclusionWitness(toDFA("(a|b)*"), toDFA("a*b*")), "ba")
+    self.assertIsNone(Product.inclusionWitness(toDFA("a*b"), toDFA("(a|b)*")))
+    self.assertTrue(Product.isSubset(toDFA("(ab)*"), toDFA("(a|b)*")))
+    self.assertEqual(Product.intersectionWitness(toDFA("a*b"), toDFA("aa*b*")), "ab")
+    self.assertIsNone(Product.intersectionWitness(toDFA("a*"), toDFA("b(a|b)*")))
+    self.assertTrue(Product.isEmpty(Product.intersection(toDFA("a*"), toDFA("bb*"))))
+    self.assertFalse(Product.isEmpty(toDFA("ε")))
+    
+if __name__ == '__main__':
+  unittest.main()
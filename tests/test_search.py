@@ -0,0 +1,54 @@
+import random
+import time
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from Search import Searcher
+
+
+def naiveFindAll(regex: str, text: str) -> list[tuple[int, int]]:
+  dfa = PC.PowersetConstruction(TC.ThompsonConstruction(regex).toNFA()).toDFA().compile()
+  spans = []
+  i = 0
+  while i <= len(text):
+    ends = [j for j in range(i, len(text) + 1) if dfa.read(text[i:j])]
+    if not ends:
+      i += 1
+      continue
+    spans.append((i, ends[-1]))
+    i = ends[-1] if ends[-1] > i else i + 1
+  return spans
+
+class TestSearch(unittest.TestCase):
+  def test_leftmostLongest(self):
+    searcher = Searcher("a|ab|abc")
+    self.assertEqual(searcher.findAll("xabcxab"), [(1, 4), (5, 7)])
+    self.assertEqual(Searcher("a*").findAll("baa"), [(0, 0), (1, 3), (3, 3)])
+    self.assertEqual(Searcher("(0|(1(01*(00)*0)*1)*)*").search("2110"), (0, 0))
+    self.assertEqual(Searcher("11*0").search(b"2211002"), (2, 5))
+    self.assertIsNone(Searcher("ab").search("ba"))
+  
+  def test_randomTexts(self):
+    rng = random.Random(3)
+    for regex in ["a*b", "(ab|b)*a", "aa|aba|b", "(a|b)*abb"]:
+      searcher = Searcher(regex)
+      for _ in range(30):
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 20)))
+        self.assertEqual(searcher.findAll(text), naiveFindAll(regex, text), f"Wrong spans of '{regex}' in '{text}'")
+  
+  def test_linearScaling(self):
+    # every position starts a match "a" while "a(a|b)*" stays alive to the end of the text
+    searcher = Searcher("a|a(a|b)*c")
+    timings = []
+    for n in (4000, 32000):
+      best = float("inf")
+      for _ in range(3):
+        start = time.perf_counter()
+        spans = searcher.findAll("a" * n)
+        best = min(best, time.perf_counter() - start)
+      self.assertEqual(len(spans), n)
+      timings.append(best)
+    self.assertLess(timings[1] / timings[0], 24, "8x the text should take about 8x the time, not 64x")
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,61 @@
+import random
+import unittest
+from Equivalence import equivalentNFA
+from RegexParser import Concat, Star, Symbol, parse, toPostfix
+from Simplify import Simplifier, simplify
+from ThompsonConstruction import ThompsonConstruction
+
+
+def randomRegex(rng: random.Random, depth: int) -> str:
+  if depth == 0:
+    return rng.choice("abε")
+  choice = rng.randrange(6)
+  if choice == 0:
+    return randomRegex(rng, depth - 1) + randomRegex(rng, depth - 1)
+  if choice == 1:
+    return "(" + randomRegex(rng, depth - 1) + "|" + randomRegex(rng, depth - 1) + ")"
+  return "(" + randomRegex(rng, depth - 1) + ")" + "*+?"[choice % 3]
+
+
+class TestSimplify(unittest.TestCase):
+  def test_rewrites(self):
+    cases = {
+      "(a*)*": "a*",
+      "(a?)+": "a*",
+      "a*a*": "a*",
+      "a|a": "a",
+      "(a|b)|(b|a)": "a|b",
+      "(ε|x)*": "x*",
+      "(a*|b)*": "(a|b)*",
+      "ε|a": "a?",
+      "aεb": "ab",
+      "ab|ac": "a(b|c)",
+      "in|int": "in(t?)",
+      "a{0,}b{1,1}": "a*b",
+    }
+    for regex, expected in cases.items():
+      self.assertEqual(simplify(parse(regex)), parse(expected), f"Wrong rewrite of '{regex}'")
+  
+  def test_hashConsing(self):
+    node = Simplifier().simplify(parse("(ab)*c(ab)*"))
+    self.assertIsInstance(node, Concat)
+    self.assertIs(node.items[0], node.items[-1], "Equal subtrees must be shared")
+    self.assertIsInstance(node.items[0], Star)
+  
+  def test_preservesLanguage(self):
+    rng = random.Random(7)
+    for _ in range(150):
+      regex = randomRegex(rng, rng.randrange(1, 5))
+      before = ThompsonConstruction(regex).toNFA()
+      tc = ThompsonConstruction(regex, simplify=True)
+      after = tc.toNFA()
+      self.assertEqual(equivalentNFA(before, after), (True, None), f"'{regex}' -> '{tc.postfix}' changed the language")
+      self.assertLessEqual(len(after.states), len(before.states))
+      self.assertEqual(after, tc.toNFA(arena=False))
+  
+  def test_deepNesting(self):
+    regex = "(" * 3000 + "a" + ")*" * 3000
+    self.assertEqual(simplify(parse(regex)), Star(Symbol("a")))
+
+if __name__ == '__main__':
+  unittest.main()
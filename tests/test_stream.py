@@ -0,0 +1,56 @@
+import random
+import unittest
+import PowersetConstruction as PC
+import ThompsonConstruction as TC
+from GlushkovConstruction import GlushkovConstruction
+from StreamMatcher import StreamMatcher
+
+
+class TestStreamMatcher(unittest.TestCase):
+  def setUp(self):
+    self.nfa = TC.ThompsonConstruction("(0|(1(01*(00)*0)*1)*)*").toNFA()
+    self.dfa = PC.PowersetConstruction(self.nfa).toDFA()
+    
+  def test_chunkedInput(self):
+    rng = random.Random(3)
+    for automaton in [self.dfa, self.nfa]:
+      for n in range(0, 300, 7):
+        text = bin(n)[2:]
+        matcher = StreamMatcher(automaton)
+        i = 0
+        while i < len(text):
+          size = rng.randint(1, 4)
+          matcher.feed(text[i:i + size] if rng.random() < 0.5 else text[i:i + size].encode())
+          i += size
+        self.assertEqual(matcher.consumed, len(text))
+        self.assertEqual(matcher.finish(), n % 3 == 0, f"Stream of '{text}' matched incorrectly")
+        
+  def test_snapshotRestore(self):
+    for automaton in [self.dfa, self.nfa]:
+      matcher = StreamMatcher(automaton)
+      matcher.feed("11")
+      checkpoint = matcher.snapshot()
+      matcher.feed("1")
+      self.assertFalse(matcher.accepting())
+      matcher.restore(checkpoint)
+      matcher.feed("0")
+      self.assertTrue(matcher.finish(), "'110' should be accepted after restoring the checkpoint")
+      with self.assertRaises(ValueError):
+        matcher.feed("0")
+    
+  def test_boundedChunkTables(self):
+    rng = random.Random(5)
+    nfa = GlushkovConstruction("(a|b)*a(a|b){12}").toNFA()
+    matcher = StreamMatcher(nfa, maxTableEntries=64)
+    text = ""
+    for _ in range(200):
+      chunk = "".join(rng.choice("ab") for _ in range(100))
+      matcher.feed(chunk)
+      text += chunk
+      entries = sum(len(table) for table in matcher.engine.tables.values())
+      self.assertLessEqual(entries, 64, "Chunk tables outgrew the cap")
+    self.assertGreater(matcher.engine.misses, 64)
+    self.assertEqual(matcher.finish(), text[-13] == "a")
+    
+if __name__ == '__main__':
+  unittest.main()
@@ -91,5 +91,10 @@ class TestThompson(unittest.TestCase):
     self.assertFalse(nfa.read("aa"), "Constructed NFA should not be valid for 'aa'")
     self.assertFalse(nfa.read("bb"), "Constructed NFA should not be valid for 'bb'")
     
+  def test_thompsonConstruction_arena(self):
+    for regex in ["ε", "a", "ε|a*.b", "ab|c*", "(a|b)*abb", "(0|(1(01*(00)*0)*1)*)*"]:
+      tc = TC.ThompsonConstruction(regex)
+      self.assertEqual(tc.toNFA(arena=True), tc.toNFA(arena=False), f"Arena NFA differs from legacy NFA for '{regex}'")
+    
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,33 @@
+from typing import Iterable, Iterator
+
+
+def toBitmask(states: Iterable[int]) -> int:
+  """
+  Packs a collection of state ids into an arbitrary-width integer bitset.
+  Large collections go through a byte buffer, which keeps this linear.
+  """
+  states = list(states)
+  if len(states) < 64:
+    bitmask = 0
+    for state in states:
+      bitmask |= 1 << state
+    return bitmask
+  bits = bytearray((max(states) >> 3) + 1)
+  for state in states:
+    bits[state >> 3] |= 1 << (state & 7)
+  return int.from_bytes(bits, "little")
+
+def iterBits(bitmask: int) -> Iterator[int]:
+  """
+  Yields the ids of the set bits of `bitmask` in increasing order.
+  """
+  while bitmask:
+    low = bitmask & -bitmask
+    yield low.bit_length() - 1
+    bitmask ^= low
+
+def fromBitmask(bitmask: int) -> set[int]:
+  """
+  Unpacks a bitset into a set of state ids.
+  """
+  return set(iterBits(bitmask))
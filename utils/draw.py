@@ -39,7 +39,7 @@ def drawNFA(nfa: 'TCNFA', filename="nfa"):
       if symbol == 'ε':
         dot.edge(str(src), str(state), style='dashed', label='ε')
       else:
-        dot.edge(str(src), str(state), label=symbol)
+        dot.edge(str(src), str(state), label=str(symbol))
 
   # Save the graph to a file
   dot.render(filename, format='svg', cleanup=True)  # Cleanup removes the intermediate files
@@ -81,9 +81,9 @@ def drawDFA(dfa: 'DFA', filename="dfa", comment = "DFA"):
   for (src, symbol), dest in dfa.transitions.items():
     edge = edges[src][dest]
     if edge is None:
-      edges[src][dest] = {symbol}
+      edges[src][dest] = {str(symbol)}
     else:
-      edge.add(symbol)
+      edge.add(str(symbol))
       
   for src in dfa.states:
     for dest in dfa.states: